@@ -1,429 +1,1369 @@
-from fastapi import FastAPI, HTTPException, Query
-from pydantic import BaseModel
-from langchain.prompts import PromptTemplate
-from langchain_groq import ChatGroq
-from langchain.chains.summarize import load_summarize_chain
-from langchain_community.document_loaders import YoutubeLoader
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from youtube_search import YoutubeSearch
-import validators
-import re
-from langchain.schema import Document
-from llm_factory import create_llm, validate_api_key, get_default_model
-
-# --------------------------- APP CONFIG ---------------------------
-app = FastAPI(
-    title="YouTube Summarizer API 🎬",
-    description="Analyze and summarize YouTube videos using LangChain + Groq LLMs.",
-    version="1.0.0",
-)
-
-# --------------------------- REQUEST MODELS ---------------------------
-class SummarizeRequest(BaseModel):
-    youtube_url: str
-    provider: str = "groq"  # Default to Groq for backward compatibility
-    api_key: str = None
-    model: str = None  # Uses default if None
-    # For Ollama only
-    ollama_url: str = "http://localhost:11434"
-    # Backward compatibility
-    groq_api_key: str = None  # Deprecated, use api_key
-
-    def __init__(self, **data):
-        # Migrate groq_api_key → api_key for backward compatibility
-        if data.get('groq_api_key') and not data.get('api_key'):
-            data['api_key'] = data['groq_api_key']
-            data['provider'] = 'groq'
-        super().__init__(**data)
-
-
-class TranslateRequest(BaseModel):
-    summary_text: str
-    target_language: str
-    provider: str = "groq"
-    api_key: str = None
-    model: str = None
-    ollama_url: str = "http://localhost:11434"
-    groq_api_key: str = None  # Deprecated
-
-    def __init__(self, **data):
-        if data.get('groq_api_key') and not data.get('api_key'):
-            data['api_key'] = data['groq_api_key']
-            data['provider'] = 'groq'
-        super().__init__(**data)
-
-
-class NotesRequest(BaseModel):
-    transcript_text: str
-    provider: str = "groq"
-    api_key: str = None
-    model: str = None
-    ollama_url: str = "http://localhost:11434"
-    groq_api_key: str = None  # Deprecated
-
-    def __init__(self, **data):
-        if data.get('groq_api_key') and not data.get('api_key'):
-            data['api_key'] = data['groq_api_key']
-            data['provider'] = 'groq'
-        super().__init__(**data)
-
-
-class RecommendationsRequest(BaseModel):
-    summary_text: str
-    # No LLM needed for recommendations
-
-
-# --------------------------- CORE UTILS ---------------------------
-def init_llm(provider: str, api_key: str = None, model: str = None, **kwargs):
-    """
-    Initialize LLM based on provider.
-
-    Args:
-        provider: "groq", "openai", "claude", "mistral", or "ollama"
-        api_key: API key (not needed for Ollama)
-        model: Model name (uses default if None)
-        **kwargs: Provider-specific params (e.g., ollama_url)
-
-    Returns:
-        Configured LLM instance
-
-    Raises:
-        HTTPException: If validation fails
-    """
-    try:
-        # Ollama doesn't require API key
-        if provider == "ollama":
-            base_url = kwargs.get('ollama_url', 'http://localhost:11434')
-            model = model or get_default_model("ollama")
-            return create_llm("ollama", model=model, base_url=base_url)
-
-        # Other providers: validate API key
-        if not api_key:
-            raise HTTPException(
-                status_code=400,
-                detail=f"API key required for {provider.upper()}"
-            )
-
-        if not validate_api_key(provider, api_key):
-            raise HTTPException(
-                status_code=400,
-                detail=f"Invalid {provider.upper()} API key format"
-            )
-
-        # Use default model if not specified
-        model = model or get_default_model(provider)
-
-        return create_llm(provider, api_key=api_key, model=model)
-
-    except HTTPException:
-        raise
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"LLM initialization failed: {str(e)}"
-        )
-
-
-# --------------------------- ENDPOINT: Summarize ---------------------------
-@app.post("/summarize")
-async def summarize_video(req: SummarizeRequest):
-    """Fetch transcript from YouTube and generate summary."""
-    if not validators.url(req.youtube_url):
-        raise HTTPException(status_code=400, detail="Invalid YouTube URL.")
-
-    llm = init_llm(
-        provider=req.provider,
-        api_key=req.api_key,
-        model=req.model,
-        ollama_url=req.ollama_url
-    )
-
-    try:
-        loader = YoutubeLoader.from_youtube_url(
-            req.youtube_url,
-            add_video_info=False,
-            language=['fr', 'en', 'es', 'de', 'it', 'pt', 'ru', 'ja', 'ko', 'zh-Hans', 'ar', 'hi', 'nl', 'pl', 'tr', 'sv', 'no', 'da', 'fi']
-        )
-        docs = loader.load()
-        if not docs or not any(doc.page_content.strip() for doc in docs):
-            raise HTTPException(status_code=404, detail="No transcript found for this video.")
-
-        # Get the full transcript text
-        full_text = " ".join([doc.page_content for doc in docs])
-
-        # Map prompt for individual chunks
-        map_prompt_template = """
-        CRITICAL INSTRUCTION: You MUST write your summary in the SAME LANGUAGE as the content below. If the content is in French, write in French. If in English, write in English. DO NOT switch languages.
-
-        Provide a detailed summary of the following content section. Capture all key points, important details, and main ideas:
-
-        {text}
-
-        DETAILED SUMMARY (in the same language as the content above):
-        """
-        map_prompt = PromptTemplate(template=map_prompt_template, input_variables=["text"])
-
-        # Combine prompt for final summary
-        combine_prompt_template = """
-        CRITICAL INSTRUCTION: You MUST write your final summary in the SAME LANGUAGE as the summaries below. DO NOT translate or switch languages. Maintain the original language throughout.
-
-        You are given multiple summaries from different sections of a video. Combine them into one comprehensive, well-structured summary.
-
-        Section summaries:
-        {text}
-
-        FINAL COMPREHENSIVE SUMMARY (in the same language as above):
-        """
-        combine_prompt = PromptTemplate(template=combine_prompt_template, input_variables=["text"])
-
-        # Simple chunking - reduced size to respect Groq API limits
-        chunk_size = 1200
-        chunks = []
-        for i in range(0, len(full_text), chunk_size):
-            chunk = full_text[i:i + chunk_size]
-            chunks.append(chunk)
-
-        # If the text is short enough, summarize directly
-        if len(full_text) < 2000:
-            result = llm.invoke(map_prompt.format(text=full_text))
-            summary = result.content.strip()
-        else:
-            # Summarize each chunk
-            import time
-            chunk_summaries = []
-            for idx, chunk in enumerate(chunks):
-                try:
-                    result = llm.invoke(map_prompt.format(text=chunk))
-                    chunk_summaries.append(result.content.strip())
-                    # Add delay to avoid rate limits
-                    if idx < len(chunks) - 1:
-                        time.sleep(0.5)
-                except Exception as e:
-                    if "rate_limit" in str(e).lower():
-                        time.sleep(5)
-                        result = llm.invoke(map_prompt.format(text=chunk))
-                        chunk_summaries.append(result.content.strip())
-                    else:
-                        raise e
-
-            # Combine all summaries
-            combined_text = "\n\n".join(chunk_summaries)
-
-            # If combined summaries are still long, summarize again
-            if len(combined_text) > 2000:
-                # Recursively summarize the summaries
-                final_chunks = []
-                for i in range(0, len(combined_text), 1200):
-                    final_chunks.append(combined_text[i:i + 1200])
-
-                final_summaries = []
-                for idx, chunk in enumerate(final_chunks):
-                    result = llm.invoke(combine_prompt.format(text=chunk))
-                    final_summaries.append(result.content.strip())
-                    if idx < len(final_chunks) - 1:
-                        time.sleep(0.5)
-
-                summary = " ".join(final_summaries)
-            else:
-                result = llm.invoke(combine_prompt.format(text=combined_text))
-                summary = result.content.strip()
-        return {"summary": summary.strip()}
-
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Summarization failed: {e}")
-
-
-# --------------------------- ENDPOINT: Translate ---------------------------
-@app.post("/translate")
-async def translate_summary(req: TranslateRequest):
-    """Translate summary text to a target language."""
-    llm = init_llm(
-        provider=req.provider,
-        api_key=req.api_key,
-        model=req.model,
-        ollama_url=req.ollama_url
-    )
-    try:
-        prompt = PromptTemplate(
-            template="Translate the following text to {target_language} naturally and accurately. Preserve the meaning, tone, and structure:\n{text}",
-            input_variables=["text", "target_language"],
-        )
-
-        # For long texts, chunk and translate
-        if len(req.summary_text) > 2000:
-            chunk_size = 1200
-            chunks = []
-            for i in range(0, len(req.summary_text), chunk_size):
-                chunks.append(req.summary_text[i:i + chunk_size])
-
-            import time
-            translated_chunks = []
-            for idx, chunk in enumerate(chunks):
-                try:
-                    result = llm.invoke(prompt.format(text=chunk, target_language=req.target_language))
-                    translated_chunks.append(result.content.strip())
-                    # Add delay to avoid rate limits
-                    if idx < len(chunks) - 1:
-                        time.sleep(1)
-                except Exception as e:
-                    if "rate_limit" in str(e).lower():
-                        time.sleep(5)
-                        result = llm.invoke(prompt.format(text=chunk, target_language=req.target_language))
-                        translated_chunks.append(result.content.strip())
-                    else:
-                        raise e
-
-            translation = " ".join(translated_chunks)
-        else:
-            result = llm.invoke(prompt.format(text=req.summary_text, target_language=req.target_language))
-            translation = result.content.strip()
-
-        return {"translation": translation}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Translation failed: {e}")
-
-
-# --------------------------- ENDPOINT: Notes ---------------------------
-@app.post("/notes")
-async def generate_notes(req: NotesRequest):
-    """Generate detailed study notes from transcript text."""
-    llm = init_llm(
-        provider=req.provider,
-        api_key=req.api_key,
-        model=req.model,
-        ollama_url=req.ollama_url
-    )
-    try:
-        # Prompt for extracting key info from chunks
-        chunk_prompt_template = """
-        Extract key information from the following content section.
-        List the main topics, important points, and insights.
-
-        Content:
-        {text}
-
-        Key information:
-        """
-
-        # Final notes prompt
-        notes_prompt_template = """
-        From the information provided below, create detailed, structured study notes.
-
-        **Strictly adhere to the following formatting rules, using Markdown for headings and lists.**
-
-        # 🔑 Key Topics
-        * List 3-5 main topics covered.
-
-        # 💡 Main Takeaways
-        * List 3 concise, most important takeaways.
-
-        # 📝 Detailed Insights
-        1. Use numbered list for detailed insights, explaining each point in a complete sentence.
-        2. Ensure at least 4 detailed insights are provided.
-
-        # 🚀 Actionable Steps
-        * List 2-3 specific actions a user can take based on the content.
-
-        Generate the result in a proper format.
-        ---
-
-        Information to organize:
-        {text}
-        """
-
-        full_text = req.transcript_text
-
-        # For long texts, use chunking
-        if len(full_text) > 2000:
-            chunk_size = 1200
-            chunks = []
-            for i in range(0, len(full_text), chunk_size):
-                chunks.append(full_text[i:i + chunk_size])
-
-            # Extract key info from each chunk
-            import time
-            chunk_prompt = PromptTemplate(template=chunk_prompt_template, input_variables=["text"])
-            chunk_summaries = []
-            for idx, chunk in enumerate(chunks):
-                try:
-                    result = llm.invoke(chunk_prompt.format(text=chunk))
-                    chunk_summaries.append(result.content.strip())
-                    # Add delay to avoid rate limits
-                    if idx < len(chunks) - 1:
-                        time.sleep(1)
-                except Exception as e:
-                    if "rate_limit" in str(e).lower():
-                        time.sleep(5)
-                        result = llm.invoke(chunk_prompt.format(text=chunk))
-                        chunk_summaries.append(result.content.strip())
-                    else:
-                        raise e
-
-            # Combine all key info
-            combined_text = "\n\n".join(chunk_summaries)
-
-            # If combined text is still too long, chunk it again
-            if len(combined_text) > 2000:
-                final_chunks = []
-                for i in range(0, len(combined_text), 1200):
-                    final_chunks.append(combined_text[i:i + 1200])
-
-                # Summarize the summaries
-                mini_summaries = []
-                for idx, chunk in enumerate(final_chunks):
-                    result = llm.invoke(chunk_prompt.format(text=chunk))
-                    mini_summaries.append(result.content.strip())
-                    if idx < len(final_chunks) - 1:
-                        time.sleep(1)
-
-                combined_text = "\n\n".join(mini_summaries)
-
-            # Generate final structured notes
-            notes_prompt = PromptTemplate(template=notes_prompt_template, input_variables=["text"])
-            result = llm.invoke(notes_prompt.format(text=combined_text))
-            notes = result.content.strip()
-        else:
-            # For short texts, generate notes directly
-            notes_prompt = PromptTemplate(template=notes_prompt_template, input_variables=["text"])
-            result = llm.invoke(notes_prompt.format(text=full_text))
-            notes = result.content.strip()
-
-        # Clean extra whitespace or blank lines
-        clean_notes = re.sub(r"\n\s*\n", "\n\n", notes).strip()
-
-        return {"notes": clean_notes}
-
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Notes generation failed: {e}")
-
-
-# --------------------------- ENDPOINT: Recommendations ---------------------------
-@app.post("/recommendations")
-async def get_recommendations(req: RecommendationsRequest):
-    """Search similar videos on YouTube."""
-    try:
-        search_query = req.summary_text.split('.')[0][:80]
-        results = YoutubeSearch(search_query, max_results=5).to_dict()
-
-        recs = []
-        for r in results:
-            match = re.search(r"(v=|shorts/)([a-zA-Z0-9_-]+)", r.get("url_suffix", ""))
-            video_id = match.group(2) if match else None
-            if video_id:
-                recs.append({
-                    "title": r["title"],
-                    "url": f"https://www.youtube.com/watch?v={video_id}"
-                })
-
-        return {"recommendations": recs}
-
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Recommendation fetch failed: {e}")
-
-
-# --------------------------- HEALTH CHECK ---------------------------
-@app.get("/")
-async def home():
-    return {"message": "🎬 YouTube Summarizer API is running!"}
+from fastapi import FastAPI, Header, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel
+from langchain.prompts import PromptTemplate
+from langchain_groq import ChatGroq
+from langchain.chains.summarize import load_summarize_chain
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+from youtube_search import YoutubeSearch
+import validators
+import re
+import json
+import time
+import asyncio
+import functools
+import logging
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
+from langchain.schema import Document
+from llm_factory import validate_api_key, get_default_model
+from llm_registry import get_llm_client, get_client_registry
+from rate_limiter import rate_limited
+from transcript_cache import VIDEO_ID_PATTERN, canonical_url, extract_video_id, get_transcript_cache, load_transcript
+from llm_cache import cached, get_llm_cache
+from job_store import JOB_HEARTBEAT_SECONDS, get_job_store, STATUS_QUEUED
+from summary_store import get_summary_store, get_translation_store, make_summary_id
+from single_flight import get_single_flight, prompt_version
+import metrics
+from metrics import time_stage
+from tracing import annotate, span, start_trace
+from ingest import (
+    MAX_COLLECTION_VIDEOS,
+    TRANSCRIPT_CACHED,
+    TRANSCRIPT_MISSING,
+    expand_collection,
+    prefetch_transcript,
+)
+from chunking import get_chunk_tokens, preload_encodings, TRANSLATION_CHUNK_TOKENS
+from pipeline import (
+    DEFAULT_MAP_CONCURRENCY,
+    DEFAULT_REDUCE_FAN_IN,
+    llm_call,
+    map_chunks,
+    map_prompts,
+    map_text,
+    reduce_to_single_call,
+    split_for_llm,
+    stream_summary,
+    summarize_mapped,
+    summarize_text,
+)
+
+# --------------------------- APP CONFIG ---------------------------
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Per-worker startup and shutdown: tokenizer files are loaded before the
+    first request needs them, jobs orphaned by dead workers are failed and
+    this worker's jobs keep a heartbeat while it runs.
+    """
+    await asyncio.to_thread(preload_encodings)
+    store = await asyncio.to_thread(get_job_store)
+    await asyncio.to_thread(store.fail_orphaned, JOB_ORPHANED_ERROR)
+    heartbeat = asyncio.create_task(job_heartbeat(store))
+    try:
+        yield
+    finally:
+        heartbeat.cancel()
+        await asyncio.to_thread(store.fail_owned, JOB_SHUTDOWN_ERROR)
+
+
+app = FastAPI(
+    title="YouTube Summarizer API 🎬",
+    description="Analyze and summarize YouTube videos using LangChain + Groq LLMs.",
+    version="1.0.0",
+    lifespan=lifespan,
+)
+
+# Dedicated pool for the sync-only YouTube libraries (transcripts, search),
+# so they never run on the event loop or compete with the default executor
+YOUTUBE_MAX_WORKERS = 8
+youtube_executor = ThreadPoolExecutor(max_workers=YOUTUBE_MAX_WORKERS, thread_name_prefix="youtube")
+
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Count requests and time them (to the response headers for streaming endpoints) per route."""
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        # Route templates ("/jobs/{job_id}") keep the label set bounded
+        endpoint = route.path if route is not None else "unmatched"
+        metrics.HTTP_LATENCY.observe(time.perf_counter() - start, method=request.method, endpoint=endpoint)
+        metrics.HTTP_REQUESTS.inc(method=request.method, endpoint=endpoint, status=status)
+
+
+# --------------------------- REQUEST MODELS ---------------------------
+class SummarizeRequest(BaseModel):
+    youtube_url: str
+    provider: str = "groq"  # Default to Groq for backward compatibility
+    api_key: str = None
+    model: str = None  # Uses default if None
+    max_concurrency: int = DEFAULT_MAP_CONCURRENCY  # Parallel chunk calls (capped at pipeline.MAX_MAP_CONCURRENCY)
+    reduce_fan_in: int = DEFAULT_REDUCE_FAN_IN  # Summaries merged per combine call (capped at pipeline.MAX_REDUCE_FAN_IN)
+    # For Ollama only
+    ollama_url: str = "http://localhost:11434"
+    # Backward compatibility
+    groq_api_key: str = None  # Deprecated, use api_key
+
+    def __init__(self, **data):
+        # Migrate groq_api_key → api_key for backward compatibility
+        if data.get('groq_api_key') and not data.get('api_key'):
+            data['api_key'] = data['groq_api_key']
+            data['provider'] = 'groq'
+        super().__init__(**data)
+
+
+class TranslateRequest(BaseModel):
+    # Exactly one of summary_text, summary_id (from /summarize) or youtube_url
+    summary_text: str = None
+    summary_id: str = None
+    youtube_url: str = None
+    # At least one of target_language and target_languages
+    target_language: str = None
+    target_languages: list[str] = []
+    provider: str = "groq"
+    api_key: str = None
+    model: str = None
+    max_concurrency: int = DEFAULT_MAP_CONCURRENCY
+    ollama_url: str = "http://localhost:11434"
+    groq_api_key: str = None  # Deprecated
+
+    def __init__(self, **data):
+        if data.get('groq_api_key') and not data.get('api_key'):
+            data['api_key'] = data['groq_api_key']
+            data['provider'] = 'groq'
+        super().__init__(**data)
+
+
+class NotesRequest(BaseModel):
+    # Exactly one of transcript_text, transcript_id (video ID, from /summarize) or youtube_url
+    transcript_text: str = None
+    transcript_id: str = None
+    youtube_url: str = None
+    provider: str = "groq"
+    api_key: str = None
+    model: str = None
+    max_concurrency: int = DEFAULT_MAP_CONCURRENCY
+    ollama_url: str = "http://localhost:11434"
+    groq_api_key: str = None  # Deprecated
+
+    def __init__(self, **data):
+        if data.get('groq_api_key') and not data.get('api_key'):
+            data['api_key'] = data['groq_api_key']
+            data['provider'] = 'groq'
+        super().__init__(**data)
+
+
+class BatchSummarizeRequest(BaseModel):
+    youtube_urls: list[str]
+    provider: str = "groq"
+    api_key: str = None
+    model: str = None
+    max_concurrency: int = DEFAULT_MAP_CONCURRENCY  # Per video; the provider limiter caps the batch as a whole
+    reduce_fan_in: int = DEFAULT_REDUCE_FAN_IN
+    output: str = "ndjson"  # "ndjson" streams one line per video, "job" returns a job ID
+    ollama_url: str = "http://localhost:11434"
+
+
+class IngestRequest(BaseModel):
+    collection_url: str  # Playlist or channel URL
+    max_videos: int = 50  # Capped at ingest.MAX_COLLECTION_VIDEOS
+    provider: str = "groq"
+    api_key: str = None
+    model: str = None
+    max_concurrency: int = DEFAULT_MAP_CONCURRENCY
+    reduce_fan_in: int = DEFAULT_REDUCE_FAN_IN
+    output: str = "ndjson"  # "ndjson" streams one line per video, "job" returns a job ID
+    ollama_url: str = "http://localhost:11434"
+
+
+class AnalyzeRequest(BaseModel):
+    youtube_url: str
+    artifacts: list[str] = ["summary", "notes", "recommendations"]  # Any of ANALYZE_ARTIFACTS
+    target_languages: list[str] = []  # The summary is also translated to each of these
+    provider: str = "groq"
+    api_key: str = None
+    model: str = None
+    max_concurrency: int = DEFAULT_MAP_CONCURRENCY
+    reduce_fan_in: int = DEFAULT_REDUCE_FAN_IN
+    ollama_url: str = "http://localhost:11434"
+
+
+class RecommendationsRequest(BaseModel):
+    summary_text: str
+    # No LLM needed for recommendations
+
+
+# --------------------------- CORE UTILS ---------------------------
+def init_llm(provider: str, api_key: str = None, model: str = None, **kwargs):
+    """
+    Initialize LLM based on provider.
+
+    Args:
+        provider: "groq", "openai", "claude", "mistral", or "ollama"
+        api_key: API key (not needed for Ollama)
+        model: Model name (uses default if None)
+        **kwargs: Provider-specific params (e.g., ollama_url)
+
+    Returns:
+        Configured LLM instance, paced by the shared provider rate limiter
+        and backed by the LLM response cache
+
+    Raises:
+        HTTPException: If validation fails
+    """
+    try:
+        # Ollama doesn't require API key
+        if provider == "ollama":
+            base_url = kwargs.get('ollama_url', 'http://localhost:11434')
+            model = model or get_default_model("ollama")
+            llm = get_llm_client("ollama", model, base_url=base_url)
+            return cached(rate_limited(llm, "ollama", base_url, model), "ollama", model, base_url)
+
+        # Other providers: validate API key
+        if not api_key:
+            raise HTTPException(
+                status_code=400,
+                detail=f"API key required for {provider.upper()}"
+            )
+
+        if not validate_api_key(provider, api_key):
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid {provider.upper()} API key format"
+            )
+
+        # Use default model if not specified
+        model = model or get_default_model(provider)
+
+        llm = get_llm_client(provider, model, api_key=api_key)
+        return cached(rate_limited(llm, provider, api_key, model), provider, model)
+
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"LLM initialization failed: {str(e)}"
+        )
+
+
+TRANSLATE_SOURCES = ("summary_text", "summary_id", "youtube_url")
+NOTES_SOURCES = ("transcript_text", "transcript_id", "youtube_url")
+
+# Upper bound on target languages in one /translate request
+MAX_TRANSLATE_LANGUAGES = 16
+
+
+def require_one_source(req, fields: tuple):
+    """
+    Check that exactly one of a request's alternative input fields is set.
+
+    Raises:
+        HTTPException: If none or several are set, or if the one set is an invalid URL or video ID
+    """
+    given = [name for name in fields if getattr(req, name)]
+    if len(given) != 1:
+        raise HTTPException(status_code=400, detail=f"Provide exactly one of: {', '.join(fields)}.")
+    if given[0] == "youtube_url" and not validators.url(req.youtube_url):
+        raise HTTPException(status_code=400, detail="Invalid YouTube URL.")
+    if given[0] == "transcript_id" and not VIDEO_ID_PATTERN.match(req.transcript_id):
+        raise HTTPException(status_code=400, detail="Invalid transcript_id: expected a YouTube video ID.")
+
+
+def require_target_languages(req: TranslateRequest):
+    """
+    Check the target languages of a translation request.
+
+    Raises:
+        HTTPException: If none is given, or more than MAX_TRANSLATE_LANGUAGES
+    """
+    languages = translate_languages(req)
+    if not languages:
+        raise HTTPException(status_code=400, detail="Provide target_language or target_languages.")
+    if len(languages) > MAX_TRANSLATE_LANGUAGES:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_TRANSLATE_LANGUAGES} target languages per request.")
+
+
+def translate_languages(req: TranslateRequest) -> list:
+    """Distinct target languages of a translation request, in request order."""
+    languages = ([req.target_language] if req.target_language else []) + list(req.target_languages)
+    return list(dict.fromkeys(language.strip() for language in languages if language and language.strip()))
+
+
+# Requests sending "X-Debug-Trace: 1" get their trace (spans with timings,
+# chunk sizes, retries and tokens) under "trace" in the response; with
+# TRACE_FILE set, every traced request is also appended there
+TRACE_HEADER = "X-Debug-Trace"
+TRACE_ID_HEADER = "X-Trace-Id"
+
+
+def with_trace(result: dict, trace, debug: bool, response: Response) -> dict:
+    """Expose the request's trace ID (and the whole trace for debug requests)."""
+    if trace is None:
+        return result
+    response.headers[TRACE_ID_HEADER] = trace.trace_id
+    # Copy: the result may be shared with coalesced requests
+    return {**result, "trace": trace.to_dict()} if debug else result
+
+
+async def run_blocking(func, *args, **kwargs):
+    """Run a blocking call on the YouTube thread pool without stalling the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(youtube_executor, functools.partial(func, *args, **kwargs))
+
+
+# --------------------------- ENDPOINT: Summarize ---------------------------
+async def fetch_transcript_text(youtube_url: str) -> str:
+    """
+    Full transcript text of a video.
+
+    Raises:
+        HTTPException: If the video has no transcript
+    """
+    # Cached by video ID; tries every caption language on a miss
+    with time_stage("transcript_load"), span("transcript_load", youtube_url=youtube_url):
+        docs = await run_blocking(load_transcript, youtube_url)
+        annotate(chars=sum(len(doc.page_content) for doc in docs or []))
+    if not docs or not any(doc.page_content.strip() for doc in docs):
+        raise HTTPException(status_code=404, detail="No transcript found for this video.")
+
+    # Get the full transcript text
+    return " ".join([doc.page_content for doc in docs])
+
+
+def summary_prompts() -> tuple:
+    """Map and combine prompts used by /summarize and its streaming and job variants."""
+    # Map prompt for individual chunks
+    map_prompt_template = """
+    CRITICAL INSTRUCTION: You MUST write your summary in the SAME LANGUAGE as the content below. If the content is in French, write in French. If in English, write in English. DO NOT switch languages.
+
+    Provide a detailed summary of the following content section. Capture all key points, important details, and main ideas:
+
+    {text}
+
+    DETAILED SUMMARY (in the same language as the content above):
+    """
+    map_prompt = PromptTemplate(template=map_prompt_template, input_variables=["text"])
+
+    # Combine prompt for final summary
+    combine_prompt_template = """
+    CRITICAL INSTRUCTION: You MUST write your final summary in the SAME LANGUAGE as the summaries below. DO NOT translate or switch languages. Maintain the original language throughout.
+
+    You are given multiple summaries from different sections of a video. Combine them into one comprehensive, well-structured summary.
+
+    Section summaries:
+    {text}
+
+    FINAL COMPREHENSIVE SUMMARY (in the same language as above):
+    """
+    combine_prompt = PromptTemplate(template=combine_prompt_template, input_variables=["text"])
+
+    return map_prompt, combine_prompt
+
+
+def llm_identity(llm) -> tuple:
+    """(provider, model, Ollama server URL or None) of an LLM from ``init_llm``, for coalescing and store keys."""
+    return llm.provider, llm.model, getattr(llm, "base_url", None)
+
+
+async def run_summarize(req: SummarizeRequest, llm, progress=None) -> dict:
+    """
+    Fetch the transcript and summarize it (shared by /summarize and the job workers).
+
+    Concurrent requests for the same video, provider, model (and Ollama
+    server), prompts and reduce fan-in share a single run.
+
+    Args:
+        req: Summarize request
+        llm: LLM from ``init_llm``
+        progress: Optional async ``progress(stage, done, total)`` callback
+
+    Raises:
+        HTTPException: If the video has no transcript
+    """
+    video_id = extract_video_id(req.youtube_url)
+    if video_id is None:
+        return await summarize_video_transcript(req, llm, progress)
+    map_prompt, combine_prompt = summary_prompts()
+    key = (video_id, "summarize", *llm_identity(llm), prompt_version(map_prompt, combine_prompt), req.reduce_fan_in)
+    return await get_single_flight().run(
+        "summarize", key, lambda shared_progress: summarize_video_transcript(req, llm, shared_progress), progress
+    )
+
+
+async def summarize_video_transcript(req: SummarizeRequest, llm, progress=None) -> dict:
+    """One summarization run for ``run_summarize``."""
+    full_text = await fetch_transcript_text(req.youtube_url)
+    if progress is not None:
+        await progress("transcript", 1, 1)
+
+    map_prompt, combine_prompt = summary_prompts()
+
+    # Single call, map-reduce or hierarchical reduce depending on the model's limits
+    result = await summarize_text(
+        llm, full_text, map_prompt, combine_prompt, req.max_concurrency, req.reduce_fan_in, progress
+    )
+    # Kept server-side so /translate and /notes can refer to it by ID
+    summary_id = await asyncio.to_thread(get_summary_store().put, result["summary"])
+    return {
+        "summary": result["summary"],
+        "summary_id": summary_id,
+        "transcript_id": extract_video_id(req.youtube_url),
+        "strategy": result["strategy"],
+        "reduce_levels": result["reduce_levels"],
+        "llm_calls": result["llm_calls"],
+    }
+
+
+@app.post("/summarize")
+async def summarize_video(req: SummarizeRequest, response: Response,
+                          debug_trace: bool = Header(False, alias=TRACE_HEADER)):
+    """Fetch transcript from YouTube and generate summary."""
+    if not validators.url(req.youtube_url):
+        raise HTTPException(status_code=400, detail="Invalid YouTube URL.")
+
+    llm = init_llm(
+        provider=req.provider,
+        api_key=req.api_key,
+        model=req.model,
+        ollama_url=req.ollama_url
+    )
+
+    try:
+        with start_trace("summarize", debug_trace, provider=llm.provider, model=llm.model,
+                         youtube_url=req.youtube_url) as trace:
+            result = await run_summarize(req, llm)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Summarization failed: {e}")
+    return with_trace(result, trace, debug_trace, response)
+
+
+# --------------------------- ENDPOINT: Summarize (streaming) ---------------------------
+# Server-Sent Events, so clients show each chunk summary as soon as it is ready
+# and the final summary token by token instead of waiting for the whole run
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def sse_event(event: str, data: dict) -> str:
+    """Format one Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def summary_events(req: SummarizeRequest, llm):
+    """
+    SSE stream of a summarization: "transcript", then the events of
+    ``pipeline.stream_summary`` ("plan", "chunk", "reduce", "token", "done"),
+    or an "error" event if it fails midway.
+    """
+    try:
+        full_text = await fetch_transcript_text(req.youtube_url)
+        yield sse_event("transcript", {"chars": len(full_text)})
+
+        map_prompt, combine_prompt = summary_prompts()
+        async for event, data in stream_summary(
+            llm, full_text, map_prompt, combine_prompt, req.max_concurrency, req.reduce_fan_in
+        ):
+            yield sse_event(event, data)
+    except HTTPException as e:
+        yield sse_event("error", {"status_code": e.status_code, "detail": e.detail})
+    except Exception as e:
+        yield sse_event("error", {"status_code": 500, "detail": f"Summarization failed: {e}"})
+
+
+@app.post("/summarize/stream")
+async def summarize_video_stream(req: SummarizeRequest):
+    """Summarize a video, streaming progress and the final summary as Server-Sent Events."""
+    if not validators.url(req.youtube_url):
+        raise HTTPException(status_code=400, detail="Invalid YouTube URL.")
+
+    llm = init_llm(
+        provider=req.provider,
+        api_key=req.api_key,
+        model=req.model,
+        ollama_url=req.ollama_url
+    )
+    return StreamingResponse(summary_events(req, llm), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+def header_api_key(x_api_key: str = None, authorization: str = None) -> str:
+    """
+    API key from an "X-API-Key" header or an "Authorization: Bearer <key>" header.
+
+    Other Authorization schemes (Basic, ...) carry no provider key: None,
+    as if no key was sent.
+    """
+    if x_api_key:
+        return x_api_key
+    if authorization:
+        scheme, _, credentials = authorization.strip().partition(" ")
+        if scheme.lower() == "bearer" and credentials.strip():
+            return credentials.strip()
+    return None
+
+
+@app.get("/summarize/stream")
+async def summarize_video_stream_get(
+    youtube_url: str,
+    provider: str = "groq",
+    model: str = None,
+    max_concurrency: int = DEFAULT_MAP_CONCURRENCY,
+    reduce_fan_in: int = DEFAULT_REDUCE_FAN_IN,
+    ollama_url: str = "http://localhost:11434",
+    x_api_key: str = Header(None, alias="X-API-Key"),
+    authorization: str = Header(None),
+    query_api_key: str = Query(None, alias="api_key", include_in_schema=False),
+):
+    """
+    Same as POST /summarize/stream with query parameters, for EventSource-style clients.
+
+    The API key goes in an "X-API-Key" or "Authorization: Bearer" header, never
+    in the URL (access logs, proxies, browser history). Browser ``EventSource``
+    cannot send headers: use POST, a fetch-based SSE client, or Ollama (no key).
+
+    Raises:
+        HTTPException: 400 if ``api_key`` is passed as a query parameter
+    """
+    if query_api_key is not None:
+        raise HTTPException(
+            status_code=400,
+            detail="Send the API key in the X-API-Key or Authorization header, not in the URL.",
+        )
+    api_key = header_api_key(x_api_key, authorization)
+    params = dict(
+        youtube_url=youtube_url,
+        provider=provider,
+        api_key=api_key,
+        model=model,
+        max_concurrency=max_concurrency,
+        reduce_fan_in=reduce_fan_in,
+        ollama_url=ollama_url,
+    )
+    # Omitted optional parameters keep the request model defaults
+    req = SummarizeRequest(**{name: value for name, value in params.items() if value is not None})
+    return await summarize_video_stream(req)
+
+
+# --------------------------- ENDPOINT: Translate ---------------------------
+async def resolve_summary_text(req: TranslateRequest, llm, progress=None) -> str:
+    """
+    Summary to translate: given inline, stored under ``summary_id``, or the summary of ``youtube_url``.
+
+    Raises:
+        HTTPException: If ``summary_id`` is unknown or expired
+    """
+    if req.summary_text:
+        return req.summary_text
+    if req.summary_id:
+        summary = await asyncio.to_thread(get_summary_store().get, req.summary_id)
+        if summary is None:
+            raise HTTPException(status_code=404, detail="Unknown or expired summary_id.")
+        return summary
+
+    # Answered from the transcript and LLM response caches if the video was already summarized
+    summarize_req = SummarizeRequest(
+        youtube_url=req.youtube_url,
+        provider=req.provider,
+        max_concurrency=req.max_concurrency,
+    )
+    return (await run_summarize(summarize_req, llm, progress))["summary"]
+
+
+def translation_prompt() -> PromptTemplate:
+    """Translation prompt used by /translate and /analyze."""
+    return PromptTemplate(
+        template="Translate the following text to {target_language} naturally and accurately. Preserve the meaning, tone, and structure:\n{text}",
+        input_variables=["text", "target_language"],
+    )
+
+
+async def translate_text(llm, summary_text: str, languages: list, max_concurrency: int = DEFAULT_MAP_CONCURRENCY,
+                         progress=None) -> dict:
+    """
+    Translate a summary into several languages.
+
+    The summary is split once; every (chunk, language) pair is then
+    translated concurrently, sharing ``max_concurrency`` and the provider's
+    rate budget. Translations already stored for this summary, language and
+    model (and Ollama server) are reused.
+
+    Returns:
+        Dict of language -> translation, in the order of ``languages``
+    """
+    summary_id = make_summary_id(summary_text)
+    store = get_translation_store()
+    provider, model, base_url = llm_identity(llm)
+    stored = await asyncio.gather(*(
+        asyncio.to_thread(store.get, summary_id, language, provider, model, base_url) for language in languages
+    ))
+    translations = {language: text for language, text in zip(languages, stored) if text is not None}
+    missing = [language for language in languages if language not in translations]
+
+    if missing:
+        # The output is as long as the input, so chunks are also bounded by output length
+        chunk_tokens = min(get_chunk_tokens(llm.provider, llm.model), TRANSLATION_CHUNK_TOKENS)
+        chunks = await split_for_llm(llm, summary_text, chunk_tokens)
+
+        prompt = translation_prompt()
+        prompts = [prompt.format(text=chunk, target_language=language) for language in missing for chunk in chunks]
+        results = await map_prompts(llm, prompts, max_concurrency, progress, "translate")
+
+        for index, language in enumerate(missing):
+            translation = " ".join(results[index * len(chunks):(index + 1) * len(chunks)])
+            translations[language] = translation
+            await asyncio.to_thread(store.put, summary_id, language, provider, model, translation, base_url)
+    elif progress is not None:
+        await progress("translate", 1, 1)
+
+    return {language: translations[language] for language in languages}
+
+
+async def run_translate(req: TranslateRequest, llm, progress=None) -> dict:
+    """
+    Translate the summary (shared by /translate and the job workers).
+
+    Returns:
+        Dict with "translation" (for ``target_language``) and/or
+        "translations" (language -> text, for ``target_languages``)
+    """
+    summary_text = await resolve_summary_text(req, llm, progress)
+    translations = await translate_text(llm, summary_text, translate_languages(req), req.max_concurrency, progress)
+
+    response = {}
+    if req.target_language and req.target_language.strip():  # A blank one is ignored, like in translate_languages
+        response["translation"] = translations[req.target_language.strip()]
+    if req.target_languages:
+        response["translations"] = translations
+    return response
+
+
+@app.post("/translate")
+async def translate_summary(req: TranslateRequest, response: Response,
+                            debug_trace: bool = Header(False, alias=TRACE_HEADER)):
+    """Translate a summary (text, summary ID or video URL) to one or more target languages."""
+    require_one_source(req, TRANSLATE_SOURCES)
+    require_target_languages(req)
+    llm = init_llm(
+        provider=req.provider,
+        api_key=req.api_key,
+        model=req.model,
+        ollama_url=req.ollama_url
+    )
+    try:
+        with start_trace("translate", debug_trace, provider=llm.provider, model=llm.model,
+                         languages=translate_languages(req)) as trace:
+            result = await run_translate(req, llm)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Translation failed: {e}")
+    return with_trace(result, trace, debug_trace, response)
+
+
+# --------------------------- ENDPOINT: Notes ---------------------------
+def notes_prompts() -> tuple:
+    """Key information extraction and structured notes prompts used by /notes and /analyze."""
+    # Prompt for extracting key info from chunks
+    chunk_prompt_template = """
+    Extract key information from the following content section.
+    List the main topics, important points, and insights.
+
+    Content:
+    {text}
+
+    Key information:
+    """
+
+    chunk_prompt = PromptTemplate(template=chunk_prompt_template, input_variables=["text"])
+
+    # Final notes prompt
+    notes_prompt_template = """
+    From the information provided below, create detailed, structured study notes.
+
+    **Strictly adhere to the following formatting rules, using Markdown for headings and lists.**
+
+    # 🔑 Key Topics
+    * List 3-5 main topics covered.
+
+    # 💡 Main Takeaways
+    * List 3 concise, most important takeaways.
+
+    # 📝 Detailed Insights
+    1. Use numbered list for detailed insights, explaining each point in a complete sentence.
+    2. Ensure at least 4 detailed insights are provided.
+
+    # 🚀 Actionable Steps
+    * List 2-3 specific actions a user can take based on the content.
+
+    Generate the result in a proper format.
+    ---
+
+    Information to organize:
+    {text}
+    """
+    notes_prompt = PromptTemplate(template=notes_prompt_template, input_variables=["text"])
+
+    return chunk_prompt, notes_prompt
+
+
+async def write_notes(llm, text: str, extracts: list = None, max_concurrency: int = DEFAULT_MAP_CONCURRENCY,
+                      fan_in: int = DEFAULT_REDUCE_FAN_IN, progress=None) -> str:
+    """
+    Generate the final structured notes.
+
+    Args:
+        llm: LLM from ``init_llm``
+        text: Whole text, used as is when there are no extracts
+        extracts: Per-chunk extracts of a long text, reduced with the
+            extraction prompt until they fit one call
+        max_concurrency: Maximum number of calls in flight for this request
+        fan_in: Maximum number of extracts merged per reduce call
+        progress: Optional async ``progress(stage, done, total)`` callback
+
+    Returns:
+        Notes in Markdown
+    """
+    chunk_prompt, notes_prompt = notes_prompts()
+    if extracts is not None:
+        reduced = await reduce_to_single_call(llm, extracts, chunk_prompt, fan_in, max_concurrency, progress)
+        text = reduced["text"]
+
+    prompt = notes_prompt.format(text=text)
+    with llm_call("notes", prompt):
+        result = await llm.ainvoke(prompt)
+    if progress is not None:
+        await progress("notes", 1, 1)
+
+    # Clean extra whitespace or blank lines
+    return re.sub(r"\n\s*\n", "\n\n", result.content.strip()).strip()
+
+
+async def run_notes(req: NotesRequest, llm, progress=None) -> dict:
+    """Generate study notes from a transcript (shared by /notes and the job workers)."""
+    if req.transcript_text:
+        full_text = req.transcript_text
+
+        chunks = await split_for_llm(llm, full_text)
+
+        # For long texts, extract key info from each chunk first
+        extracts = None
+        if len(chunks) > 1:
+            chunk_prompt, _ = notes_prompts()
+            extracts = await map_chunks(llm, chunk_prompt, chunks, req.max_concurrency, progress)
+    else:
+        # Server-side transcript: concurrent requests for the same video, provider,
+        # model (and Ollama server) and prompts share a single run
+        video_id = req.transcript_id or extract_video_id(req.youtube_url)
+        if video_id is None:
+            return await notes_from_video(req, llm, progress)
+        map_prompt, _ = summary_prompts()
+        key = (video_id, "notes", *llm_identity(llm), prompt_version(map_prompt, *notes_prompts()))
+        return await get_single_flight().run(
+            "notes", key, lambda shared_progress: notes_from_video(req, llm, shared_progress), progress
+        )
+
+    notes = await write_notes(llm, full_text, extracts, req.max_concurrency, progress=progress)
+    return {"notes": notes}
+
+
+async def notes_from_video(req: NotesRequest, llm, progress=None) -> dict:
+    """
+    Notes from the server-side transcript of ``transcript_id`` or ``youtube_url``.
+
+    The section summaries of the /summarize map pass serve as extracts,
+    answered from the LLM response cache when the video was already
+    summarized with the same model.
+    """
+    full_text = await fetch_transcript_text(req.youtube_url or req.transcript_id)
+    if progress is not None:
+        await progress("transcript", 1, 1)
+    map_prompt, _ = summary_prompts()
+    mapped = await map_text(llm, full_text, map_prompt, req.max_concurrency, progress=progress)
+    notes = await write_notes(llm, full_text, mapped["summaries"], req.max_concurrency, progress=progress)
+    return {"notes": notes}
+
+
+@app.post("/notes")
+async def generate_notes(req: NotesRequest, response: Response,
+                         debug_trace: bool = Header(False, alias=TRACE_HEADER)):
+    """Generate detailed study notes from a transcript (text, transcript ID or video URL)."""
+    require_one_source(req, NOTES_SOURCES)
+    llm = init_llm(
+        provider=req.provider,
+        api_key=req.api_key,
+        model=req.model,
+        ollama_url=req.ollama_url
+    )
+    try:
+        with start_trace("notes", debug_trace, provider=llm.provider, model=llm.model) as trace:
+            result = await run_notes(req, llm)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Notes generation failed: {e}")
+    return with_trace(result, trace, debug_trace, response)
+
+
+# --------------------------- ENDPOINT: Recommendations ---------------------------
+async def search_recommendations(summary_text: str) -> list:
+    """Search YouTube for videos similar to a summary (first sentence as the query)."""
+    search_query = summary_text.split('.')[0][:80]
+    with time_stage("youtube_search"), span("youtube_search"):
+        results = await run_blocking(lambda: YoutubeSearch(search_query, max_results=5).to_dict())
+
+    recs = []
+    for r in results:
+        match = re.search(r"(v=|shorts/)([a-zA-Z0-9_-]+)", r.get("url_suffix", ""))
+        video_id = match.group(2) if match else None
+        if video_id:
+            recs.append({
+                "title": r["title"],
+                "url": f"https://www.youtube.com/watch?v={video_id}"
+            })
+    return recs
+
+
+@app.post("/recommendations")
+async def get_recommendations(req: RecommendationsRequest):
+    """Search similar videos on YouTube."""
+    try:
+        return {"recommendations": await search_recommendations(req.summary_text)}
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Recommendation fetch failed: {e}")
+
+
+# --------------------------- ENDPOINT: Analyze ---------------------------
+# Everything about one video in one request: the transcript is fetched and
+# mapped once, then the stages below run concurrently as soon as their inputs
+# are ready:
+#
+#   transcript -> map -> summary reduce -> translations, recommendations
+#                     -> notes reduce
+ANALYZE_ARTIFACTS = ("summary", "notes", "recommendations")
+
+
+async def run_analyze(req: AnalyzeRequest, llm) -> dict:
+    """
+    Run the /analyze stage graph.
+
+    Returns:
+        Dict with the requested artifacts ("summary" with "strategy",
+        "notes", "translations" by language, "recommendations") and
+        "timings_ms" per stage (stages that wait on another one are timed
+        from when their input is ready)
+    """
+    timings = {}
+    started = time.perf_counter()
+
+    async def timed(stage: str, coro):
+        start = time.perf_counter()
+        try:
+            return await coro
+        finally:
+            timings[stage] = round((time.perf_counter() - start) * 1000, 1)
+
+    full_text = await timed("transcript", fetch_transcript_text(req.youtube_url))
+
+    # One map pass shared by the summary and notes reductions
+    map_prompt, combine_prompt = summary_prompts()
+    mapped = await timed("map", map_text(llm, full_text, map_prompt, req.max_concurrency, req.reduce_fan_in))
+
+    wanted = set(req.artifacts)
+    summary_task = None
+    if "summary" in wanted or "recommendations" in wanted or req.target_languages:
+        summary_task = asyncio.ensure_future(timed("summary", summarize_mapped(
+            llm, full_text, mapped, map_prompt, combine_prompt, req.max_concurrency, req.reduce_fan_in
+        )))
+
+    async def translate(languages: list) -> dict:
+        summary = (await summary_task)["summary"]
+        return await timed("translations", translate_text(llm, summary, languages, req.max_concurrency))
+
+    async def recommend() -> list:
+        summary = (await summary_task)["summary"]
+        return await timed("recommendations", search_recommendations(summary))
+
+    stages = {}
+    if "notes" in wanted:
+        # The section summaries of the map pass stand in for the per-chunk extracts of /notes
+        stages["notes"] = timed("notes", write_notes(
+            llm, full_text, mapped["summaries"], req.max_concurrency, req.reduce_fan_in
+        ))
+    if "recommendations" in wanted:
+        stages["recommendations"] = recommend()
+    languages = list(dict.fromkeys(req.target_languages))
+    if languages:
+        # All (chunk, language) pairs in one concurrent pass
+        stages["translations"] = translate(languages)
+
+    tasks = {name: asyncio.ensure_future(coro) for name, coro in stages.items()}
+    try:
+        await asyncio.gather(*tasks.values(), *([summary_task] if summary_task else []))
+    except BaseException:
+        for task in [*tasks.values(), summary_task]:
+            if task is not None:
+                task.cancel()
+        raise
+
+    response = {}
+    if "summary" in wanted:
+        summary = summary_task.result()
+        summary_id = await asyncio.to_thread(get_summary_store().put, summary["summary"])
+        response.update(
+            summary=summary["summary"],
+            summary_id=summary_id,
+            transcript_id=extract_video_id(req.youtube_url),
+            strategy=summary["strategy"],
+            llm_calls=summary["llm_calls"],
+        )
+    if "notes" in wanted:
+        response["notes"] = tasks["notes"].result()
+    if languages:
+        response["translations"] = tasks["translations"].result()
+    if "recommendations" in wanted:
+        response["recommendations"] = tasks["recommendations"].result()
+
+    timings["total"] = round((time.perf_counter() - started) * 1000, 1)
+    response["timings_ms"] = timings
+    return response
+
+
+@app.post("/analyze")
+async def analyze_video(req: AnalyzeRequest):
+    """Summary, notes, translations and recommendations for one video in a single request."""
+    if not validators.url(req.youtube_url):
+        raise HTTPException(status_code=400, detail="Invalid YouTube URL.")
+    unknown = set(req.artifacts) - set(ANALYZE_ARTIFACTS)
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown artifacts: {', '.join(sorted(unknown))}. Choose from {', '.join(ANALYZE_ARTIFACTS)}."
+        )
+    if not req.artifacts and not req.target_languages:
+        raise HTTPException(status_code=400, detail="Nothing to do: no artifacts or target languages requested.")
+
+    llm = init_llm(
+        provider=req.provider,
+        api_key=req.api_key,
+        model=req.model,
+        ollama_url=req.ollama_url
+    )
+    try:
+        return await run_analyze(req, llm)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Analysis failed: {e}")
+
+
+# --------------------------- JOBS ---------------------------
+# Long summarizations outlive load balancer timeouts: POST /jobs/<kind> returns
+# a job ID right away, a pool of worker tasks runs the same pipelines as the
+# endpoints above, and GET /jobs/{job_id} reports status, progress and result
+# from the SQLite job store.
+JOB_WORKERS = 4
+JOB_ORPHANED_ERROR = "Interrupted by a server restart; resubmit the job"
+JOB_SHUTDOWN_ERROR = "Interrupted by a server shutdown; resubmit the job"
+
+job_queue = None  # Created with the workers, on the first submission
+job_workers = []
+
+
+async def job_heartbeat(store):
+    """Keep this worker's jobs alive in the store and fail those of dead workers."""
+    while True:
+        await asyncio.sleep(JOB_HEARTBEAT_SECONDS)
+        try:
+            await asyncio.to_thread(store.heartbeat)
+            await asyncio.to_thread(store.fail_orphaned, JOB_ORPHANED_ERROR)
+        except Exception:
+            # Keep beating (a busy database, a bad row): a stopped heartbeat
+            # would get this worker's running jobs failed as orphaned
+            logger.exception("Job heartbeat failed; retrying in %ss", JOB_HEARTBEAT_SECONDS)
+
+
+async def job_worker():
+    """Run queued jobs one at a time, recording progress and outcome in the job store."""
+    store = await asyncio.to_thread(get_job_store)
+    while True:
+        job_id, run, req, llm = await job_queue.get()
+        seq = 0
+
+        async def progress(stage: str, done: int, total: int, **details):
+            nonlocal seq
+            seq += 1
+            await asyncio.to_thread(
+                store.set_progress, job_id, {"stage": stage, "done": done, "total": total, **details}, seq
+            )
+
+        try:
+            await asyncio.to_thread(store.start, job_id)
+            result = await run(req, llm, progress)
+            await asyncio.to_thread(store.succeed, job_id, result)
+        except HTTPException as e:
+            await asyncio.to_thread(store.fail, job_id, str(e.detail))
+        except Exception as e:
+            await asyncio.to_thread(store.fail, job_id, str(e))
+        finally:
+            job_queue.task_done()
+
+
+async def submit_job(kind: str, run, req, llm) -> dict:
+    """
+    Persist a new job and queue it for the worker pool.
+
+    Args:
+        kind: Job type ("summarize", "notes", "translate", "summarize_batch" or "ingest")
+        run: Pipeline coroutine function taking ``(req, llm, progress)``
+        req: Validated request
+        llm: LLM from ``init_llm`` (kept in memory only: API keys are never persisted)
+
+    Returns:
+        Dict with "job_id" and "status"
+    """
+    global job_queue
+    store = await asyncio.to_thread(get_job_store)
+    job_id = await asyncio.to_thread(store.create, kind, llm.provider, llm.model)
+
+    if job_queue is None:
+        job_queue = asyncio.Queue()
+        job_workers.extend(asyncio.create_task(job_worker()) for _ in range(JOB_WORKERS))
+
+    await job_queue.put((job_id, run, req, llm))
+    return {"job_id": job_id, "status": STATUS_QUEUED}
+
+
+@app.post("/jobs/summarize", status_code=202)
+async def submit_summarize_job(req: SummarizeRequest):
+    """Queue a summarization; poll GET /jobs/{job_id} for progress and the result."""
+    if not validators.url(req.youtube_url):
+        raise HTTPException(status_code=400, detail="Invalid YouTube URL.")
+
+    llm = init_llm(
+        provider=req.provider,
+        api_key=req.api_key,
+        model=req.model,
+        ollama_url=req.ollama_url
+    )
+    return await submit_job("summarize", run_summarize, req, llm)
+
+
+@app.post("/jobs/translate", status_code=202)
+async def submit_translate_job(req: TranslateRequest):
+    """Queue a translation; poll GET /jobs/{job_id} for progress and the result."""
+    require_one_source(req, TRANSLATE_SOURCES)
+    require_target_languages(req)
+    llm = init_llm(
+        provider=req.provider,
+        api_key=req.api_key,
+        model=req.model,
+        ollama_url=req.ollama_url
+    )
+    return await submit_job("translate", run_translate, req, llm)
+
+
+@app.post("/jobs/notes", status_code=202)
+async def submit_notes_job(req: NotesRequest):
+    """Queue notes generation; poll GET /jobs/{job_id} for progress and the result."""
+    require_one_source(req, NOTES_SOURCES)
+    llm = init_llm(
+        provider=req.provider,
+        api_key=req.api_key,
+        model=req.model,
+        ollama_url=req.ollama_url
+    )
+    return await submit_job("notes", run_notes, req, llm)
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """
+    Status of a job: "queued", "running", "succeeded" (with "result") or
+    "failed" (with "error"), and its latest progress as {"stage", "done", "total"}.
+    """
+    store = await asyncio.to_thread(get_job_store)
+    job = await asyncio.to_thread(store.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    return job
+
+
+# --------------------------- ENDPOINT: Batch Summarize ---------------------------
+# Every chunk call of every video goes through the same shared provider limiter
+# (requests, tokens and calls in flight), so a batch runs as fast as the
+# provider quota allows, whatever the number of videos
+BATCH_MAX_VIDEOS = 500
+BATCH_VIDEO_CONCURRENCY = 16  # Videos in progress at once (bounds transcripts held in memory)
+
+
+async def summarize_batch_item(req, llm, index: int, youtube_url: str) -> dict:
+    """
+    Summarize one video of a batch or collection, reporting failures in the result.
+
+    Args:
+        req: Batch or ingest request (provider, max_concurrency and reduce_fan_in are used)
+        llm: LLM from ``init_llm``
+        index: Position of the video in the batch
+        youtube_url: Video URL
+
+    Returns:
+        Dict with "index", "youtube_url" and "status": "ok" with the
+        /summarize fields, or "error" with "status_code" and "error"
+    """
+    item = {"index": index, "youtube_url": youtube_url}
+    if not validators.url(youtube_url):
+        return {**item, "status": "error", "status_code": 400, "error": "Invalid YouTube URL."}
+    video_req = SummarizeRequest(
+        youtube_url=youtube_url,
+        provider=req.provider,
+        max_concurrency=req.max_concurrency,
+        reduce_fan_in=req.reduce_fan_in,
+    )
+    try:
+        return {**item, "status": "ok", **await run_summarize(video_req, llm)}
+    except HTTPException as e:
+        return {**item, "status": "error", "status_code": e.status_code, "error": e.detail}
+    except Exception as e:
+        return {**item, "status": "error", "status_code": 500, "error": f"Summarization failed: {e}"}
+
+
+async def iter_batch_results(req: BatchSummarizeRequest, llm):
+    """
+    Summarize every video of a batch, yielding one result per video as soon as it is done.
+
+    Yields:
+        Result dicts of ``summarize_batch_item``, in completion order
+    """
+    semaphore = asyncio.Semaphore(BATCH_VIDEO_CONCURRENCY)
+
+    async def run(index: int, youtube_url: str) -> dict:
+        async with semaphore:
+            return await summarize_batch_item(req, llm, index, youtube_url)
+
+    tasks = [asyncio.ensure_future(run(index, url)) for index, url in enumerate(req.youtube_urls)]
+    try:
+        for next_result in asyncio.as_completed(tasks):
+            yield await next_result
+    finally:
+        # Client gone: stop the remaining videos
+        for task in tasks:
+            task.cancel()
+
+
+async def batch_lines(req: BatchSummarizeRequest, llm):
+    """NDJSON stream: one line per video in completion order, then a totals line."""
+    failed = 0
+    async for item in iter_batch_results(req, llm):
+        failed += item["status"] == "error"
+        yield json.dumps(item, ensure_ascii=False) + "\n"
+    total = len(req.youtube_urls)
+    yield json.dumps({"done": True, "total": total, "succeeded": total - failed, "failed": failed}) + "\n"
+
+
+async def run_summarize_batch(req: BatchSummarizeRequest, llm, progress=None) -> dict:
+    """Summarize a batch as a job: results in input order, progress counted in videos."""
+    results = []
+    async for item in iter_batch_results(req, llm):
+        results.append(item)
+        if progress is not None:
+            await progress("videos", len(results), len(req.youtube_urls))
+    results.sort(key=lambda item: item["index"])
+    failed = sum(item["status"] == "error" for item in results)
+    return {"results": results, "succeeded": len(results) - failed, "failed": failed}
+
+
+@app.post("/summarize/batch")
+async def summarize_batch(req: BatchSummarizeRequest):
+    """
+    Summarize many videos at once.
+
+    With ``output="ndjson"`` (default) each video's result is streamed as
+    one JSON line as soon as it is done. With ``output="job"`` a job ID is
+    returned; poll GET /jobs/{job_id}.
+    """
+    if not req.youtube_urls:
+        raise HTTPException(status_code=400, detail="No YouTube URLs given.")
+    if len(req.youtube_urls) > BATCH_MAX_VIDEOS:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_MAX_VIDEOS} videos per batch.")
+    if req.output not in ("ndjson", "job"):
+        raise HTTPException(status_code=400, detail='output must be "ndjson" or "job".')
+
+    llm = init_llm(
+        provider=req.provider,
+        api_key=req.api_key,
+        model=req.model,
+        ollama_url=req.ollama_url
+    )
+    if req.output == "job":
+        job = await submit_job("summarize_batch", run_summarize_batch, req, llm)
+        return JSONResponse(status_code=202, content=job)
+    return StreamingResponse(batch_lines(req, llm), media_type="application/x-ndjson")
+
+
+# --------------------------- ENDPOINT: Ingest ---------------------------
+# A playlist or channel is expanded into videos; transcripts are fetched on
+# the YouTube pool (videos already in the transcript cache are not fetched
+# again) while earlier videos are summarized, as in a batch
+INGEST_FETCH_CONCURRENCY = YOUTUBE_MAX_WORKERS
+
+
+async def load_collection(req: IngestRequest) -> dict:
+    """
+    Expand the request's playlist or channel into its videos.
+
+    Raises:
+        HTTPException: 400 for a URL that is not a collection, 501 without yt-dlp
+    """
+    try:
+        return await run_blocking(expand_collection, req.collection_url, req.max_videos)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+
+
+async def iter_ingest_results(req: IngestRequest, llm, collection: dict, progress=None):
+    """
+    Summarize every video of an expanded collection.
+
+    Yields:
+        For each video, in completion order: the ``summarize_batch_item``
+        fields plus "video_id", "title", "transcript" ("cached", "fetched"
+        or "missing") and "progress" (transcripts and summaries done for the
+        whole collection)
+    """
+    videos = collection["videos"]
+    total = len(videos)
+    fetch_semaphore = asyncio.Semaphore(INGEST_FETCH_CONCURRENCY)
+    video_semaphore = asyncio.Semaphore(BATCH_VIDEO_CONCURRENCY)
+    counts = {"transcripts_done": 0, "transcripts_cached": 0, "summaries_done": 0}
+
+    async def report(stage: str, done: int):
+        if progress is not None:
+            await progress(stage, done, total, **counts)
+
+    async def run(index: int, video: dict) -> dict:
+        item = {"video_id": video["video_id"], "title": video["title"]}
+        youtube_url = canonical_url(video["video_id"])
+        try:
+            async with fetch_semaphore:
+                item["transcript"] = await run_blocking(prefetch_transcript, video["video_id"])
+        except Exception as e:
+            item["transcript"] = TRANSCRIPT_MISSING
+            error = (500, f"Transcript fetch failed: {e}")
+        else:
+            error = (404, "No transcript found for this video.") if item["transcript"] == TRANSCRIPT_MISSING else None
+        counts["transcripts_done"] += 1
+        counts["transcripts_cached"] += item["transcript"] == TRANSCRIPT_CACHED
+        await report("transcripts", counts["transcripts_done"])
+
+        if error:
+            result = {"index": index, "youtube_url": youtube_url, "status": "error",
+                      "status_code": error[0], "error": error[1]}
+        else:
+            async with video_semaphore:
+                result = await summarize_batch_item(req, llm, index, youtube_url)
+        counts["summaries_done"] += 1
+        await report("summaries", counts["summaries_done"])
+        return {**result, **item, "progress": {**counts, "total": total}}
+
+    tasks = [asyncio.ensure_future(run(index, video)) for index, video in enumerate(videos)]
+    try:
+        for next_result in asyncio.as_completed(tasks):
+            yield await next_result
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def ingest_lines(req: IngestRequest, llm, collection: dict):
+    """NDJSON stream: the collection, one line per video in completion order, then a totals line."""
+    total = len(collection["videos"])
+    yield json.dumps({"event": "collection", "title": collection["title"], "total": total}, ensure_ascii=False) + "\n"
+    failed = 0
+    async for item in iter_ingest_results(req, llm, collection):
+        failed += item["status"] == "error"
+        yield json.dumps({"event": "video", **item}, ensure_ascii=False) + "\n"
+    yield json.dumps({"event": "done", "total": total, "succeeded": total - failed, "failed": failed}) + "\n"
+
+
+async def run_ingest(req: IngestRequest, llm, progress=None) -> dict:
+    """Ingest a collection as a job: results in collection order."""
+    collection = await load_collection(req)
+    results = [item async for item in iter_ingest_results(req, llm, collection, progress)]
+    results.sort(key=lambda item: item["index"])
+    failed = sum(item["status"] == "error" for item in results)
+    return {"title": collection["title"], "results": results, "succeeded": len(results) - failed, "failed": failed}
+
+
+@app.post("/ingest")
+async def ingest_collection(req: IngestRequest):
+    """
+    Summarize every video of a playlist or channel (requires yt-dlp).
+
+    With ``output="ndjson"`` (default) the collection info and then each
+    video's result are streamed as JSON lines, each carrying the progress of
+    the whole collection. With ``output="job"`` a job ID is returned; poll
+    GET /jobs/{job_id}.
+    """
+    if req.output not in ("ndjson", "job"):
+        raise HTTPException(status_code=400, detail='output must be "ndjson" or "job".')
+    if not 1 <= req.max_videos <= MAX_COLLECTION_VIDEOS:
+        raise HTTPException(status_code=400, detail=f"max_videos must be between 1 and {MAX_COLLECTION_VIDEOS}.")
+
+    llm = init_llm(
+        provider=req.provider,
+        api_key=req.api_key,
+        model=req.model,
+        ollama_url=req.ollama_url
+    )
+    if req.output == "job":
+        job = await submit_job("ingest", run_ingest, req, llm)
+        return JSONResponse(status_code=202, content=job)
+    collection = await load_collection(req)
+    return StreamingResponse(ingest_lines(req, llm, collection), media_type="application/x-ndjson")
+
+
+# --------------------------- ENDPOINT: Cache Stats ---------------------------
+@app.get("/cache/stats")
+async def cache_stats():
+    """Hit/miss counters and sizes of the LLM response and transcript caches, LLM client reuse and coalesced requests."""
+    llm_stats, transcript_stats = await asyncio.gather(
+        asyncio.to_thread(get_llm_cache().stats),
+        asyncio.to_thread(get_transcript_cache().stats),
+    )
+    return {
+        "llm_responses": llm_stats,
+        "transcripts": transcript_stats,
+        "llm_clients": get_client_registry().stats(),
+        "coalescing": get_single_flight().stats(),
+    }
+
+
+# --------------------------- ENDPOINT: Metrics ---------------------------
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """
+    Request counts and latencies per endpoint, per-stage latencies, LLM
+    calls, tokens, retries and 429s per provider/model, in the Prometheus
+    text format (scrape it, or read it with curl).
+    """
+    return PlainTextResponse(metrics.render_metrics(), media_type=metrics.CONTENT_TYPE)
+
+
+# --------------------------- HEALTH CHECK ---------------------------
+@app.get("/")
+async def home():
+    return {"message": "🎬 YouTube Summarizer API is running!"}
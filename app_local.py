@@ -6,14 +6,20 @@ import streamlit as st
 from langchain.prompts import PromptTemplate
 from langchain_community.llms import Ollama  # Utilisation d'Ollama au lieu de Groq
 from langchain.chains.summarize import load_summarize_chain
-from langchain_community.document_loaders import YoutubeLoader
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from youtube_search import YoutubeSearch
+from transcript_cache import load_transcript, extract_video_id
+from llm_cache import cached
+from chunking import split_text, preload_encodings
+from pipeline import reduce_summaries_sync
 import re
 import os
 import json
 from datetime import datetime
 
+# Tokenizer files are loaded once per process (cached), not on the first summary
+preload_encodings()
+
 # --------------------------- CONFIGURATION OLLAMA ---------------------------
 CONFIG_FILE = "config_local.json"
 
@@ -82,8 +88,6 @@ if 'theme' not in st.session_state:
     st.session_state.theme = "Light"
 if 'summary' not in st.session_state:
     st.session_state.summary = ""
-if 'docs' not in st.session_state:
-    st.session_state.docs = []
 if 'translation_output' not in st.session_state:
     st.session_state.translation_output = ""
 if 'notes_output' not in st.session_state:
@@ -146,9 +150,24 @@ ollama pull llama3.1:8b
 ollama serve
     """)
 
+# --- CROSS-SESSION CACHES ---
+# Shared by every rerun and session, so widget interactions don't rebuild the client
+TRANSCRIPT_CACHE_TTL_SECONDS = 3600
+
+@st.cache_resource(max_entries=8, show_spinner=False)
+def get_ollama_llm(base_url, model):
+    """Ollama LLM for a server URL and model; repeated prompts are answered from the local LLM response cache."""
+    return cached(Ollama(base_url=base_url, model=model), "ollama", model, base_url)
+
+@st.cache_data(ttl=TRANSCRIPT_CACHE_TTL_SECONDS, max_entries=64, show_spinner=False)
+def get_transcript_text(key):
+    """Full transcript text of a video ("" if it has none), keyed by video ID (or URL for unknown forms)."""
+    docs = load_transcript(key)
+    return " ".join(doc.page_content for doc in docs).strip()
+
 # --- LLM INITIALIZATION ---
 try:
-    llm = Ollama(base_url=ollama_url, model=model_name)
+    llm = get_ollama_llm(ollama_url, model_name)
     llm_available = True
 except Exception as e:
     llm_available = False
@@ -214,27 +233,18 @@ if llm_available:
 
             with st.spinner("⏳ Récupération de la transcription et génération du résumé..."):
                 try:
-                    loader = YoutubeLoader.from_youtube_url(
-                        youtube_url,
-                        add_video_info=False,
-                        language=['fr', 'en', 'es', 'de', 'it', 'pt', 'ru', 'ja', 'ko', 'zh-Hans', 'ar', 'hi', 'nl', 'pl', 'tr', 'sv', 'no', 'da', 'fi']
-                    )
-                    docs = loader.load()
-                    if not docs or not any(doc.page_content.strip() for doc in docs):
+                    # Transcript is cached by video ID
+                    video_key = extract_video_id(youtube_url) or youtube_url
+                    full_text = get_transcript_text(video_key)
+                    if not full_text:
                         st.error("❌ Aucune transcription disponible pour cette vidéo.")
                     else:
-                        # Get the full transcript text
-                        full_text = " ".join([doc.page_content for doc in docs])
 
-                        # Simple chunking
-                        chunk_size = 2500
-                        chunks = []
-                        for i in range(0, len(full_text), chunk_size):
-                            chunk = full_text[i:i + chunk_size]
-                            chunks.append(chunk)
+                        # Token-aware chunking on sentence boundaries, sized for Ollama's context
+                        chunks = split_text(full_text, "ollama", model_name)
 
                         # If short, summarize directly
-                        if len(full_text) < 3000:
+                        if len(chunks) <= 1:
                             result = llm.invoke(map_prompt.format(text=full_text))
                             summary = result.strip()
                         else:
@@ -247,26 +257,10 @@ if llm_available:
                                 progress_bar.progress((idx + 1) / len(chunks))
                             progress_bar.empty()
 
-                            # Combine
-                            combined_text = "\n\n".join(chunk_summaries)
-
-                            if len(combined_text) > 3000:
-                                final_chunks = []
-                                for i in range(0, len(combined_text), 2500):
-                                    final_chunks.append(combined_text[i:i + 2500])
-
-                                final_summaries = []
-                                for chunk in final_chunks:
-                                    result = llm.invoke(combine_prompt.format(text=chunk))
-                                    final_summaries.append(result.strip())
-
-                                summary = " ".join(final_summaries)
-                            else:
-                                result = llm.invoke(combine_prompt.format(text=combined_text))
-                                summary = result.strip()
+                            # Combine into one summary; too long for one call -> reduce tree
+                            summary = reduce_summaries_sync(llm, chunk_summaries, combine_prompt)["summary"]
 
                         st.session_state.summary = summary
-                        st.session_state.docs = docs
                         st.success("✅ Résumé généré avec succès !")
                 except Exception as e:
                     st.warning(f"⚠️ Erreur : {e}")
@@ -0,0 +1,141 @@
+"""
+Background tasks for the Streamlit app.
+
+Streamlit runs the whole script again on every widget interaction and stops
+the run in progress, which would throw away LLM work already paid for. Long
+operations (summary, notes, translation) run instead on a thread pool shared
+by every session of the process. A session only keeps task IDs: it polls a
+task's progress and picks up its result on a later rerun.
+
+Task functions run outside the Streamlit script thread and must not call
+``st`` APIs; they report progress through the callback they are given. With
+``TRACE_FILE`` set, each task is traced (see ``tracing``).
+"""
+
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from job_store import STATUS_FAILED, STATUS_QUEUED, STATUS_RUNNING, STATUS_SUCCEEDED
+from tracing import start_trace
+
+# --------------------------- CONFIG ---------------------------
+TASK_WORKERS = int(os.environ.get("STREAMLIT_TASK_WORKERS", "4"))
+# Finished tasks nobody picked up (closed tab) are dropped after this long
+TASK_RETENTION_SECONDS = int(os.environ.get("STREAMLIT_TASK_RETENTION_MINUTES", "60")) * 60
+
+FINISHED_STATUSES = (STATUS_SUCCEEDED, STATUS_FAILED)
+
+
+class TaskRunner:
+    """Thread pool running tasks keyed by what they compute, with pollable progress."""
+
+    def __init__(self, max_workers: int = TASK_WORKERS, retention_seconds: int = TASK_RETENTION_SECONDS):
+        self.retention_seconds = retention_seconds
+        self.started = {}  # operation (first item of the key) -> tasks started
+        self.coalesced = {}  # operation -> submissions that joined a task in flight
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="streamlit-task")
+        self._tasks = {}  # task ID -> task dict
+        self._active = {}  # key -> ID of its queued or running task
+        self._lock = threading.Lock()
+
+    def submit(self, key: tuple, fn, *args) -> str:
+        """
+        Run ``fn(*args, progress=callback)`` in the background.
+
+        If a task with the same ``key`` is still queued or running, its ID is
+        returned instead of starting the same work twice (e.g. many sessions
+        analyzing a freshly shared video). ``key`` starts with the operation
+        name. ``callback(stage, done, total)`` records progress.
+
+        Returns:
+            Task ID
+        """
+        now = time.time()
+        with self._lock:
+            self._prune(now)
+            operation = key[0]
+            task_id = self._active.get(key)
+            if task_id is not None:
+                self.coalesced[operation] = self.coalesced.get(operation, 0) + 1
+                return task_id
+            self.started[operation] = self.started.get(operation, 0) + 1
+            task_id = uuid.uuid4().hex
+            self._tasks[task_id] = {
+                "status": STATUS_QUEUED,
+                "stage": None,
+                "done": 0,
+                "total": 0,
+                "result": None,
+                "error": None,
+                "updated_at": now,
+            }
+            self._active[key] = task_id
+        self._executor.submit(self._run, key, task_id, fn, args)
+        return task_id
+
+    def _update(self, task_id: str, **fields):
+        with self._lock:
+            task = self._tasks.get(task_id)
+            if task is not None:
+                task.update(fields, updated_at=time.time())
+
+    def _run(self, key: tuple, task_id: str, fn, args):
+        self._update(task_id, status=STATUS_RUNNING)
+
+        def progress(stage, done, total):
+            self._update(task_id, stage=stage, done=done, total=total)
+
+        try:
+            with start_trace(key[0], task_id=task_id):
+                result = fn(*args, progress=progress)
+        except Exception as e:
+            self._update(task_id, status=STATUS_FAILED, error=str(e))
+        else:
+            self._update(task_id, status=STATUS_SUCCEEDED, result=result)
+        finally:
+            with self._lock:
+                if self._active.get(key) == task_id:
+                    del self._active[key]
+
+    def _prune(self, now: float):
+        for task_id in [
+            task_id for task_id, task in self._tasks.items()
+            if task["status"] in FINISHED_STATUSES and now - task["updated_at"] > self.retention_seconds
+        ]:
+            del self._tasks[task_id]
+
+    def get(self, task_id: str):
+        """
+        Snapshot of a task.
+
+        Returns:
+            Dict with "status", "stage", "done", "total", "result" and
+            "error", or None for an unknown or expired task
+        """
+        with self._lock:
+            task = self._tasks.get(task_id)
+            return dict(task) if task is not None else None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "in_flight": len(self._active),
+                "started": dict(self.started),
+                "coalesced": dict(self.coalesced),
+            }
+
+
+_default_runner = None
+_default_runner_lock = threading.Lock()
+
+
+def get_task_runner() -> TaskRunner:
+    """Process-wide task runner (created on first use)."""
+    global _default_runner
+    with _default_runner_lock:
+        if _default_runner is None:
+            _default_runner = TaskRunner()
+        return _default_runner
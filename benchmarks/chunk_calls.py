@@ -0,0 +1,120 @@
+"""
+LLM call count: fixed 1200-character slicing vs. the token-aware chunker.
+
+For typical transcript lengths (spoken English runs at ~150 words, about
+900 characters, per minute) this counts the map and reduce calls each
+strategy makes for /summarize, and the tokens it sends. Map outputs are
+modelled as 25% of their input, capped at the reserved output tokens.
+
+    python benchmarks/chunk_calls.py
+    python benchmarks/chunk_calls.py --json
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chunking import PROMPT_OVERHEAD_TOKENS, count_tokens, split_text
+from rate_limiter import DEFAULT_OUTPUT_TOKENS
+
+CHARS_PER_MINUTE = 900
+DURATIONS_MINUTES = [5, 15, 30, 60, 120, 180, 600]
+MODELS = [
+    ("groq", "llama-3.1-8b-instant"),
+    ("groq", "llama-3.3-70b-versatile"),
+    ("openai", "gpt-4o-mini"),
+    ("claude", None),
+    ("ollama", "llama3.1:8b"),
+]
+MAP_OUTPUT_RATIO = 0.25
+
+WORDS = (
+    "the a model video we this talk about data people really think going "
+    "because system example important point question right actually know "
+    "time work first next result change problem simple better value"
+).split()
+
+
+def make_transcript(minutes: int, seed: int = 0) -> str:
+    """Deterministic caption-like text of roughly ``minutes`` of speech."""
+    rng = random.Random(seed)
+    target = minutes * CHARS_PER_MINUTE
+    sentences, length = [], 0
+    while length < target:
+        sentence = " ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 18))).capitalize() + "."
+        sentences.append(sentence)
+        length += len(sentence) + 1
+    return " ".join(sentences)
+
+
+def map_output_chars(chunk_chars: int) -> int:
+    return min(int(chunk_chars * MAP_OUTPUT_RATIO), DEFAULT_OUTPUT_TOKENS * 4)
+
+
+def fixed_slicing(text: str) -> dict:
+    """Call pattern of the original 1200-character pipeline."""
+    if len(text) < 2000:
+        return {"calls": 1, "tokens_sent": count_tokens(text) + PROMPT_OVERHEAD_TOKENS}
+    chunks = [text[i:i + 1200] for i in range(0, len(text), 1200)]
+    combined = sum(map_output_chars(len(c)) + 2 for c in chunks)
+    reduce_calls = math.ceil(combined / 1200) if combined > 2000 else 1
+    tokens = sum(count_tokens(c) for c in chunks) + combined // 4 + (len(chunks) + reduce_calls) * PROMPT_OVERHEAD_TOKENS
+    return {"calls": len(chunks) + reduce_calls, "tokens_sent": tokens}
+
+
+def token_aware(text: str, provider: str, model: str) -> dict:
+    """Call pattern with chunks sized by split_text for the model."""
+    chunks = split_text(text, provider, model)
+    if len(chunks) <= 1:
+        return {"calls": 1, "tokens_sent": count_tokens(text) + PROMPT_OVERHEAD_TOKENS}
+    combined = "x" * sum(map_output_chars(len(c)) + 2 for c in chunks)
+    reduce_calls = max(1, len(split_text(combined, provider, model)))
+    tokens = sum(count_tokens(c) for c in chunks) + count_tokens(combined) + (len(chunks) + reduce_calls) * PROMPT_OVERHEAD_TOKENS
+    return {"calls": len(chunks) + reduce_calls, "tokens_sent": tokens}
+
+
+def run() -> list:
+    rows = []
+    for minutes in DURATIONS_MINUTES:
+        text = make_transcript(minutes, seed=minutes)
+        baseline = fixed_slicing(text)
+        for provider, model in MODELS:
+            new = token_aware(text, provider, model)
+            rows.append({
+                "minutes": minutes,
+                "chars": len(text),
+                "provider": provider,
+                "model": model or "default",
+                "fixed_calls": baseline["calls"],
+                "token_aware_calls": new["calls"],
+                "call_reduction": round(1 - new["calls"] / baseline["calls"], 3),
+                "fixed_tokens_sent": baseline["tokens_sent"],
+                "token_aware_tokens_sent": new["tokens_sent"],
+            })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--json", action="store_true", help="Print machine-readable JSON")
+    rows = run()
+    if parser.parse_args().json:
+        print(json.dumps(rows, indent=2))
+        return
+
+    print(f"{'min':>5} {'chars':>8}  {'model':<32} {'fixed':>6} {'aware':>6} {'saved':>6} {'tok fixed':>10} {'tok aware':>10}")
+    for row in rows:
+        print(
+            f"{row['minutes']:>5} {row['chars']:>8}  {row['provider'] + '/' + row['model']:<32} "
+            f"{row['fixed_calls']:>6} {row['token_aware_calls']:>6} {row['call_reduction']:>6.0%} "
+            f"{row['fixed_tokens_sent']:>10} {row['token_aware_tokens_sent']:>10}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Per-call latency: a new LLM client per request vs. clients from the registry.
+
+Starts a local OpenAI-compatible stub server (the endpoint ChatGroq talks
+to) that answers chat completions after a fixed service time and charges an
+extra delay on every new connection, standing in for the TCP + TLS handshake
+to a remote provider. Each scenario makes sequential calls through a
+ChatGroq client pointed at the stub:
+
+- ``new_client``: a client built for every call, like the API did per request
+- ``registry``: the client from LLMClientRegistry, so its keep-alive
+  connection pool is reused
+
+Runs offline, no API key needed:
+
+    python benchmarks/client_reuse.py --calls 50 --handshake-ms 80
+    python benchmarks/client_reuse.py --json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_groq import ChatGroq
+
+from llm_registry import LLMClientRegistry
+
+MODEL = "llama-3.1-8b-instant"
+API_KEY = "gsk_benchmark"
+
+
+def make_handler(service_s: float, handshake_s: float, counters: dict):
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # Keep connections open between requests
+
+        def setup(self):
+            super().setup()
+            counters["connections"] += 1
+            time.sleep(handshake_s)
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            time.sleep(service_s)
+            body = json.dumps({
+                "id": "chatcmpl-stub",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": MODEL,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": "stub summary"},
+                    "finish_reason": "stop",
+                }],
+                "usage": {"prompt_tokens": 10, "completion_tokens": 2, "total_tokens": 12},
+            }).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return StubHandler
+
+
+def stub_client_factory(stub_url: str):
+    """Registry factory building ChatGroq clients that talk to the stub server."""
+    def factory(provider, model, api_key=None, base_url=None):
+        return ChatGroq(model=model, api_key=api_key, groq_api_base=stub_url, max_retries=0)
+    return factory
+
+
+def measure(call, calls: int) -> list:
+    latencies = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        call()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def run(calls: int, service_ms: float, handshake_ms: float) -> list:
+    counters = {"connections": 0}
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(service_ms / 1000, handshake_ms / 1000, counters))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    factory = stub_client_factory(base_url)
+    registry = LLMClientRegistry(factory=factory)
+
+    scenarios = {
+        "new_client": lambda: factory("groq", MODEL, api_key=API_KEY).invoke("Summarize: hello"),
+        "registry": lambda: registry.get("groq", MODEL, api_key=API_KEY).invoke("Summarize: hello"),
+    }
+    rows = []
+    try:
+        for name, call in scenarios.items():
+            call()  # Warm-up: imports and, for the registry, the first connection
+            counters["connections"] = 0
+            latencies = measure(call, calls)
+            rows.append({
+                "scenario": name,
+                "calls": calls,
+                "connections": counters["connections"],
+                "mean_ms": round(statistics.mean(latencies), 1),
+                "p50_ms": round(statistics.median(latencies), 1),
+                "max_ms": round(max(latencies), 1),
+            })
+    finally:
+        server.shutdown()
+        server.server_close()
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=30, help="Sequential calls per scenario")
+    parser.add_argument("--service-ms", type=float, default=20, help="Stub response time per call")
+    parser.add_argument("--handshake-ms", type=float, default=60, help="Extra delay on each new connection")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable JSON")
+    args = parser.parse_args()
+
+    rows = run(args.calls, args.service_ms, args.handshake_ms)
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return
+
+    print(f"{'scenario':<12} {'calls':>6} {'conns':>6} {'mean ms':>9} {'p50 ms':>9} {'max ms':>9}")
+    for row in rows:
+        print(
+            f"{row['scenario']:<12} {row['calls']:>6} {row['connections']:>6} "
+            f"{row['mean_ms']:>9} {row['p50_ms']:>9} {row['max_ms']:>9}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Event-loop responsiveness check for app_api.py.
+
+Fires N concurrent /summarize requests against the ASGI app (in-process, same
+event loop) while polling the health check ``/``. If any endpoint blocks the
+loop, ``/`` latency climbs with the number of summaries in flight; with the
+non-blocking request path it stays flat.
+
+The LLM and YoutubeLoader are replaced by local stand-ins that sleep, so the
+script runs offline and costs nothing:
+
+    python benchmarks/event_loop_latency.py --summaries 20
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from langchain.schema import Document
+from langchain_core.messages import AIMessage
+
+import app_api
+import transcript_cache
+
+
+class SleepyLLM:
+    """Chat-model stand-in: ``invoke`` blocks, ``ainvoke`` yields to the loop."""
+
+    # Read by the pipeline to size chunks and label metrics
+    provider = "groq"
+    model = "llama-3.1-8b-instant"
+
+    def __init__(self, latency):
+        self.latency = latency
+
+    def invoke(self, prompt, **kwargs):
+        time.sleep(self.latency)
+        return AIMessage(content="chunk summary")
+
+    async def ainvoke(self, prompt, **kwargs):
+        await asyncio.sleep(self.latency)
+        return AIMessage(content="chunk summary")
+
+
+class SleepyLoader:
+    """YoutubeLoader stand-in whose ``load`` blocks like the real network call."""
+
+    latency = 0.5
+    transcript = "This is one sentence of a long transcript. " * 1500
+
+    def __init__(self, video_id=None, **kwargs):
+        pass
+
+    @classmethod
+    def from_youtube_url(cls, url, **kwargs):
+        return cls()
+
+    def load(self):
+        time.sleep(self.latency)
+        return [Document(page_content=self.transcript)]
+
+
+class NoCache:
+    def get(self, video_id):
+        return None
+
+    def put(self, video_id, docs):
+        pass
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def poll_health(client, stop, samples, interval):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await client.get("/")
+        samples.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(interval)
+
+
+async def run(args):
+    # Every request must pay for the fetch: bypass the transcript cache
+    transcript_cache.YoutubeLoader = SleepyLoader
+    transcript_cache.get_transcript_cache = lambda: NoCache()
+    SleepyLoader.latency = args.transcript_latency
+    app_api.init_llm = lambda **kwargs: SleepyLLM(args.llm_latency)
+
+    transport = httpx.ASGITransport(app=app_api.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        # Baseline: health check latency with nothing else running
+        idle_samples = []
+        stop = asyncio.Event()
+        poller = asyncio.create_task(poll_health(client, stop, idle_samples, args.interval))
+        await asyncio.sleep(1)
+        stop.set()
+        await poller
+
+        # Under load: N summaries in flight at once
+        busy_samples = []
+        stop = asyncio.Event()
+        poller = asyncio.create_task(poll_health(client, stop, busy_samples, args.interval))
+        # Distinct videos, so the requests are not coalesced into one run
+        payloads = [
+            {"youtube_url": f"https://www.youtube.com/watch?v=bench{index:06d}", "api_key": "bench"}
+            for index in range(args.summaries)
+        ]
+        start = time.perf_counter()
+        responses = await asyncio.gather(*(client.post("/summarize", json=payload) for payload in payloads))
+        elapsed = time.perf_counter() - start
+        stop.set()
+        await poller
+
+    failures = [r for r in responses if r.status_code != 200]
+    print(f"summaries in flight : {args.summaries} ({len(failures)} failed, {elapsed:.2f}s wall)")
+    for label, samples in (("idle", idle_samples), ("under load", busy_samples)):
+        print(
+            f"GET / {label:<11}: n={len(samples):<4} "
+            f"p50={statistics.median(samples):7.2f} ms  "
+            f"p95={percentile(samples, 95):7.2f} ms  "
+            f"max={max(samples):7.2f} ms"
+        )
+    if failures:
+        # Failed summaries leave nothing in flight: the "under load" numbers mean nothing
+        sys.exit(f"{len(failures)} summaries failed (first: HTTP {failures[0].status_code} {failures[0].text[:200]})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--summaries", type=int, default=20, help="Concurrent /summarize requests")
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="Seconds per fake LLM call")
+    parser.add_argument("--transcript-latency", type=float, default=0.5, help="Seconds per fake transcript fetch")
+    parser.add_argument("--interval", type=float, default=0.05, help="Seconds between health checks")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+Deterministic fake LLM for offline benchmarks.
+
+``FakeLLM`` stands in for a client returned by ``create_llm``: it exposes
+``invoke``, ``ainvoke`` and ``astream`` and answers with ``AIMessage``s
+carrying ``usage_metadata``, so the rate limiter, response cache, metrics
+and traces see it like a real provider. Each call sleeps for a simulated
+provider time:
+
+    latency + input tokens / prefill rate + output tokens / generation rate
+
+(multiplied by ``time_scale`` to keep long fixtures quick). A configurable
+share of prompts is answered once with a 429 carrying a retry hint, like
+Groq's "Please try again in 120ms"; which prompts fail depends only on
+their text, so runs are reproducible whatever the call order.
+"""
+
+import asyncio
+import hashlib
+import random
+import threading
+import time
+
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+from rate_limiter import estimate_tokens
+
+WORDS = (
+    "model", "summary", "video", "topic", "speaker", "explains", "key", "idea", "data", "example",
+    "result", "process", "important", "first", "then", "finally", "shows", "because", "system", "value",
+)
+
+
+class RateLimitError(Exception):
+    """Simulated provider 429 (recognized by ``rate_limiter.is_rate_limit_error``)."""
+
+    status_code = 429
+
+
+class FakeLLM:
+    """
+    Fake chat model with simulated latency, token rates and 429s.
+
+    Args:
+        latency_ms: Fixed time per call (network + queueing)
+        prefill_tokens_per_s: Input tokens processed per second
+        output_tokens_per_s: Output tokens generated per second
+        output_ratio: Output tokens as a share of input tokens...
+        min_output_tokens: ...bounded below...
+        max_output_tokens: ...and above
+        rate_limit_rate: Share of prompts whose first attempt gets a 429
+        retry_after_ms: Retry hint sent with each 429
+        time_scale: Multiplier applied to every simulated delay
+    """
+
+    def __init__(self, latency_ms: float = 250, prefill_tokens_per_s: float = 5000, output_tokens_per_s: float = 250,
+                 output_ratio: float = 0.1, min_output_tokens: int = 40, max_output_tokens: int = 400,
+                 rate_limit_rate: float = 0.0, retry_after_ms: float = 200, time_scale: float = 1.0):
+        self.latency_ms = latency_ms
+        self.prefill_tokens_per_s = prefill_tokens_per_s
+        self.output_tokens_per_s = output_tokens_per_s
+        self.output_ratio = output_ratio
+        self.min_output_tokens = min_output_tokens
+        self.max_output_tokens = max_output_tokens
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after_ms = retry_after_ms
+        self.time_scale = time_scale
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Zero the counters (and forget which prompts already got their 429)."""
+        with self._lock:
+            self.calls = 0
+            self.rate_limited = 0
+            self.input_tokens = 0
+            self.output_tokens = 0
+            self.in_flight = 0
+            self.max_in_flight = 0
+            self._throttled = set()
+
+    def stats(self) -> dict:
+        """Counters since the last ``reset`` ("calls" includes the attempts answered with a 429)."""
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "rate_limited": self.rate_limited,
+                "input_tokens": self.input_tokens,
+                "output_tokens": self.output_tokens,
+                "max_in_flight": self.max_in_flight,
+            }
+
+    def _plan(self, prompt) -> tuple:
+        """Count the call; return (response text, input tokens, output tokens, delay) or raise a 429."""
+        text = prompt if isinstance(prompt, str) else str(prompt)
+        digest = hashlib.sha256(text.encode("utf-8")).digest()
+        input_tokens = estimate_tokens(text)
+        with self._lock:
+            self.calls += 1
+            throttle = int.from_bytes(digest[:4], "big") / 2 ** 32 < self.rate_limit_rate
+            if throttle and digest not in self._throttled:
+                self._throttled.add(digest)
+                self.rate_limited += 1
+                raise RateLimitError(
+                    f"Error code: 429 - Rate limit reached. Please try again in {self.retry_after_ms:g}ms."
+                )
+            self.input_tokens += input_tokens
+
+        output_tokens = int(min(self.max_output_tokens, max(self.min_output_tokens, input_tokens * self.output_ratio)))
+        with self._lock:
+            self.output_tokens += output_tokens
+        rng = random.Random(digest)
+        words = [rng.choice(WORDS) for _ in range(max(1, output_tokens * 3 // 4))]
+        content = " ".join(words).capitalize() + "."
+        delay = (
+            self.latency_ms / 1000
+            + input_tokens / self.prefill_tokens_per_s
+            + output_tokens / self.output_tokens_per_s
+        ) * self.time_scale
+        return content, input_tokens, output_tokens, delay
+
+    def _usage(self, input_tokens: int, output_tokens: int) -> dict:
+        return {"input_tokens": input_tokens, "output_tokens": output_tokens,
+                "total_tokens": input_tokens + output_tokens}
+
+    def _enter(self):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def _exit(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def invoke(self, prompt, **kwargs):
+        content, input_tokens, output_tokens, delay = self._plan(prompt)
+        self._enter()
+        try:
+            time.sleep(delay)
+        finally:
+            self._exit()
+        return AIMessage(content=content, usage_metadata=self._usage(input_tokens, output_tokens))
+
+    async def ainvoke(self, prompt, **kwargs):
+        content, input_tokens, output_tokens, delay = self._plan(prompt)
+        self._enter()
+        try:
+            await asyncio.sleep(delay)
+        finally:
+            self._exit()
+        return AIMessage(content=content, usage_metadata=self._usage(input_tokens, output_tokens))
+
+    async def astream(self, prompt, **kwargs):
+        """Yield the response in a few chunks spread over the simulated time; usage comes with the last one."""
+        content, input_tokens, output_tokens, delay = self._plan(prompt)
+        words = content.split(" ")
+        pieces = [" ".join(words[i:i + 8]) + " " for i in range(0, len(words), 8)]
+        self._enter()
+        try:
+            for index, piece in enumerate(pieces):
+                await asyncio.sleep(delay / len(pieces))
+                last = index == len(pieces) - 1
+                yield AIMessageChunk(
+                    content=piece.rstrip() if last else piece,
+                    usage_metadata=self._usage(input_tokens, output_tokens) if last else None,
+                )
+        finally:
+            self._exit()
+
+
+def fake_client_factory(llm: FakeLLM):
+    """``LLMClientRegistry`` factory returning ``llm`` for every provider/model/key."""
+    def factory(provider, model, api_key=None, base_url=None):
+        return llm
+    return factory
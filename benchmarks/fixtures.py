@@ -0,0 +1,88 @@
+"""
+Transcript fixtures and a stubbed ``YoutubeLoader`` for offline benchmarks.
+
+Transcripts are generated, not stored: ``make_transcript(minutes, seed)``
+returns speech-like text at SPEECH_WORDS_PER_MINUTE, the same for the same
+arguments. Fixture video IDs encode both (``fixture_video_id``), so the stub
+loader can rebuild any transcript from its ID, and a new seed gives a video
+no cache has seen yet.
+"""
+
+import random
+import time
+
+from langchain.schema import Document
+
+SPEECH_WORDS_PER_MINUTE = 150
+
+# Fixture name -> video length in minutes
+FIXTURES = {
+    "2m": 2,
+    "10m": 10,
+    "30m": 30,
+    "1h": 60,
+    "3h": 180,
+    "10h": 600,
+}
+
+VOCABULARY = (
+    "the", "a", "we", "you", "this", "that", "is", "are", "so", "and", "but", "because", "data", "model", "video",
+    "people", "time", "really", "going", "to", "look", "at", "how", "it", "works", "in", "practice", "example",
+    "important", "problem", "solution", "first", "next", "then", "finally", "think", "about", "system", "question",
+    "answer", "result", "research", "process", "value", "change", "learn", "build", "start", "simple", "way",
+)
+
+
+def make_transcript(minutes: float, seed: int = 0) -> str:
+    """Speech-like transcript text for a video of ``minutes`` minutes."""
+    rng = random.Random(f"{minutes}:{seed}")
+    words_left = max(1, int(minutes * SPEECH_WORDS_PER_MINUTE))
+    sentences = []
+    while words_left > 0:
+        length = min(words_left, rng.randint(6, 24))
+        words = rng.choices(VOCABULARY, k=length)
+        sentences.append(" ".join(words).capitalize() + rng.choice((".", ".", ".", "?", "!")))
+        words_left -= length
+    return " ".join(sentences)
+
+
+def fixture_video_id(minutes: int, seed: int = 0) -> str:
+    """11-character video ID encoding a fixture length and seed, e.g. "00600m00003"."""
+    return f"{int(minutes):05d}m{int(seed) % 100000:05d}"
+
+
+def parse_video_id(video_id: str) -> tuple:
+    """(minutes, seed) of a ``fixture_video_id``."""
+    return int(video_id[:5]), int(video_id[6:])
+
+
+class StubYoutubeLoader:
+    """
+    Drop-in for ``langchain_community``'s YoutubeLoader serving fixture transcripts.
+
+    ``latency_s`` simulates the YouTube round trip of each load.
+    """
+
+    latency_s = 0.0
+    loads = 0
+
+    def __init__(self, video_id: str, add_video_info: bool = False, language=None, **kwargs):
+        self.video_id = video_id
+
+    @classmethod
+    def from_youtube_url(cls, youtube_url: str, **kwargs):
+        return cls(youtube_url.rstrip("/").split("=")[-1].split("/")[-1][:11], **kwargs)
+
+    def load(self) -> list:
+        StubYoutubeLoader.loads += 1
+        if self.latency_s:
+            time.sleep(self.latency_s)
+        minutes, seed = parse_video_id(self.video_id)
+        return [Document(page_content=make_transcript(minutes, seed), metadata={"source": self.video_id})]
+
+
+def install_stub_loader(latency_s: float = 0.0):
+    """Make ``transcript_cache.load_transcript`` use the stub loader."""
+    import transcript_cache
+    StubYoutubeLoader.latency_s = latency_s
+    transcript_cache.YoutubeLoader = StubYoutubeLoader
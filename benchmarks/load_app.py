@@ -0,0 +1,21 @@
+"""
+``app_api`` with the stubbed YoutubeLoader, for load tests.
+
+uvicorn entry point serving the real API, except that transcripts come from
+``fixtures`` (video IDs made by ``fixture_video_id``) instead of YouTube, so
+a load test needs no network. ``LOADTEST_TRANSCRIPT_MS`` sets the simulated
+transcript load time. ``load_test.py`` starts it; to run it by hand:
+
+    uvicorn load_app:app --app-dir benchmarks --workers 4 --port 8000
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fixtures import install_stub_loader
+
+install_stub_loader(float(os.environ.get("LOADTEST_TRANSCRIPT_MS", "300")) / 1000)
+
+from app_api import app  # After the loader is swapped
@@ -0,0 +1,349 @@
+"""
+Load test of app_api.py under uvicorn, against a local Ollama stub.
+
+Starts ``ollama_stub.OllamaStub`` and ``uvicorn load_app:app`` with
+``--workers`` worker processes (the real API, with transcripts served by the
+stubbed YoutubeLoader), then drives one endpoint at increasing concurrency:
+at each level, that many clients send requests back to back for
+``--duration`` seconds. Each request is for a video no earlier request has
+used (unless ``--videos`` is set), so caches and request coalescing do not
+hide the work. Runs offline, no API key needed:
+
+    python benchmarks/load_test.py --workers 4 --concurrency 1,2,4,8,16,32
+    python benchmarks/load_test.py --endpoint notes --fixture 30m --parallel 8 --output load.json
+    python benchmarks/load_test.py --url http://127.0.0.1:8000 --ollama-url http://127.0.0.1:11434
+
+For each level it reports throughput, latency percentiles, error rate (HTTP
+errors, timeouts, connection failures) and what the stub saw (generations
+running and queued, 503s), then the saturation point: the last level before
+throughput stops growing by ``--min-gain`` or errors pass
+``--max-error-rate``. The stub's ``--parallel``, ``--output-tps`` etc. set
+how much the simulated GPU can serve; the app's own limits (Ollama
+concurrency per worker in ``rate_limiter``, map concurrency, YouTube pool)
+apply as in production.
+
+``--url`` targets a server started by hand (``uvicorn load_app:app
+--app-dir benchmarks ...``); ``--ollama-url`` an Ollama server or stub
+already running, whose counters are then not reported.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, ROOT)
+
+import httpx
+
+from fixtures import FIXTURES, fixture_video_id, make_transcript
+from ollama_stub import OllamaStub
+from pipeline_bench import SUMMARY_SHARE, environment
+
+ENDPOINTS = ("summarize", "notes", "translate")
+
+
+def percentile(values: list, share: float) -> float:
+    """Nearest-rank percentile (``share`` in 0..1) of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(share * len(ordered)) - 1))]
+
+
+class LoadTest:
+    """Closed-loop clients sending one kind of request to the API."""
+
+    def __init__(self, base_url: str, endpoint: str, minutes: int, model: str, ollama_url: str,
+                 languages: list, videos: int, timeout: float, stub: OllamaStub = None):
+        self.base_url = base_url
+        self.endpoint = endpoint
+        self.minutes = minutes
+        self.model = model
+        self.ollama_url = ollama_url
+        self.languages = languages
+        self.videos = videos
+        self.timeout = timeout
+        self.stub = stub
+        # Fixture seeds wrap at 100000; a random start keeps reruns against a warm server cold
+        self._first_seed = random.randrange(100000)
+        self._sent = 0
+
+    def next_request(self) -> tuple:
+        """(path, JSON body) of the next request."""
+        from transcript_cache import canonical_url
+        seed = self._first_seed + (self._sent % self.videos if self.videos else self._sent)
+        self._sent += 1
+        body = {"provider": "ollama", "model": self.model, "ollama_url": self.ollama_url}
+        if self.endpoint == "translate":
+            summary = make_transcript(self.minutes * SUMMARY_SHARE, seed)
+            return "/translate", {**body, "summary_text": summary, "target_languages": self.languages}
+        return f"/{self.endpoint}", {**body, "youtube_url": canonical_url(fixture_video_id(self.minutes, seed))}
+
+    async def send(self, client: httpx.AsyncClient) -> tuple:
+        """(latency, outcome): the HTTP status, "timeout" or the connection error."""
+        path, body = self.next_request()
+        start = time.perf_counter()
+        try:
+            response = await client.post(path, json=body)
+            outcome = str(response.status_code)
+        except httpx.TimeoutException:
+            outcome = "timeout"
+        except httpx.HTTPError as e:
+            outcome = type(e).__name__
+        return time.perf_counter() - start, outcome
+
+    def client(self, concurrency: int) -> httpx.AsyncClient:
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        return httpx.AsyncClient(base_url=self.base_url, timeout=self.timeout, limits=limits)
+
+    async def warm_up(self, requests: int):
+        """Untimed requests, so every worker has its imports, tokenizer and clients ready."""
+        async with self.client(requests) as client:
+            await asyncio.gather(*(self.send(client) for _ in range(requests)))
+
+    async def run_level(self, concurrency: int, duration: float) -> dict:
+        """Keep ``concurrency`` requests in flight for ``duration`` seconds (then let the last ones finish)."""
+        outcomes = []
+        if self.stub is not None:
+            self.stub.reset()
+
+        async def client_loop(client):
+            while time.perf_counter() < deadline:
+                outcomes.append(await self.send(client))
+
+        async with self.client(concurrency) as client:
+            start = time.perf_counter()
+            deadline = start + duration
+            await asyncio.gather(*(client_loop(client) for _ in range(concurrency)))
+            elapsed = time.perf_counter() - start
+
+        latencies = [latency for latency, outcome in outcomes if outcome == "200"]
+        errors = len(outcomes) - len(latencies)
+        row = {
+            "concurrency": concurrency,
+            "requests": len(outcomes),
+            "ok": len(latencies),
+            "errors": errors,
+            "error_rate": round(errors / len(outcomes), 4) if outcomes else 0.0,
+            "outcomes": dict(Counter(outcome for _, outcome in outcomes)),
+            "elapsed_s": round(elapsed, 3),
+            "throughput_rps": round(len(latencies) / elapsed, 3),
+            "latency_s": {
+                name: round(percentile(latencies, share), 3) if latencies else None
+                for name, share in (("p50", 0.5), ("p90", 0.9), ("p95", 0.95), ("p99", 0.99), ("max", 1.0))
+            },
+        }
+        if self.stub is not None:
+            row["ollama"] = self.stub.stats()
+        return row
+
+
+def find_saturation(rows: list, min_gain: float, max_error_rate: float) -> dict:
+    """
+    The saturation point of a concurrency sweep.
+
+    Args:
+        rows: ``run_level`` results, by increasing concurrency
+        min_gain: Relative throughput gain below which a level adds nothing
+        max_error_rate: Error rate above which a level is overloaded
+
+    Returns:
+        The last level before throughput stalls or errors appear (concurrency
+        None if the first level already fails), or None if not reached
+    """
+    previous = None
+    for row in rows:
+        if row["error_rate"] > max_error_rate:
+            reason = f"error rate {row['error_rate']:.1%} at concurrency {row['concurrency']}"
+        elif previous is not None and row["throughput_rps"] < previous["throughput_rps"] * (1 + min_gain):
+            gain = row["throughput_rps"] / previous["throughput_rps"] - 1 if previous["throughput_rps"] else 0.0
+            reason = f"throughput {gain:+.0%} from concurrency {previous['concurrency']} to {row['concurrency']}"
+        else:
+            previous = row
+            continue
+        return {
+            "concurrency": previous["concurrency"] if previous else None,
+            "throughput_rps": previous["throughput_rps"] if previous else None,
+            "p95_s": previous["latency_s"]["p95"] if previous else None,
+            "reason": reason,
+        }
+    return None
+
+
+# ----- Server -----
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(workers: int, workdir: str, transcript_ms: float) -> tuple:
+    """Start ``uvicorn load_app:app``; return (process, base URL, log path)."""
+    port = free_port()
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, (ROOT, os.environ.get("PYTHONPATH"))))
+    env["LOADTEST_TRANSCRIPT_MS"] = str(transcript_ms)
+    # Caches, stores and config.json of this run live in the scratch directory
+    for variable, filename in (("TRANSCRIPT_CACHE_FILE", "transcripts.db"), ("LLM_CACHE_FILE", "llm_cache.db"),
+                               ("SUMMARY_STORE_FILE", "summary_store.db"), ("JOB_STORE_FILE", "jobs.db")):
+        env[variable] = os.path.join(workdir, filename)
+    log_path = os.path.join(workdir, "uvicorn.log")
+    with open(log_path, "w", encoding="utf-8") as log:
+        process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "load_app:app", "--app-dir", BENCH_DIR, "--host", "127.0.0.1",
+             "--port", str(port), "--workers", str(workers), "--log-level", "warning"],
+            cwd=workdir, env=env, stdout=log, stderr=subprocess.STDOUT,
+        )
+    return process, f"http://127.0.0.1:{port}", log_path
+
+
+def wait_until_ready(url: str, process: subprocess.Popen = None, log_path: str = None, timeout: float = 120):
+    """Poll ``url`` until it answers; exit with the server log if it dies or never does."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            break
+        try:
+            httpx.get(url, timeout=2)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    log = ""
+    if log_path:
+        with open(log_path, "r", encoding="utf-8", errors="replace") as f:
+            log = "\n" + f.read()[-3000:]
+    sys.exit(f"{url} did not come up within {timeout:.0f} s.{log}")
+
+
+def stop_server(process: subprocess.Popen):
+    process.terminate()
+    try:
+        process.wait(timeout=15)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+# ----- Report -----
+def print_table(rows: list, width: int = 30):
+    best = max((row["throughput_rps"] for row in rows), default=0) or 1
+    print(f"{'conc':>5} {'reqs':>6} {'err %':>6} {'req/s':>7} {'p50 s':>7} {'p95 s':>7} {'p99 s':>7} "
+          f"{'max s':>7} {'gen':>4} {'queue':>5} {'503':>4}  throughput")
+    for row in rows:
+        latency = {name: value if value is not None else "-" for name, value in row["latency_s"].items()}
+        ollama = row.get("ollama", {})
+        print(f"{row['concurrency']:>5} {row['requests']:>6} {row['error_rate'] * 100:>6.1f} "
+              f"{row['throughput_rps']:>7} {latency['p50']:>7} {latency['p95']:>7} {latency['p99']:>7} "
+              f"{latency['max']:>7} {ollama.get('max_running', '-'):>4} {ollama.get('max_queued', '-'):>5} "
+              f"{ollama.get('rejected', '-'):>4}  {'#' * max(1, int(row['throughput_rps'] / best * width))}")
+
+
+def print_saturation(saturation: dict):
+    if saturation is None:
+        print("\nSaturation not reached: add higher --concurrency levels.")
+    elif saturation["concurrency"] is None:
+        print(f"\nOverloaded from the first level ({saturation['reason']}).")
+    else:
+        print(f"\nSaturation at concurrency {saturation['concurrency']}: {saturation['throughput_rps']} req/s, "
+              f"p95 {saturation['p95_s']} s ({saturation['reason']}).")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--endpoint", default="summarize", choices=ENDPOINTS)
+    parser.add_argument("--fixture", default="2m", choices=list(FIXTURES), help="Video length of each request")
+    parser.add_argument("--concurrency", default="1,2,4,8,16,32", help="Comma-separated levels, increasing")
+    parser.add_argument("--duration", type=float, default=15, help="Seconds per level")
+    parser.add_argument("--timeout", type=float, default=120, help="Per-request timeout (counted as an error)")
+    parser.add_argument("--videos", type=int, default=0,
+                        help="Cycle through this many videos (0 = a new one per request, no cache hits)")
+    parser.add_argument("--languages", default="French", help="Target languages for --endpoint translate")
+    parser.add_argument("--model", default="llama3.1:8b")
+    parser.add_argument("--min-gain", type=float, default=0.1, help="Throughput gain a level must add")
+    parser.add_argument("--max-error-rate", type=float, default=0.01, help="Error rate marking overload")
+    parser.add_argument("--stop-error-rate", type=float, default=0.5, help="Stop the sweep past this error rate")
+    parser.add_argument("--workers", type=int, default=2, help="uvicorn worker processes")
+    parser.add_argument("--transcript-ms", type=float, default=300, help="Stub YouTube transcript load time")
+    parser.add_argument("--url", help="Use this running API instead of starting uvicorn")
+    parser.add_argument("--ollama-url", help="Use this running Ollama (or stub) instead of starting the stub")
+    parser.add_argument("--latency-ms", type=float, default=20, help="Stub: fixed time per generation")
+    parser.add_argument("--prefill-tps", type=float, default=4000, help="Stub: input tokens per second")
+    parser.add_argument("--output-tps", type=float, default=100, help="Stub: output tokens per second")
+    parser.add_argument("--parallel", type=int, default=4, help="Stub: generations at once")
+    parser.add_argument("--max-queue", type=int, default=512, help="Stub: waiting requests before 503s")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON instead of a table")
+    args = parser.parse_args()
+
+    try:
+        levels = [int(level) for level in args.concurrency.split(",") if level]
+    except ValueError:
+        parser.error(f"Invalid --concurrency: {args.concurrency}")
+    if not levels or levels != sorted(levels) or levels[0] < 1:
+        parser.error("--concurrency needs increasing levels >= 1")
+
+    stub = None
+    if args.ollama_url:
+        ollama_url = args.ollama_url.rstrip("/")
+        wait_until_ready(f"{ollama_url}/api/tags", timeout=10)
+    else:
+        stub = OllamaStub(models=(args.model,), latency_ms=args.latency_ms, prefill_tokens_per_s=args.prefill_tps,
+                          output_tokens_per_s=args.output_tps, parallel=args.parallel,
+                          max_queue=args.max_queue).start()
+        ollama_url = stub.url
+
+    process = None
+    if args.url:
+        base_url = args.url.rstrip("/")
+        wait_until_ready(f"{base_url}/", timeout=10)
+    else:
+        workdir = tempfile.mkdtemp(prefix="summarizer-load-")
+        process, base_url, log_path = start_server(args.workers, workdir, args.transcript_ms)
+        wait_until_ready(f"{base_url}/", process, log_path)
+
+    test = LoadTest(base_url, args.endpoint, FIXTURES[args.fixture], args.model, ollama_url,
+                    args.languages.split(","), args.videos, args.timeout, stub)
+    rows = []
+    try:
+        asyncio.run(test.warm_up(2 * args.workers))
+        for concurrency in levels:
+            row = asyncio.run(test.run_level(concurrency, args.duration))
+            rows.append(row)
+            if not args.json:
+                print(f"concurrency {concurrency}: {row['throughput_rps']} req/s, p95 {row['latency_s']['p95']} s, "
+                      f"{row['error_rate']:.1%} errors", file=sys.stderr)
+            if row["error_rate"] > args.stop_error_rate:
+                break
+    finally:
+        if process is not None:
+            stop_server(process)
+        if stub is not None:
+            stub.stop()
+
+    saturation = find_saturation(rows, args.min_gain, args.max_error_rate)
+    report = {
+        "environment": environment(),
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "json")},
+        "results": rows,
+        "saturation": saturation,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_table(rows)
+        print_saturation(saturation)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+"""
+Local stand-in for an Ollama server, for load tests.
+
+Answers ``GET /api/tags``, ``POST /api/generate`` and ``POST /api/chat``
+like Ollama does (NDJSON streaming by default, one JSON object with
+``"stream": false``, token counts in ``prompt_eval_count``/``eval_count``),
+with a simulated GPU behind it:
+
+- ``parallel`` generations run at once (OLLAMA_NUM_PARALLEL); the others
+  wait for a slot, and past ``max_queue`` waiting requests the server
+  answers 503 "server busy" (OLLAMA_MAX_QUEUE)
+- each generation takes ``latency + input tokens / prefill rate + output
+  tokens / generation rate``; when streaming, the first token comes after
+  the latency and prefill, the rest at the generation rate
+
+Standard library only, so it also runs on a box without the app's
+dependencies. Point the app (or anything else) at it:
+
+    python benchmarks/ollama_stub.py --port 11434 --parallel 4 --output-tps 40
+    curl -s localhost:11434/api/tags
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+WORDS = (
+    "model", "summary", "video", "topic", "speaker", "explains", "key", "idea", "data", "example",
+    "result", "process", "important", "first", "then", "finally", "shows", "because", "system", "value",
+)
+
+# Words per streamed chunk (Ollama sends one token per line; a few words keep the stub cheap)
+STREAM_CHUNK_WORDS = 4
+
+
+class OllamaStub:
+    """
+    Ollama-compatible HTTP server on a background thread.
+
+    Args:
+        host: Interface to listen on
+        port: Port (0 = any free port, see ``url``)
+        models: Model names served by /api/tags and accepted by generate/chat
+        latency_ms: Fixed time per generation (load, scheduling)
+        prefill_tokens_per_s: Input tokens processed per second, per generation
+        output_tokens_per_s: Output tokens generated per second, per generation
+        parallel: Generations running at once
+        max_queue: Requests waiting for a slot before new ones get a 503
+        output_ratio: Output tokens as a share of input tokens...
+        min_output_tokens: ...bounded below...
+        max_output_tokens: ...and above
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, models: tuple = ("llama3.1:8b",),
+                 latency_ms: float = 20, prefill_tokens_per_s: float = 4000, output_tokens_per_s: float = 100,
+                 parallel: int = 4, max_queue: int = 512, output_ratio: float = 0.1,
+                 min_output_tokens: int = 20, max_output_tokens: int = 200):
+        self.models = tuple(models)
+        self.latency_ms = latency_ms
+        self.prefill_tokens_per_s = prefill_tokens_per_s
+        self.output_tokens_per_s = output_tokens_per_s
+        self.parallel = parallel
+        self.max_queue = max_queue
+        self.output_ratio = output_ratio
+        self.min_output_tokens = min_output_tokens
+        self.max_output_tokens = max_output_tokens
+        self._slots = threading.Semaphore(parallel)
+        self._lock = threading.Lock()
+        self.reset()
+
+        server_class = type("StubServer", (ThreadingHTTPServer,), {"request_queue_size": 1024})
+        self.server = server_class((host, port), make_handler(self))
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "OllamaStub":
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True, name="ollama-stub")
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def reset(self):
+        """Zero the counters."""
+        with self._lock:
+            self.requests = 0
+            self.completed = 0
+            self.rejected = 0
+            self.input_tokens = 0
+            self.output_tokens = 0
+            self.queued = 0
+            self.max_queued = 0
+            self.running = 0
+            self.max_running = 0
+
+    def stats(self) -> dict:
+        """Counters since the last ``reset``."""
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "input_tokens": self.input_tokens,
+                "output_tokens": self.output_tokens,
+                "max_running": self.max_running,
+                "max_queued": self.max_queued,
+            }
+
+    # ----- Simulated generation -----
+    def plan(self, prompt: str) -> tuple:
+        """(response words, input tokens, output tokens) for a prompt, the same every time."""
+        input_tokens = max(1, len(prompt) // 4)
+        output_tokens = int(min(self.max_output_tokens, max(self.min_output_tokens, input_tokens * self.output_ratio)))
+        rng = random.Random(hashlib.sha256(prompt.encode("utf-8")).digest())
+        words = [rng.choice(WORDS) for _ in range(max(1, output_tokens * 3 // 4))]
+        words[0] = words[0].capitalize()
+        words[-1] += "."
+        return words, input_tokens, output_tokens
+
+    def acquire_slot(self) -> bool:
+        """Wait for a generation slot; False (503) when the queue is full."""
+        with self._lock:
+            self.requests += 1
+            if self.queued >= self.max_queue:
+                self.rejected += 1
+                return False
+            self.queued += 1
+            self.max_queued = max(self.max_queued, self.queued)
+        self._slots.acquire()
+        with self._lock:
+            self.queued -= 1
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        return True
+
+    def release_slot(self, input_tokens: int, output_tokens: int):
+        with self._lock:
+            self.running -= 1
+            self.completed += 1
+            self.input_tokens += input_tokens
+            self.output_tokens += output_tokens
+        self._slots.release()
+
+
+def prompt_text(path: str, body: dict) -> str:
+    if path == "/api/chat":
+        return "\n".join(str(message.get("content", "")) for message in body.get("messages", []))
+    return "\n".join(filter(None, (body.get("system"), str(body.get("prompt", "")))))
+
+
+def make_handler(stub: OllamaStub):
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # Keep-alive, chunked streaming
+
+        def send_json(self, status: int, payload: dict):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def send_chunk(self, payload: dict):
+            data = json.dumps(payload).encode("utf-8") + b"\n"
+            self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+            self.wfile.flush()
+
+        def do_GET(self):
+            if self.path.rstrip("/") != "/api/tags":
+                self.send_json(404, {"error": "not found"})
+                return
+            now = datetime.now(timezone.utc).isoformat()
+            self.send_json(200, {"models": [{
+                "name": name,
+                "model": name,
+                "modified_at": now,
+                "size": 4_920_753_328,
+                "digest": hashlib.sha256(name.encode("utf-8")).hexdigest(),
+                "details": {"format": "gguf", "family": "llama", "parameter_size": "8.0B",
+                            "quantization_level": "Q4_K_M"},
+            } for name in stub.models]})
+
+        def do_HEAD(self):
+            self.send_response(200)  # Ollama's health check: HEAD /
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def do_POST(self):
+            path = self.path.rstrip("/")
+            try:
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            except json.JSONDecodeError as e:
+                self.send_json(400, {"error": f"invalid JSON: {e}"})
+                return
+            if path not in ("/api/generate", "/api/chat"):
+                self.send_json(404, {"error": "not found"})
+                return
+            model = body.get("model", "")
+            if model not in stub.models:
+                self.send_json(404, {"error": f'model "{model}" not found, try pulling it first'})
+                return
+            if not stub.acquire_slot():
+                self.send_json(503, {"error": "server busy, please try again.  maximum pending requests exceeded"})
+                return
+            words, input_tokens, output_tokens = stub.plan(prompt_text(path, body))
+            try:
+                self.generate(path, model, body.get("stream", True), words, input_tokens, output_tokens)
+            finally:
+                stub.release_slot(input_tokens, output_tokens)
+
+        def generate(self, path: str, model: str, stream: bool, words: list, input_tokens: int, output_tokens: int):
+            start = time.perf_counter()
+            prefill_s = input_tokens / stub.prefill_tokens_per_s
+            generation_s = output_tokens / stub.output_tokens_per_s
+            time.sleep(stub.latency_ms / 1000 + prefill_s)
+
+            def message(text: str, done: bool) -> dict:
+                payload = {"model": model, "created_at": datetime.now(timezone.utc).isoformat(), "done": done}
+                if path == "/api/chat":
+                    payload["message"] = {"role": "assistant", "content": text}
+                else:
+                    payload["response"] = text
+                return payload
+
+            def final(text: str) -> dict:
+                payload = message(text, True)
+                payload.update({
+                    "done_reason": "stop",
+                    "total_duration": int((time.perf_counter() - start) * 1e9),
+                    "load_duration": int(stub.latency_ms * 1e6),
+                    "prompt_eval_count": input_tokens,
+                    "prompt_eval_duration": int(prefill_s * 1e9),
+                    "eval_count": output_tokens,
+                    "eval_duration": int(generation_s * 1e9),
+                })
+                if path == "/api/generate":
+                    payload["context"] = []
+                return payload
+
+            if not stream:
+                time.sleep(generation_s)
+                self.send_json(200, final(" ".join(words)))
+                return
+
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            pieces = [" ".join(words[i:i + STREAM_CHUNK_WORDS]) for i in range(0, len(words), STREAM_CHUNK_WORDS)]
+            for index, piece in enumerate(pieces):
+                time.sleep(generation_s / len(pieces))
+                self.send_chunk(message(piece if index == 0 else " " + piece, False))
+            self.send_chunk(final(""))
+            self.wfile.write(b"0\r\n\r\n")
+
+        def log_message(self, format, *args):
+            pass
+
+    return StubHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument("--models", default="llama3.1:8b", help="Comma-separated model names")
+    parser.add_argument("--latency-ms", type=float, default=20, help="Fixed time per generation")
+    parser.add_argument("--prefill-tps", type=float, default=4000, help="Input tokens per second, per generation")
+    parser.add_argument("--output-tps", type=float, default=100, help="Output tokens per second, per generation")
+    parser.add_argument("--parallel", type=int, default=4, help="Generations at once (OLLAMA_NUM_PARALLEL)")
+    parser.add_argument("--max-queue", type=int, default=512, help="Waiting requests before 503s (OLLAMA_MAX_QUEUE)")
+    args = parser.parse_args()
+
+    stub = OllamaStub(args.host, args.port, tuple(args.models.split(",")), args.latency_ms, args.prefill_tps,
+                      args.output_tps, args.parallel, args.max_queue)
+    print(f"Ollama stub on {stub.url} (models: {args.models})")
+    try:
+        stub.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(json.dumps(stub.stats()))
+        stub.server.server_close()
+
+
+if __name__ == "__main__":
+    main()
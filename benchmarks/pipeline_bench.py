@@ -0,0 +1,334 @@
+"""
+Offline benchmark of the summarization flows.
+
+Runs the API endpoints (/summarize, /notes, /translate, in process through
+httpx's ASGI transport) and the Streamlit background tasks (summary, notes,
+translation) on generated transcripts from 2 minutes to 10 hours, with
+``FakeLLM`` installed as the client factory of the LLM registry and the
+stubbed YoutubeLoader. Everything else is the real code path: rate limiter,
+response cache, chunking, map/reduce, single-flight, stores.
+
+Caches and stores are emptied before every run, so results are cold-cache
+numbers, and each run processes the same transcripts. For each flow and fixture it reports latency, LLM calls,
+429s, input/output tokens, peak Python memory (tracemalloc, in a separate
+run) and throughput; ``--output`` writes them as JSON, and ``--compare``
+checks them against a previous JSON file:
+
+    python benchmarks/pipeline_bench.py --fixtures 2m,1h --output bench.json
+    python benchmarks/pipeline_bench.py --flows api_summarize --concurrency 4 --rate-limit-rate 0.1
+    python benchmarks/pipeline_bench.py --output new.json --compare bench.json --fail-threshold 0.2
+
+Simulated provider time is multiplied by ``--time-scale``, so absolute
+latencies are only comparable between runs with the same settings, which
+are recorded in the JSON. The default provider is Ollama: no rate budget,
+and its small context window gives the most calls and reduce levels per
+transcript. With ``--provider groq`` etc. the limiter applies the
+provider's real budgets (not time-scaled), and chunk sizes follow them.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from fake_llm import FakeLLM, fake_client_factory
+from fixtures import FIXTURES, StubYoutubeLoader, fixture_video_id, install_stub_loader, make_transcript
+
+API_FLOWS = ("api_summarize", "api_notes", "api_translate")
+STREAMLIT_FLOWS = ("st_summarize", "st_notes", "st_translate")
+
+# Translation input: a summary about this share of the transcript's length
+SUMMARY_SHARE = 0.1
+
+
+class Bench:
+    """Flow runners sharing one fake LLM and one provider configuration."""
+
+    def __init__(self, fake: FakeLLM, provider: str, model: str, api_key: str, languages: list):
+        self.fake = fake
+        self.provider = provider
+        self.model = model
+        self.api_key = api_key
+        self.languages = languages
+        self._st_llm = None
+
+    def reset_caches(self):
+        """Empty the transcript, response and translation caches (and the Streamlit app's memory caches)."""
+        from llm_cache import get_llm_cache
+        from memory_cache import clear_memory_caches
+        from summary_store import get_translation_store
+        from transcript_cache import get_transcript_cache
+        for cache in (get_llm_cache(), get_transcript_cache(), get_translation_store()):
+            cache.clear()
+        clear_memory_caches()
+
+    # ----- API flows (in process, no network) -----
+    def api_request(self, flow: str, minutes: int, seed: int) -> tuple:
+        from transcript_cache import canonical_url
+        body = {"provider": self.provider, "model": self.model, "api_key": self.api_key}
+        if flow == "api_summarize":
+            return "/summarize", {**body, "youtube_url": canonical_url(fixture_video_id(minutes, seed))}
+        if flow == "api_notes":
+            return "/notes", {**body, "youtube_url": canonical_url(fixture_video_id(minutes, seed))}
+        summary = make_transcript(minutes * SUMMARY_SHARE, seed)
+        return "/translate", {**body, "summary_text": summary, "target_languages": self.languages}
+
+    async def api_batch(self, flow: str, minutes: int, seeds: list) -> list:
+        import httpx
+        from app_api import app
+
+        async def one(client, seed):
+            path, body = self.api_request(flow, minutes, seed)
+            start = time.perf_counter()
+            response = await client.post(path, json=body)
+            return time.perf_counter() - start, response.status_code == 200
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            return await asyncio.gather(*(one(client, seed) for seed in seeds))
+
+    # ----- Streamlit flows (background task functions, on threads) -----
+    def st_llm(self):
+        if self._st_llm is None:
+            import streamlit.logger
+            # Importing the app outside `streamlit run` logs a warning per widget
+            streamlit.logger.set_log_level("error")
+            from app_final import get_llm_resource
+            from llm_registry import api_key_hash
+            self._st_llm = get_llm_resource(self.provider, self.model, None, api_key_hash(self.api_key),
+                                            _api_key=self.api_key)
+        return self._st_llm
+
+    def st_task(self, flow: str, minutes: int, seed: int) -> tuple:
+        import app_final
+        llm = self.st_llm()
+        video_key = fixture_video_id(minutes, seed)
+        start = time.perf_counter()
+        try:
+            if flow == "st_summarize":
+                result = app_final.summarize_task(llm, video_key, None, progress=lambda *args: None)
+            elif flow == "st_notes":
+                result = app_final.notes_task(llm, video_key, "English", None, progress=lambda *args: None)
+            else:
+                summary = make_transcript(minutes * SUMMARY_SHARE, seed)
+                result = app_final.translate_task(llm, summary, self.languages[0], progress=lambda *args: None)
+            ok = bool(result)
+        except Exception as e:
+            logging.warning("%s failed: %s", flow, e)
+            ok = False
+        return time.perf_counter() - start, ok
+
+    def st_batch(self, flow: str, minutes: int, seeds: list) -> list:
+        with ThreadPoolExecutor(max_workers=len(seeds)) as executor:
+            return list(executor.map(lambda seed: self.st_task(flow, minutes, seed), seeds))
+
+    def run_batch(self, flow: str, minutes: int, concurrency: int) -> tuple:
+        """Run ``concurrency`` requests at once; return (wall time, [(latency, ok)], fake LLM stats)."""
+        seeds = list(range(concurrency))  # Distinct videos, so concurrent requests are not coalesced
+        self.reset_caches()
+        self.fake.reset()
+        start = time.perf_counter()
+        if flow in API_FLOWS:
+            outcomes = asyncio.run(self.api_batch(flow, minutes, seeds))
+        else:
+            outcomes = self.st_batch(flow, minutes, seeds)
+        return time.perf_counter() - start, outcomes, self.fake.stats()
+
+
+def measure(bench: Bench, flow: str, fixture: str, concurrency: int, repeat: int, memory: bool) -> dict:
+    minutes = FIXTURES[fixture]
+    walls, latencies, errors, stats = [], [], 0, None
+    for _ in range(repeat):
+        wall, outcomes, stats = bench.run_batch(flow, minutes, concurrency)
+        walls.append(wall)
+        latencies.extend(latency for latency, _ in outcomes)
+        errors += sum(1 for _, ok in outcomes if not ok)
+
+    peak_mb = None
+    if memory:
+        tracemalloc.start()
+        try:
+            bench.run_batch(flow, minutes, concurrency)
+            peak_mb = round(tracemalloc.get_traced_memory()[1] / 2 ** 20, 2)
+        finally:
+            tracemalloc.stop()
+
+    wall = statistics.mean(walls)
+    # Counters are deterministic for a fixture: the last run stands for all
+    return {
+        "flow": flow,
+        "fixture": fixture,
+        "minutes": minutes,
+        "concurrency": concurrency,
+        "runs": repeat,
+        "errors": errors,
+        "wall_s": {"mean": round(wall, 4), "min": round(min(walls), 4), "max": round(max(walls), 4)},
+        "latency_s": {
+            "p50": round(statistics.median(latencies), 4),
+            "max": round(max(latencies), 4),
+        },
+        "llm_calls": stats["calls"],
+        "rate_limited": stats["rate_limited"],
+        "input_tokens": stats["input_tokens"],
+        "output_tokens": stats["output_tokens"],
+        "max_llm_in_flight": stats["max_in_flight"],
+        "peak_memory_mb": peak_mb,
+        "throughput": {
+            "requests_per_s": round(concurrency / wall, 3),
+            "input_tokens_per_s": round(stats["input_tokens"] / wall, 1),
+            # Translations take a summary, not the video
+            "video_minutes_per_s": round(minutes * concurrency / wall, 2) if "translate" not in flow else None,
+        },
+    }
+
+
+def environment() -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                                text=True, timeout=10).stdout.strip() or None
+    except Exception:
+        commit = None
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+    }
+
+
+def compare(rows: list, baseline: dict, threshold: float) -> list:
+    """
+    Print changes against a baseline result file.
+
+    Returns:
+        Regressions: rows slower than ``threshold`` (relative) or using more calls/tokens
+    """
+    previous = {(row["flow"], row["fixture"], row["concurrency"]): row for row in baseline["results"]}
+    regressions = []
+    print(f"\n{'flow':<14} {'fixture':>7} {'wall':>8} {'calls':>9} {'tokens':>11}   vs {baseline['environment'].get('git_commit')}")
+    for row in rows:
+        old = previous.get((row["flow"], row["fixture"], row["concurrency"]))
+        if old is None:
+            continue
+        wall_change = row["wall_s"]["mean"] / old["wall_s"]["mean"] - 1 if old["wall_s"]["mean"] else 0.0
+        calls_change = row["llm_calls"] - old["llm_calls"]
+        tokens_change = row["input_tokens"] - old["input_tokens"]
+        print(f"{row['flow']:<14} {row['fixture']:>7} {wall_change:>+8.1%} {calls_change:>+9d} {tokens_change:>+11d}")
+        if wall_change > threshold or calls_change > 0 or tokens_change > 0:
+            regressions.append(row)
+    return regressions
+
+
+def print_table(rows: list):
+    print(f"{'flow':<14} {'fixture':>7} {'conc':>5} {'wall s':>8} {'calls':>6} {'429s':>5} "
+          f"{'in tok':>9} {'out tok':>8} {'peak MB':>8} {'req/s':>7} {'err':>4}")
+    for row in rows:
+        peak = row["peak_memory_mb"] if row["peak_memory_mb"] is not None else "-"
+        print(f"{row['flow']:<14} {row['fixture']:>7} {row['concurrency']:>5} {row['wall_s']['mean']:>8} "
+              f"{row['llm_calls']:>6} {row['rate_limited']:>5} {row['input_tokens']:>9} {row['output_tokens']:>8} "
+              f"{peak:>8} {row['throughput']['requests_per_s']:>7} {row['errors']:>4}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--flows", default=",".join(API_FLOWS + STREAMLIT_FLOWS), help="Comma-separated flows")
+    parser.add_argument("--fixtures", default=",".join(FIXTURES), help="Comma-separated fixtures (2m ... 10h)")
+    parser.add_argument("--concurrency", type=int, default=1, help="Requests started at once (distinct videos)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per flow and fixture")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc run")
+    parser.add_argument("--provider", default="ollama", help="Provider whose budgets and chunk sizes apply")
+    parser.add_argument("--model", default="llama3.1:8b")
+    parser.add_argument("--api-key", default="benchmark", help="Any key passing validation (not needed for Ollama)")
+    parser.add_argument("--languages", default="French,German", help="Target languages for the translate flows")
+    parser.add_argument("--latency-ms", type=float, default=250, help="Fake LLM fixed time per call")
+    parser.add_argument("--prefill-tps", type=float, default=5000, help="Fake LLM input tokens per second")
+    parser.add_argument("--output-tps", type=float, default=250, help="Fake LLM output tokens per second")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Share of prompts answered once with a 429")
+    parser.add_argument("--retry-after-ms", type=float, default=200, help="Retry hint of the simulated 429s")
+    parser.add_argument("--transcript-ms", type=float, default=400, help="Stub YouTube transcript load time")
+    parser.add_argument("--time-scale", type=float, default=0.05, help="Multiplier on all simulated delays")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON instead of a table")
+    parser.add_argument("--compare", help="Baseline JSON file from a previous run")
+    parser.add_argument("--fail-threshold", type=float, default=None,
+                        help="With --compare: exit 1 if a wall time grows by more than this share, "
+                             "or calls/tokens grow at all")
+    args = parser.parse_args()
+
+    flows = [flow for flow in args.flows.split(",") if flow]
+    fixtures = [fixture for fixture in args.fixtures.split(",") if fixture]
+    unknown = [name for name in flows + fixtures if name not in API_FLOWS + STREAMLIT_FLOWS and name not in FIXTURES]
+    if unknown:
+        parser.error(f"Unknown flow or fixture: {', '.join(unknown)}")
+
+    output = os.path.abspath(args.output) if args.output else None
+    baseline = os.path.abspath(args.compare) if args.compare else None
+
+    # Caches, stores and config.json of this run live in a scratch directory
+    workdir = tempfile.mkdtemp(prefix="summarizer-bench-")
+    for variable, filename in (("TRANSCRIPT_CACHE_FILE", "transcripts.db"), ("LLM_CACHE_FILE", "llm_cache.db"),
+                               ("SUMMARY_STORE_FILE", "summary_store.db"), ("JOB_STORE_FILE", "jobs.db")):
+        os.environ[variable] = os.path.join(workdir, filename)
+    os.chdir(workdir)
+
+    fake = FakeLLM(
+        latency_ms=args.latency_ms,
+        prefill_tokens_per_s=args.prefill_tps,
+        output_tokens_per_s=args.output_tps,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after_ms=args.retry_after_ms,
+        time_scale=args.time_scale,
+    )
+    install_stub_loader(args.transcript_ms / 1000 * args.time_scale)
+    from llm_registry import get_client_registry
+    registry = get_client_registry()
+    registry.factory = fake_client_factory(fake)
+    registry.clear()
+
+    bench = Bench(fake, args.provider, args.model, args.api_key, args.languages.split(","))
+    rows = []
+    for flow in flows:
+        # Untimed: imports, tokenizer and app start-up
+        bench.run_batch(flow, min(FIXTURES.values()), 1)
+        for fixture in fixtures:
+            row = measure(bench, flow, fixture, args.concurrency, args.repeat, not args.no_memory)
+            rows.append(row)
+            if not args.json:
+                print(f"{flow} {fixture}: {row['wall_s']['mean']} s, {row['llm_calls']} calls", file=sys.stderr)
+
+    report = {
+        "environment": environment(),
+        "config": {key: value for key, value in vars(args).items() if key not in ("api_key", "output", "json", "compare")},
+        "transcript_loads": StubYoutubeLoader.loads,
+        "results": rows,
+    }
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_table(rows)
+
+    if baseline:
+        with open(baseline, "r", encoding="utf-8") as f:
+            regressions = compare(rows, json.load(f), args.fail_threshold or 0.0)
+        if regressions and args.fail_threshold is not None:
+            sys.exit(f"{len(regressions)} regression(s) against {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Regression check: back-to-back reduces on one shared LLM client.
+
+The Streamlit tasks get their client from the process-wide registry, so the
+same ChatGroq instance serves every summary. Its async HTTP pool binds to
+the first event loop that uses it: with ``asyncio.run(reduce_summaries(...))``
+per summary, every other run failed with "APIConnectionError: Connection
+error." This starts the OpenAI-compatible stub of ``client_reuse.py`` and
+runs two reduces in a row on one registry client, from two task threads:
+
+- ``asyncio_run``: the old way, reported for reference (fails on run 2)
+- ``sync``: ``reduce_summaries_sync``, used by the tasks; must pass
+
+Exits 1 if a ``sync`` run fails. Offline, no API key needed:
+
+    python benchmarks/shared_client_reduce.py
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+from http.server import ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("LLM_CACHE_FILE", os.path.join(tempfile.mkdtemp(prefix="summarizer-check-"), "llm_cache.db"))
+
+from langchain.prompts import PromptTemplate
+
+from client_reuse import API_KEY, MODEL, make_handler, stub_client_factory
+from llm_cache import cached
+from llm_registry import LLMClientRegistry
+from pipeline import reduce_summaries, reduce_summaries_sync
+from rate_limiter import rate_limited
+
+COMBINE_PROMPT = PromptTemplate(template="Combine these summaries:\n{text}", input_variables=["text"])
+
+# More summaries than the default fan-in: one intermediate level, then the final combine
+SUMMARIES_PER_RUN = 12
+
+
+def run_in_thread(fn) -> str:
+    """Run ``fn`` on a new thread (like a TaskRunner worker); "ok" or the error."""
+    outcome = {}
+
+    def target():
+        try:
+            fn()
+            outcome["result"] = "ok"
+        except Exception as e:
+            outcome["result"] = f"{type(e).__name__}: {e}"
+
+    thread = threading.Thread(target=target)
+    thread.start()
+    thread.join()
+    return outcome["result"]
+
+
+def main():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(0.01, 0.0, {"connections": 0}))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    registry = LLMClientRegistry(factory=stub_client_factory(f"http://127.0.0.1:{server.server_address[1]}"))
+    # The Streamlit stack, around one registry client
+    llm = cached(rate_limited(registry.get("groq", MODEL, api_key=API_KEY), "groq", API_KEY, MODEL), "groq", MODEL)
+
+    def summaries(scenario, run):
+        # New text on every run, so the response cache does not answer it
+        return [f"{scenario} run {run}: summary of section {index}." for index in range(SUMMARIES_PER_RUN)]
+
+    scenarios = {
+        "asyncio_run": lambda run: asyncio.run(reduce_summaries(llm, summaries("asyncio_run", run), COMBINE_PROMPT)),
+        "sync": lambda run: reduce_summaries_sync(llm, summaries("sync", run), COMBINE_PROMPT),
+    }
+    failed = False
+    try:
+        for name, reduce in scenarios.items():
+            for run in range(2):
+                result = run_in_thread(lambda: reduce(run))
+                print(f"{name:<12} run {run}: {result}")
+                failed = failed or (name == "sync" and result != "ok")
+    finally:
+        server.shutdown()
+        server.server_close()
+    if failed:
+        sys.exit("reduce_summaries_sync failed on a shared client")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""
+Token-aware text chunking shared by the API and the Streamlit apps.
+
+Chunks are sized in tokens for the target model - bounded by its context
+window and by its tokens-per-minute budget - and split on sentence
+boundaries (falling back to words) instead of every 1200 characters.
+"""
+
+import functools
+import math
+import re
+
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+from rate_limiter import DEFAULT_OUTPUT_TOKENS, get_rate_limits
+
+try:
+    import tiktoken  # In requirements.txt
+except ImportError:  # Fall back to a character-based estimate
+    tiktoken = None
+
+# --------------------------- MODEL LIMITS ---------------------------
+# Context window in tokens. "default" applies to any model of the provider
+# without its own entry.
+PROVIDER_CONTEXT_WINDOWS = {
+    "groq": {
+        "default": 131072,
+        "gemma2-9b-it": 8192,
+        "mixtral-8x7b-32768": 32768,
+    },
+    "openai": {
+        "default": 128000,
+        "gpt-3.5-turbo": 16385,
+        "gpt-4": 8192,
+    },
+    "claude": {
+        "default": 200000,
+    },
+    "mistral": {
+        "default": 32000,
+        "mistral-large-latest": 128000,
+    },
+    # Ollama's own default num_ctx, whatever the model supports
+    "ollama": {
+        "default": 4096,
+    },
+}
+
+# Tokens used by the prompt templates around the chunk text
+PROMPT_OVERHEAD_TOKENS = 300
+
+# Upper bound on a single map chunk: beyond this, map summaries lose detail
+MAX_CHUNK_TOKENS = 12000
+
+# Upper bound for calls whose output is as long as their input (translation),
+# kept under common max-output limits
+TRANSLATION_CHUNK_TOKENS = 2000
+
+# Share of the per-minute token budget a single call may use, so at least
+# two calls fit in a minute
+TPM_CHUNK_FRACTION = 0.5
+
+# Sentence ends (Latin and CJK punctuation), then caption/word gaps, then characters
+SENTENCE_SEPARATORS = [r"\n\n", r"\n", r"(?<=[.!?])\s+", r"(?<=[。！？])", r"(?<=[;:,])\s+", r"\s+", ""]
+
+# Encoding for models tiktoken does not know (every non-OpenAI model)
+FALLBACK_ENCODING = "cl100k_base"
+
+CJK_PATTERN = re.compile(r"[぀-ヿ㐀-䶿一-鿿가-힯]")
+
+
+def get_context_window(provider: str, model: str = None) -> int:
+    """Context window (tokens) of a provider model."""
+    windows = PROVIDER_CONTEXT_WINDOWS.get(provider, {})
+    return windows.get(model) or windows.get("default", 8192)
+
+
+@functools.lru_cache(maxsize=None)
+def _get_encoding(model: str):
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except Exception:
+        pass
+    try:
+        return tiktoken.get_encoding(FALLBACK_ENCODING)
+    except Exception:  # Encoding files unavailable (offline)
+        return None
+
+
+def preload_encodings() -> bool:
+    """
+    Load the tiktoken encodings at startup.
+
+    tiktoken downloads an encoding the first time it is used (then reads it
+    from its cache, TIKTOKEN_CACHE_DIR), which must not happen on a request.
+
+    Returns:
+        True if token counts are exact, False if they use the estimate
+        (tiktoken not installed, or the encodings could not be loaded)
+    """
+    return all(_get_encoding(model) is not None for model in ("gpt-4o", FALLBACK_ENCODING))
+
+
+def count_tokens(text: str, model: str = None) -> int:
+    """
+    Count tokens in ``text``.
+
+    Uses tiktoken when it is installed (exact for OpenAI models, a close
+    approximation for the others). Otherwise estimates ~4 characters per
+    token, counting CJK characters as one token each.
+    """
+    encoding = _get_encoding(model or "gpt-4o")
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    cjk = len(CJK_PATTERN.findall(text))
+    return cjk + math.ceil((len(text) - cjk) / 4)
+
+
+def get_chunk_tokens(provider: str, model: str = None) -> int:
+    """
+    Largest chunk (in tokens) worth sending to ``model`` in a single call.
+
+    Bounded by the context window and the TPM budget, both minus the prompt
+    overhead and the reserved output tokens, and by MAX_CHUNK_TOKENS.
+    """
+    reserved = PROMPT_OVERHEAD_TOKENS + DEFAULT_OUTPUT_TOKENS
+    budget = min(get_context_window(provider, model) - reserved, MAX_CHUNK_TOKENS)
+    tpm = get_rate_limits(provider, model).get("tpm")
+    if tpm:
+        budget = min(budget, int(tpm * TPM_CHUNK_FRACTION) - reserved)
+    return max(budget, 256)
+
+
+def get_single_call_tokens(provider: str, model: str = None) -> int:
+    """
+    Largest input (in tokens) a single call can take, e.g. a whole transcript
+    or a final combine.
+
+    Bounded by the context window and the full TPM budget, both minus the
+    prompt overhead and the reserved output tokens.
+    """
+    reserved = PROMPT_OVERHEAD_TOKENS + DEFAULT_OUTPUT_TOKENS
+    budget = get_context_window(provider, model) - reserved
+    tpm = get_rate_limits(provider, model).get("tpm")
+    if tpm:
+        budget = min(budget, tpm - reserved)
+    return max(budget, 256)
+
+
+def split_text(text: str, provider: str, model: str = None, chunk_tokens: int = None) -> list:
+    """
+    Split text into chunks sized for the target model, on sentence boundaries.
+
+    Args:
+        text: Text to split (transcript, summaries, ...)
+        provider: LLM provider name
+        model: Model name (provider default limits if None)
+        chunk_tokens: Override the chunk size derived from the model limits
+
+    Returns:
+        List of chunks, in order
+    """
+    chunk_tokens = chunk_tokens or get_chunk_tokens(provider, model)
+    if count_tokens(text, model) <= chunk_tokens:
+        return [text] if text.strip() else []
+
+    splitter = RecursiveCharacterTextSplitter(
+        chunk_size=chunk_tokens,
+        chunk_overlap=0,
+        length_function=lambda piece: count_tokens(piece, model),
+        separators=SENTENCE_SEPARATORS,
+        is_separator_regex=True,
+        keep_separator="end",
+    )
+    return splitter.split_text(text)
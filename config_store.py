@@ -0,0 +1,196 @@
+"""
+Shared access to config.json for the Streamlit app.
+
+The app reads its configuration several times per rerun, in every session.
+The store keeps the parsed file in memory and only reads it again when its
+modification stamp (mtime, size, inode) changes, e.g. after a save from
+another session or process.
+
+Saves are serialized with a lock file (``fcntl`` on POSIX, ``msvcrt`` on
+Windows) and written atomically: the new content goes to a temporary file in
+the same directory, which then replaces config.json, so readers never see a
+half-written file. Migration from older formats runs once per process.
+"""
+
+import copy
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# --------------------------- CONFIG ---------------------------
+CONFIG_FILE = "config.json"  # Same file migrate_config reads and writes
+
+# os.replace fails on Windows while another process has the target open
+REPLACE_RETRIES = 10
+REPLACE_RETRY_SECONDS = 0.05
+
+
+@contextmanager
+def file_lock(path: str):
+    """Exclusive inter-process lock held on ``path`` (created if missing) for the ``with`` block."""
+    with open(path, "a+b") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+            return
+
+        lock_file.seek(0)
+        while True:
+            try:
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)  # Retries for ~10 s, then raises
+                break
+            except OSError:
+                continue
+        try:
+            yield
+        finally:
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def write_atomic(path: str, text: str):
+    """Replace ``path`` with ``text`` through a temporary file and a rename."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=".config-", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        for attempt in range(REPLACE_RETRIES):
+            try:
+                os.replace(tmp_path, path)
+                return
+            except PermissionError:
+                if attempt == REPLACE_RETRIES - 1:
+                    raise
+                time.sleep(REPLACE_RETRY_SECONDS)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+class ConfigStore:
+    """
+    In-memory view of a JSON config file, reloaded when the file changes.
+
+    ``load`` returns a copy, so callers may modify it freely; changes are
+    only persisted by ``save`` or ``update``.
+    """
+
+    def __init__(self, path: str = CONFIG_FILE):
+        self.path = path
+        self.lock_path = path + ".lock"
+        self.reads = 0
+        self._config = None
+        self._stamp = None
+        self._migrated = False
+        self._lock = threading.Lock()
+
+    def _file_stamp(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+    def _read(self) -> dict:
+        """Parsed file content, from memory unless the file changed (call with ``_lock`` held)."""
+        stamp = self._file_stamp()
+        if stamp is not None and stamp == self._stamp:
+            return self._config
+        if stamp is None:
+            from migrate_config import create_default_config
+            config = create_default_config()
+        else:
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    config = json.load(f)
+            except json.JSONDecodeError:
+                config = {}
+            self.reads += 1
+        self._config, self._stamp = config, stamp
+        return config
+
+    def _write(self, config: dict):
+        """Write ``config`` and keep it as the in-memory copy (call with both locks held)."""
+        write_atomic(self.path, json.dumps(config, indent=2))
+        self._config, self._stamp = copy.deepcopy(config), self._file_stamp()
+
+    def migrate_once(self):
+        """Run ``migrate_config`` the first time it is called in this process."""
+        with self._lock:
+            if self._migrated:
+                return
+            from migrate_config import migrate_config
+            with file_lock(self.lock_path):
+                migrate_config()
+            self._migrated = True
+
+    def load(self) -> dict:
+        """Current configuration (a copy)."""
+        with self._lock:
+            return copy.deepcopy(self._read())
+
+    def save(self, config: dict) -> bool:
+        """
+        Replace the whole configuration.
+
+        Returns:
+            True on success, False if the file could not be written
+        """
+        try:
+            with self._lock, file_lock(self.lock_path):
+                self._write(config)
+            return True
+        except Exception:
+            return False
+
+    def update(self, mutate) -> bool:
+        """
+        Read-modify-write under the lock, so concurrent saves from other
+        sessions or processes are not lost.
+
+        Args:
+            mutate: Function applied to (and modifying) the latest configuration
+
+        Returns:
+            True on success, False if the file could not be written
+        """
+        try:
+            with self._lock, file_lock(self.lock_path):
+                self._stamp = None  # Another process may have written within the same mtime tick
+                config = copy.deepcopy(self._read())
+                mutate(config)
+                self._write(config)
+            return True
+        except Exception:
+            return False
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_config_store() -> ConfigStore:
+    """Process-wide store for CONFIG_FILE (created on first use)."""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = ConfigStore()
+        return _default_store
@@ -0,0 +1,127 @@
+"""
+Playlist and channel ingestion for the API.
+
+A playlist or channel URL is expanded into its video IDs with yt-dlp (an
+optional dependency: ``pip install yt-dlp``), without downloading anything.
+Transcripts are then prefetched into the transcript cache, skipping videos
+that are already cached, before each video goes through the summarization
+pipeline.
+
+All functions here are blocking: the API runs them on its YouTube thread pool.
+"""
+
+from urllib.parse import parse_qs, urlparse
+
+from transcript_cache import VIDEO_ID_PATTERN, YOUTUBE_HOSTS, get_transcript_cache, load_transcript
+
+try:
+    import yt_dlp
+except ImportError:  # Optional: only needed for playlist/channel ingestion
+    yt_dlp = None
+
+# Upper bound on videos taken from one collection
+MAX_COLLECTION_VIDEOS = 200
+
+# First path segment of channel URLs (youtube.com/@handle, /channel/UC..., /c/name, /user/name)
+CHANNEL_PATH_PREFIXES = ("channel", "c", "user")
+# Channel tabs that list videos; any other tab falls back to "videos"
+CHANNEL_TABS = ("videos", "shorts", "streams")
+
+TRANSCRIPT_CACHED = "cached"
+TRANSCRIPT_FETCHED = "fetched"
+TRANSCRIPT_MISSING = "missing"
+
+
+def collection_url(url: str):
+    """
+    Normalize a playlist or channel URL for expansion.
+
+    Channel URLs without a tab point at their "videos" tab, so uploads are
+    listed rather than the channel's home sections.
+
+    Returns:
+        URL to expand, or None if ``url`` is not a playlist or channel URL
+    """
+    url = (url or "").strip()
+    parsed = urlparse(url if "://" in url else f"https://{url}")
+    host = (parsed.hostname or "").lower()
+    if not any(host == name or host.endswith("." + name) for name in YOUTUBE_HOSTS):
+        return None
+
+    path_parts = [part for part in parsed.path.split("/") if part]
+    playlist_id = parse_qs(parsed.query).get("list", [None])[0]
+    if playlist_id:
+        return f"https://www.youtube.com/playlist?list={playlist_id}"
+
+    if path_parts and (path_parts[0].startswith("@") or path_parts[0] in CHANNEL_PATH_PREFIXES):
+        base_length = 1 if path_parts[0].startswith("@") else 2
+        if len(path_parts) < base_length:
+            return None
+        base = "/".join(path_parts[:base_length])
+        tab = path_parts[base_length] if len(path_parts) > base_length else "videos"
+        if tab not in CHANNEL_TABS:
+            tab = "videos"
+        return f"https://www.youtube.com/{base}/{tab}"
+
+    return None
+
+
+def expand_collection(url: str, max_videos: int = MAX_COLLECTION_VIDEOS) -> dict:
+    """
+    List the videos of a playlist or channel.
+
+    Args:
+        url: Playlist URL (any URL with a ``list=`` parameter) or channel URL
+        max_videos: Maximum number of videos to list (capped at MAX_COLLECTION_VIDEOS)
+
+    Returns:
+        Dict with "title" and "videos" (list of {"video_id", "title"}, in collection order)
+
+    Raises:
+        ValueError: If ``url`` is not a playlist or channel URL
+        RuntimeError: If yt-dlp is not installed
+    """
+    target = collection_url(url)
+    if target is None:
+        raise ValueError("Not a YouTube playlist or channel URL.")
+    if yt_dlp is None:
+        raise RuntimeError("Playlist and channel ingestion requires yt-dlp (pip install yt-dlp).")
+
+    limit = max(1, min(max_videos, MAX_COLLECTION_VIDEOS))
+    options = {
+        "extract_flat": "in_playlist",  # List entries only, no per-video requests
+        "playlistend": limit,
+        "skip_download": True,
+        "quiet": True,
+        "no_warnings": True,
+    }
+    with yt_dlp.YoutubeDL(options) as ydl:
+        info = ydl.extract_info(target, download=False)
+
+    videos, seen = [], set()
+    for entry in info.get("entries") or []:
+        video_id = (entry or {}).get("id")
+        if not video_id or not VIDEO_ID_PATTERN.match(video_id) or video_id in seen:
+            continue
+        seen.add(video_id)
+        videos.append({"video_id": video_id, "title": entry.get("title")})
+        if len(videos) >= limit:
+            break
+
+    return {"title": info.get("title"), "videos": videos}
+
+
+def prefetch_transcript(video_id: str) -> str:
+    """
+    Make sure a video's transcript is in the transcript cache.
+
+    Returns:
+        "cached" (already there, nothing fetched), "fetched" or "missing"
+        (the video has no transcript)
+    """
+    if get_transcript_cache().contains(video_id):
+        return TRANSCRIPT_CACHED
+    docs = load_transcript(video_id)
+    if not docs or not any(doc.page_content.strip() for doc in docs):
+        return TRANSCRIPT_MISSING
+    return TRANSCRIPT_FETCHED
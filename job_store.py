@@ -0,0 +1,267 @@
+"""
+Persistent state of background jobs run by the API.
+
+Each job (summarize, notes, translate) is a row in a local SQLite file with
+its status, latest progress and result, so clients can keep polling
+``GET /jobs/{id}`` across API restarts. The jobs themselves run in memory,
+in the process that accepted them (``uvicorn --workers N`` shares the file
+between N processes): each job records its owner (host, pid and a per-process
+boot ID) and a heartbeat the owner refreshes while it is alive. Queued or
+running jobs whose owner is gone (its pid no longer exists on this host, or
+its heartbeat is older than ``JOB_HEARTBEAT_TIMEOUT_SECONDS``) are marked
+failed; their finished LLM calls are in the response cache, so resubmitting
+is cheap. Only the owner moves a job out of queued/running, and never out of
+failed, so a job is never reported failed and then succeeded.
+"""
+
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+# --------------------------- CONFIG ---------------------------
+JOB_STORE_FILE = os.environ.get("JOB_STORE_FILE", "jobs.db")
+JOB_RETENTION_SECONDS = int(os.environ.get("JOB_RETENTION_HOURS", str(7 * 24))) * 3600
+# The owner refreshes its jobs every JOB_HEARTBEAT_SECONDS; after
+# JOB_HEARTBEAT_TIMEOUT_SECONDS without one, other processes consider it dead
+JOB_HEARTBEAT_SECONDS = int(os.environ.get("JOB_HEARTBEAT_SECONDS", "10"))
+JOB_HEARTBEAT_TIMEOUT_SECONDS = int(os.environ.get("JOB_HEARTBEAT_TIMEOUT_SECONDS", "60"))
+
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_SUCCEEDED = "succeeded"
+STATUS_FAILED = "failed"
+
+# Columns added after the first release, created on existing files too
+OWNER_COLUMNS = {"owner": "TEXT", "owner_host": "TEXT", "owner_pid": "INTEGER", "heartbeat_at": "REAL"}
+
+
+def pid_alive(pid: int) -> bool:
+    """Whether a process with this pid exists on this host (assumed so where it cannot be checked)."""
+    if os.name == "nt":  # os.kill(pid, 0) sends CTRL_C_EVENT there: rely on the heartbeat
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:  # EPERM: exists, owned by another user
+        pass
+    return True
+
+
+class JobStore:
+    """
+    Thread-safe job table stored in SQLite.
+
+    Jobs created through a store are owned by it: create one store per
+    process (``get_job_store``).
+    """
+
+    def __init__(self, path: str = JOB_STORE_FILE, retention_seconds: int = JOB_RETENTION_SECONDS,
+                 heartbeat_timeout_seconds: int = JOB_HEARTBEAT_TIMEOUT_SECONDS):
+        self.path = path
+        self.retention_seconds = retention_seconds
+        self.heartbeat_timeout_seconds = heartbeat_timeout_seconds
+        self.owner = uuid.uuid4().hex
+        self.host = socket.gethostname()
+        self.pid = os.getpid()
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " id TEXT PRIMARY KEY,"
+                " kind TEXT NOT NULL,"
+                " status TEXT NOT NULL,"
+                " provider TEXT,"
+                " model TEXT,"
+                " progress TEXT,"
+                " progress_seq INTEGER NOT NULL DEFAULT 0,"
+                " result TEXT,"
+                " error TEXT,"
+                " created_at REAL NOT NULL,"
+                " updated_at REAL NOT NULL)"
+            )
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}
+            for name, kind in OWNER_COLUMNS.items():
+                if name not in columns:
+                    try:
+                        conn.execute(f"ALTER TABLE jobs ADD COLUMN {name} {kind}")
+                    except sqlite3.OperationalError as e:
+                        if "duplicate column" not in str(e):  # Added by another worker meanwhile
+                            raise
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def create(self, kind: str, provider: str = None, model: str = None) -> str:
+        """
+        Register a new queued job, owned by this store, and drop finished
+        jobs past the retention period.
+
+        Returns:
+            Job ID
+        """
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, kind, status, provider, model, created_at, updated_at,"
+                " owner, owner_host, owner_pid, heartbeat_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, kind, STATUS_QUEUED, provider, model, now, now, self.owner, self.host, self.pid, now),
+            )
+            conn.execute(
+                "DELETE FROM jobs WHERE status IN (?, ?) AND updated_at < ?",
+                (STATUS_SUCCEEDED, STATUS_FAILED, now - self.retention_seconds),
+            )
+        return job_id
+
+    def _update(self, job_id: str, **fields):
+        # Only while this store owns the job and it is unfinished: a job
+        # failed as orphaned stays failed
+        fields["updated_at"] = fields["heartbeat_at"] = time.time()
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                f"UPDATE jobs SET {assignments} WHERE id = ? AND owner = ? AND status IN (?, ?)",
+                (*fields.values(), job_id, self.owner, STATUS_QUEUED, STATUS_RUNNING),
+            )
+
+    def start(self, job_id: str):
+        self._update(job_id, status=STATUS_RUNNING)
+
+    def set_progress(self, job_id: str, progress: dict, seq: int):
+        """
+        Record the latest progress of a job.
+
+        Updates may be written from several threads: one with a lower
+        ``seq`` than the stored one is stale and ignored.
+        """
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET progress = ?, progress_seq = ?, updated_at = ?"
+                " WHERE id = ? AND progress_seq < ? AND owner = ? AND status = ?",
+                (json.dumps(progress), seq, time.time(), job_id, seq, self.owner, STATUS_RUNNING),
+            )
+
+    def succeed(self, job_id: str, result: dict):
+        self._update(job_id, status=STATUS_SUCCEEDED, result=json.dumps(result, ensure_ascii=False))
+
+    def fail(self, job_id: str, error: str):
+        self._update(job_id, status=STATUS_FAILED, error=error)
+
+    def get(self, job_id: str):
+        """
+        Get a job.
+
+        Returns:
+            Dict with "job_id", "kind", "status", "provider", "model",
+            "progress", "result", "error", "created_at" and "updated_at",
+            or None if there is no such job
+        """
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT id, kind, status, provider, model, progress, result, error, created_at, updated_at"
+                " FROM jobs WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "job_id": row[0],
+            "kind": row[1],
+            "status": row[2],
+            "provider": row[3],
+            "model": row[4],
+            "progress": json.loads(row[5]) if row[5] else None,
+            "result": json.loads(row[6]) if row[6] else None,
+            "error": row[7],
+            "created_at": row[8],
+            "updated_at": row[9],
+        }
+
+    def heartbeat(self) -> int:
+        """
+        Mark this store's unfinished jobs as still owned by a live process.
+
+        Returns:
+            Number of jobs refreshed
+        """
+        with self._lock, self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET heartbeat_at = ? WHERE owner = ? AND status IN (?, ?)",
+                (time.time(), self.owner, STATUS_QUEUED, STATUS_RUNNING),
+            )
+        return cursor.rowcount
+
+    def fail_orphaned(self, error: str) -> int:
+        """
+        Mark queued or running jobs of dead processes as failed.
+
+        A job is orphaned when its owner's pid no longer exists on this host,
+        or its heartbeat is older than the timeout (owners on other hosts,
+        and rows from before owners were recorded). This store's own jobs
+        are never orphaned.
+
+        Returns:
+            Number of jobs marked
+        """
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            rows = conn.execute(
+                "SELECT id, owner_host, owner_pid, heartbeat_at FROM jobs"
+                " WHERE status IN (?, ?) AND (owner IS NULL OR owner != ?)",
+                (STATUS_QUEUED, STATUS_RUNNING, self.owner),
+            ).fetchall()
+            orphaned = [
+                (job_id,) for job_id, host, pid, heartbeat_at in rows
+                if heartbeat_at is None
+                or heartbeat_at < now - self.heartbeat_timeout_seconds
+                or (host == self.host and pid != self.pid and not pid_alive(pid))
+            ]
+            conn.executemany(
+                "UPDATE jobs SET status = ?, error = ?, updated_at = ? WHERE id = ? AND status IN (?, ?)",
+                [(STATUS_FAILED, error, now, job_id, STATUS_QUEUED, STATUS_RUNNING) for (job_id,) in orphaned],
+            )
+        return len(orphaned)
+
+    def fail_owned(self, error: str) -> int:
+        """
+        Mark this store's queued or running jobs as failed (used at shutdown).
+
+        Returns:
+            Number of jobs marked
+        """
+        with self._lock, self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, updated_at = ? WHERE owner = ? AND status IN (?, ?)",
+                (STATUS_FAILED, error, time.time(), self.owner, STATUS_QUEUED, STATUS_RUNNING),
+            )
+        return cursor.rowcount
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_job_store() -> JobStore:
+    """
+    Process-wide job store (created on first use), owner of the jobs this
+    process runs. Orphaned jobs are failed by the API's startup and
+    heartbeat hooks, not here.
+    """
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None or _default_store.pid != os.getpid():  # Not inherited by a fork
+            _default_store = JobStore()
+        return _default_store
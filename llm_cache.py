@@ -0,0 +1,172 @@
+"""
+Content-addressed cache for LLM responses.
+
+A ``CachedLLM`` wraps the (rate-limited) LLM returned by ``create_llm``. The
+cache key is a SHA-256 of (provider, model, rendered prompt, generation
+parameters, plus the server URL for Ollama), so identical chunks of popular
+videos, and whole re-runs of a cached video, are answered from a local
+SQLite file without a provider call.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import threading
+
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+from sqlite_cache import SQLiteCache
+from tracing import annotate
+
+# --------------------------- CONFIG ---------------------------
+CACHE_FILE = os.environ.get("LLM_CACHE_FILE", "llm_cache.db")
+CACHE_MAX_BYTES = int(os.environ.get("LLM_CACHE_MAX_MB", "100")) * 1024 * 1024
+CACHE_TTL_SECONDS = int(os.environ.get("LLM_CACHE_TTL_HOURS", str(30 * 24))) * 3600
+
+# LLM attributes that change the generated output
+GENERATION_PARAMS = ("temperature", "max_tokens", "top_p", "top_k", "num_predict", "seed", "stop")
+
+
+class LLMResponseCache(SQLiteCache):
+    """Response texts keyed by request hash, with TTL expiry and size-based LRU eviction."""
+
+    def __init__(self, path: str = CACHE_FILE, max_bytes: int = CACHE_MAX_BYTES, ttl_seconds: int = CACHE_TTL_SECONDS):
+        super().__init__(path, "responses", max_bytes, ttl_seconds)
+
+    def get(self, key: str):
+        """
+        Get a cached response.
+
+        Returns:
+            Dict with "content" and "kind" ("message" or "text"), or None on a miss
+        """
+        data = self.get_bytes(key)
+        return json.loads(data.decode("utf-8")) if data is not None else None
+
+    def put(self, key: str, content: str, kind: str):
+        self.put_bytes(key, json.dumps({"content": content, "kind": kind}, ensure_ascii=False).encode("utf-8"))
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> LLMResponseCache:
+    """Process-wide cache instance (created on first use)."""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = LLMResponseCache()
+        return _default_cache
+
+
+def make_cache_key(provider: str, model: str, prompt, params: dict, base_url: str = None) -> str:
+    """
+    SHA-256 of (provider, model, rendered prompt, generation params).
+
+    ``base_url`` (Ollama) is added when set: two servers may serve different
+    models under the same name. Keys without it are unchanged.
+    """
+    request = {"provider": provider, "model": model, "prompt": str(prompt), "params": params}
+    if base_url:
+        request["base_url"] = base_url
+    payload = json.dumps(request, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def get_generation_params(llm) -> dict:
+    """Collect the generation parameters set on an LLM (or on the LLM it wraps)."""
+    target = getattr(llm, "llm", llm)
+    params = {}
+    for name in GENERATION_PARAMS:
+        value = getattr(target, name, None)
+        if value is not None:
+            params[name] = value
+    return params
+
+
+class CachedLLM:
+    """
+    Wrap an LLM so ``invoke``/``ainvoke``/``astream`` answer repeated prompts from the cache.
+
+    Chat models get an ``AIMessage`` back (``AIMessageChunk`` when
+    streaming) and plain-text LLMs (Ollama in app_local.py) get a string,
+    whether the answer is cached or not. A cached answer is streamed as a
+    single chunk.
+    Attributes not defined here are forwarded to the wrapped LLM.
+    """
+
+    def __init__(self, llm, provider: str, model: str, cache: LLMResponseCache = None, base_url: str = None):
+        self.llm = llm
+        self.provider = provider
+        self.model = model
+        self.base_url = base_url
+        self.cache = cache or get_llm_cache()
+        self.params = get_generation_params(llm)
+
+    def __getattr__(self, name):
+        return getattr(self.llm, name)
+
+    def _key(self, prompt, kwargs) -> str:
+        return make_cache_key(self.provider, self.model, prompt, {**self.params, **kwargs}, self.base_url)
+
+    @staticmethod
+    def _from_cache(entry):
+        if entry["kind"] == "text":
+            return entry["content"]
+        return AIMessage(content=entry["content"], response_metadata={"cached": True})
+
+    @staticmethod
+    def _to_cache(result):
+        if isinstance(result, str):
+            return result, "text"
+        return result.content, "message"
+
+    def invoke(self, prompt, **kwargs):
+        key = self._key(prompt, kwargs)
+        entry = self.cache.get(key)
+        if entry is not None:
+            annotate(cached=True)
+            return self._from_cache(entry)
+        result = self.llm.invoke(prompt, **kwargs)
+        self.cache.put(key, *self._to_cache(result))
+        return result
+
+    async def ainvoke(self, prompt, **kwargs):
+        key = self._key(prompt, kwargs)
+        # SQLite access is blocking: keep it off the event loop
+        entry = await asyncio.to_thread(self.cache.get, key)
+        if entry is not None:
+            annotate(cached=True)
+            return self._from_cache(entry)
+        result = await self.llm.ainvoke(prompt, **kwargs)
+        await asyncio.to_thread(self.cache.put, key, *self._to_cache(result))
+        return result
+
+    async def astream(self, prompt, **kwargs):
+        key = self._key(prompt, kwargs)
+        entry = await asyncio.to_thread(self.cache.get, key)
+        if entry is not None:
+            annotate(cached=True)
+            if entry["kind"] == "text":
+                yield entry["content"]
+            else:
+                yield AIMessageChunk(content=entry["content"], response_metadata={"cached": True})
+            return
+
+        parts, kind = [], "message"
+        async for chunk in self.llm.astream(prompt, **kwargs):
+            if isinstance(chunk, str):
+                parts.append(chunk)
+                kind = "text"
+            else:
+                parts.append(chunk.content)
+            yield chunk
+        # Only complete responses are cached (an interrupted stream never gets here)
+        await asyncio.to_thread(self.cache.put, key, "".join(parts), kind)
+
+
+def cached(llm, provider: str, model: str, base_url: str = None) -> CachedLLM:
+    """Wrap ``llm`` with the process-wide response cache (``base_url``: Ollama server URL)."""
+    return CachedLLM(llm, provider, model, base_url=base_url)
@@ -0,0 +1,123 @@
+"""
+Process-wide registry of LLM clients.
+
+Every client built by ``create_llm`` owns its HTTP connection pool. Building
+one per request (API) or per button click (Streamlit) pays a new TCP and TLS
+handshake to the provider each time. The registry keeps one client per
+(provider, model, base URL, API key hash) so keep-alive connections are
+reused across requests, and drops clients that have not been used for a
+while.
+"""
+
+import hashlib
+import os
+import threading
+import time
+
+from llm_factory import create_llm
+
+# --------------------------- CONFIG ---------------------------
+CLIENT_IDLE_SECONDS = int(os.environ.get("LLM_CLIENT_IDLE_SECONDS", "900"))
+MAX_CLIENTS = int(os.environ.get("LLM_MAX_CLIENTS", "64"))
+
+
+def api_key_hash(api_key: str = None) -> str:
+    """Short hash identifying an API key without keeping the key itself."""
+    return hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()[:16]
+
+
+def create_client(provider: str, model: str, api_key: str = None, base_url: str = None):
+    """Build a new client through ``create_llm`` (Ollama takes its server URL, the others an API key)."""
+    if provider == "ollama":
+        return create_llm("ollama", model=model, base_url=base_url)
+    return create_llm(provider, api_key=api_key, model=model)
+
+
+class LLMClientRegistry:
+    """
+    Thread-safe cache of LLM clients with idle eviction.
+
+    Clients are evicted once unused for ``idle_seconds``, and the least
+    recently used one goes first when more than ``max_clients`` are held.
+    API keys are only kept as hashes in the registry keys.
+    """
+
+    def __init__(self, factory=create_client, idle_seconds: int = CLIENT_IDLE_SECONDS, max_clients: int = MAX_CLIENTS):
+        self.factory = factory
+        self.idle_seconds = idle_seconds
+        self.max_clients = max_clients
+        self.created = 0
+        self.reused = 0
+        self.evicted = 0
+        self._clients = {}  # key -> [client, last_used]
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(provider: str, model: str, api_key: str = None, base_url: str = None) -> tuple:
+        return (provider, model, base_url, api_key_hash(api_key))
+
+    def get(self, provider: str, model: str, api_key: str = None, base_url: str = None):
+        """
+        Get the client for (provider, model, base URL, API key), creating it on first use.
+
+        Raises:
+            Whatever ``create_llm`` raises for an invalid configuration
+        """
+        key = self.make_key(provider, model, api_key, base_url)
+        now = time.monotonic()
+        with self._lock:
+            self._evict(now)
+            entry = self._clients.get(key)
+            if entry is not None:
+                entry[1] = now
+                self.reused += 1
+                return entry[0]
+
+            client = self.factory(provider, model, api_key=api_key, base_url=base_url)
+            self._clients[key] = [client, now]
+            self.created += 1
+            self._evict(now)
+            return client
+
+    def _evict(self, now: float):
+        for key in [key for key, (_, last_used) in self._clients.items() if now - last_used > self.idle_seconds]:
+            del self._clients[key]
+            self.evicted += 1
+        while len(self._clients) > self.max_clients:
+            oldest = min(self._clients, key=lambda key: self._clients[key][1])
+            del self._clients[oldest]
+            self.evicted += 1
+
+    def clear(self):
+        with self._lock:
+            self._clients.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._evict(time.monotonic())
+            return {
+                "clients": len(self._clients),
+                "max_clients": self.max_clients,
+                "idle_seconds": self.idle_seconds,
+                "created": self.created,
+                "reused": self.reused,
+                "evicted": self.evicted,
+            }
+
+
+_default_registry = None
+_default_registry_lock = threading.Lock()
+
+
+def get_client_registry() -> LLMClientRegistry:
+    """Process-wide registry instance (created on first use)."""
+    global _default_registry
+    with _default_registry_lock:
+        if _default_registry is None:
+            _default_registry = LLMClientRegistry()
+        return _default_registry
+
+
+def get_llm_client(provider: str, model: str, api_key: str = None, base_url: str = None):
+    """Shared client for (provider, model, base URL, API key) from the process-wide registry."""
+    return get_client_registry().get(provider, model, api_key, base_url)
@@ -0,0 +1,109 @@
+"""
+Small in-process key/value cache with TTL expiry and LRU eviction.
+
+For values worth keeping across Streamlit reruns and sessions that are read
+from the task runner's threads, where ``st.cache_data`` can't be used (it
+needs the script's ScriptRunContext). Values are kept as is: treat them as
+read-only.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class MemoryCache:
+    """Thread-safe dict with per-entry expiry and a maximum number of entries."""
+
+    def __init__(self, max_entries: int, ttl_seconds: int):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (value, created_at), least recently used first
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """
+        Get a cached value.
+
+        Returns:
+            The value, or ``default`` on a miss or an expired entry
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is _MISSING or now - entry[1] > self.ttl_seconds:
+                if entry is not _MISSING:
+                    del self._entries[key]
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return entry[0]
+
+    def put(self, key, value):
+        """Store a value, then evict the least recently used entries past ``max_entries``."""
+        with self._lock:
+            self._entries[key] = (value, time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_compute(self, key, compute):
+        """
+        Cached value for a key, computed with ``compute()`` on a miss.
+
+        ``compute`` runs outside the lock: concurrent misses on one key may
+        each compute it, and the last one is kept.
+        """
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        """Delete every entry (the hit/miss counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            count = len(self._entries)
+        lookups = self.hits + self.misses
+        return {
+            "entries": count,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_memory_cache(name: str, max_entries: int, ttl_seconds: int) -> MemoryCache:
+    """
+    Process-wide cache registered under a name (created on first use).
+
+    Kept here rather than in the Streamlit script, whose globals are rebuilt
+    on every rerun; the sizes of the first call win.
+    """
+    with _caches_lock:
+        if name not in _caches:
+            _caches[name] = MemoryCache(max_entries, ttl_seconds)
+        return _caches[name]
+
+
+def clear_memory_caches():
+    """Empty every registered cache (for benchmarks and tests)."""
+    with _caches_lock:
+        caches = list(_caches.values())
+    for cache in caches:
+        cache.clear()
@@ -0,0 +1,246 @@
+"""
+In-process metrics in the Prometheus text exposition format.
+
+Counters and histograms live in memory and are rendered by the API's
+``/metrics`` endpoint, so a Prometheus server can scrape it, or it can be
+read with curl when nothing else runs (no client library or collector
+needed). Values are per process: with several uvicorn workers, each worker
+exposes its own.
+
+The pipeline tags the LLM calls it makes with the current stage ("map",
+"reduce", "combine", ...) through ``llm_stage``; the rate limiter wrapper
+reads it to label call latencies.
+"""
+
+import contextvars
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+# --------------------------- CONFIG ---------------------------
+METRIC_PREFIX = "summarizer"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; covers cached answers (ms) up to multi-minute reduce trees
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple, values: tuple, extra: str = None) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    """Monotonic counter, one series per combination of label values."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}  # label values -> count
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            return self._values.get(key, 0)
+
+    def samples(self) -> list:
+        with self._lock:
+            return [
+                f"{self.name}{_labels(self.labelnames, key)} {_format_value(value)}"
+                for key, value in sorted(self._values.items())
+            ]
+
+
+class Histogram:
+    """Latency histogram with cumulative buckets, one series per combination of label values."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._series = {}  # label values -> [bucket counts, sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][index] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of the ``with`` block (also when it raises)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self) -> list:
+        lines = []
+        with self._lock:
+            for key, (counts, total, count) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    cumulative += bucket_count
+                    le = f'le="{_format_value(bound)}"'
+                    lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}")
+                lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_format_value(total)}")
+                lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Named metrics of the process, rendered together."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, cls, name: str, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric {name} is already registered as a {metric.kind}")
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: tuple = ()) -> Counter:
+        """Get or create a counter."""
+        return self._register(Counter, name, documentation, labelnames)
+
+    def histogram(self, name: str, documentation: str, labelnames: tuple = (),
+                  buckets: tuple = DEFAULT_BUCKETS) -> Histogram:
+        """Get or create a histogram."""
+        return self._register(Histogram, name, documentation, labelnames, buckets)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+_default_registry = None
+_default_registry_lock = threading.Lock()
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    """Process-wide registry (created on first use)."""
+    global _default_registry
+    with _default_registry_lock:
+        if _default_registry is None:
+            _default_registry = MetricsRegistry()
+        return _default_registry
+
+
+# --------------------------- METRICS ---------------------------
+_registry = get_metrics_registry()
+
+HTTP_REQUESTS = _registry.counter(
+    f"{METRIC_PREFIX}_http_requests_total", "HTTP requests handled, by endpoint and status code.",
+    ("method", "endpoint", "status"),
+)
+HTTP_LATENCY = _registry.histogram(
+    f"{METRIC_PREFIX}_http_request_duration_seconds", "Time to the response headers, by endpoint.",
+    ("method", "endpoint"),
+)
+STAGE_LATENCY = _registry.histogram(
+    f"{METRIC_PREFIX}_stage_duration_seconds",
+    "Duration of pipeline stages outside LLM calls (transcript_load, chunking, youtube_search).",
+    ("stage",),
+)
+LLM_CALL_LATENCY = _registry.histogram(
+    f"{METRIC_PREFIX}_llm_call_duration_seconds",
+    "Duration of one provider call (rate limit waits excluded), by pipeline stage.",
+    ("provider", "model", "stage"),
+)
+RATE_LIMIT_WAIT = _registry.histogram(
+    f"{METRIC_PREFIX}_rate_limit_wait_seconds", "Sleeps imposed by the shared rate limiter before a call.",
+    ("provider", "model"),
+)
+LLM_CALLS = _registry.counter(
+    f"{METRIC_PREFIX}_llm_calls_total", "Provider calls (cache hits excluded), by outcome.",
+    ("provider", "model", "outcome"),
+)
+LLM_TOKENS = _registry.counter(
+    f"{METRIC_PREFIX}_llm_tokens_total", "Tokens reported in response metadata, by direction (input/output).",
+    ("provider", "model", "direction"),
+)
+LLM_RETRIES = _registry.counter(
+    f"{METRIC_PREFIX}_llm_retries_total", "Calls retried after a rate limit error.",
+    ("provider", "model"),
+)
+LLM_RATE_LIMITED = _registry.counter(
+    f"{METRIC_PREFIX}_llm_rate_limited_total", "429 / rate limit responses from the provider.",
+    ("provider", "model"),
+)
+
+
+# --------------------------- HELPERS ---------------------------
+_llm_stage = contextvars.ContextVar("llm_stage", default="other")
+
+
+@contextmanager
+def llm_stage(stage: str):
+    """Label the LLM calls made in the ``with`` block (and tasks started from it) with ``stage``."""
+    previous = _llm_stage.get()
+    _llm_stage.set(stage)
+    try:
+        yield
+    finally:
+        # set() rather than reset(): async generators may resume in another context
+        _llm_stage.set(previous)
+
+
+def current_llm_stage() -> str:
+    return _llm_stage.get()
+
+
+def time_stage(stage: str):
+    """Context manager observing the duration of a non-LLM stage."""
+    return STAGE_LATENCY.time(stage=stage)
+
+
+def render_metrics() -> str:
+    return get_metrics_registry().render()
@@ -0,0 +1,494 @@
+"""
+Async summarization pipeline used by the API endpoints.
+
+Each request gets a strategy based on the selected model's context window and
+TPM budget:
+
+- "stuff": the whole text fits in one call
+- "map_reduce": summarize chunks concurrently, then combine once
+- "hierarchical": the chunk summaries are themselves too long for one
+  combine call and are reduced as a tree: groups of at most ``fan_in``
+  summaries are combined concurrently, level by level, until the rest fits
+  one final combine call
+
+Long-running callers (the job API) can pass an async ``progress(stage, done,
+total)`` callback, awaited after every LLM call. ``stream_summary`` runs the
+same strategies as an async generator of events for the streaming endpoint.
+The Streamlit tasks, which run on plain threads, map and reduce with the
+blocking ``map_prompts_sync`` and ``reduce_summaries_sync``.
+"""
+
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+
+from langchain.prompts import PromptTemplate
+
+from chunking import count_tokens, get_single_call_tokens, split_text
+from metrics import llm_stage, time_stage
+from tracing import annotate, span
+from rate_limiter import DEFAULT_OUTPUT_TOKENS
+
+# Maximum number of chunk calls a single request may have in flight
+DEFAULT_MAP_CONCURRENCY = 4
+MAX_MAP_CONCURRENCY = 16
+
+# Maximum number of summaries merged by one combine call in the reduce tree
+DEFAULT_REDUCE_FAN_IN = 8
+MAX_REDUCE_FAN_IN = 32
+
+# Intermediate reduce levels before the final combine is forced (fan-in 2
+# over 8 levels already merges 256 summaries)
+MAX_REDUCE_LEVELS = 8
+
+STRATEGY_STUFF = "stuff"
+STRATEGY_MAP_REDUCE = "map_reduce"
+STRATEGY_HIERARCHICAL = "hierarchical"
+
+
+async def split_for_llm(llm, text: str, chunk_tokens: int = None) -> list:
+    """Split text on sentence boundaries into chunks sized for the LLM's model (off the event loop)."""
+    with time_stage("chunking"), span("chunking", chars=len(text)):
+        chunks = await asyncio.to_thread(split_text, text, llm.provider, llm.model, chunk_tokens)
+        annotate(chunks=len(chunks))
+    return chunks
+
+
+@contextmanager
+def llm_call(stage: str, prompt: str, **attributes):
+    """
+    Label the LLM call made in the ``with`` block with ``stage`` for the
+    metrics and trace it as a span with the prompt size (chunk index etc.
+    as ``attributes``). "reduce_2" is recorded as "reduce" in the metrics.
+    """
+    with llm_stage(stage.split("_")[0]), span(stage, chars=len(prompt), **attributes):
+        yield
+
+
+async def map_chunks(llm, prompt: PromptTemplate, chunks: list, max_concurrency: int = DEFAULT_MAP_CONCURRENCY,
+                     progress=None, stage: str = "map") -> list:
+    """
+    Run ``prompt`` over every chunk concurrently through the async LLM interface.
+
+    Args:
+        llm: LLM instance exposing ``ainvoke`` (rate limiting and 429 retries are handled by the wrapper from ``init_llm``)
+        prompt: Template with a single ``{text}`` variable
+        chunks: Text chunks to process
+        max_concurrency: Maximum number of calls in flight for this request
+        progress: Optional async ``progress(stage, done, total)`` callback
+        stage: Stage name reported to ``progress``
+
+    Returns:
+        List of stripped results, in the same order as ``chunks``
+    """
+    return await map_prompts(llm, [prompt.format(text=chunk) for chunk in chunks], max_concurrency, progress, stage)
+
+
+async def map_prompts(llm, prompts: list, max_concurrency: int = DEFAULT_MAP_CONCURRENCY,
+                      progress=None, stage: str = "map", on_result=None) -> list:
+    """
+    Run already formatted prompts concurrently, e.g. one per (chunk, language)
+    pair, with at most ``max_concurrency`` (capped at MAX_MAP_CONCURRENCY)
+    calls in flight across all of them. If a call fails (or the caller is
+    cancelled), the calls still running are cancelled.
+
+    ``on_result``, if given, is an async ``on_result(index, result)``
+    callback awaited as each call completes (the streaming endpoint).
+
+    Returns:
+        List of stripped results, in the same order as ``prompts``
+    """
+    semaphore = asyncio.Semaphore(max(1, min(max_concurrency, MAX_MAP_CONCURRENCY)))
+    done = 0
+
+    async def run(index, prompt):
+        nonlocal done
+        async with semaphore:
+            with llm_call(stage, prompt, index=index):
+                result = await llm.ainvoke(prompt)
+        done += 1
+        if on_result is not None:
+            await on_result(index, result.content.strip())
+        if progress is not None:
+            await progress(stage, done, len(prompts))
+        return result.content.strip()
+
+    tasks = [asyncio.ensure_future(run(index, prompt)) for index, prompt in enumerate(prompts)]
+    try:
+        # gather() preserves input order regardless of completion order
+        return await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def group_for_reduce(texts: list, fan_in: int, max_tokens: int, model: str = None) -> list:
+    """
+    Pack consecutive texts into groups for one combine call each.
+
+    A group holds at most ``fan_in`` texts and, unless a single text is
+    already larger, at most ``max_tokens`` tokens once joined.
+
+    Returns:
+        List of groups (lists of texts), in order
+    """
+    groups, current, current_tokens = [], [], 0
+    for text in texts:
+        tokens = count_tokens(text, model) + 2
+        if current and (len(current) >= fan_in or current_tokens + tokens > max_tokens):
+            groups.append(current)
+            current, current_tokens = [], 0
+        current.append(text)
+        current_tokens += tokens
+    if current:
+        groups.append(current)
+    return groups
+
+
+def truncate_summaries(summaries: list, max_tokens: int, provider: str, model: str = None) -> str:
+    """
+    Join ``summaries`` within ``max_tokens``, cutting each one (on a
+    sentence boundary) to an equal share, so every part of the video keeps
+    a place in the final combine.
+    """
+    share = max(1, (max_tokens - 2 * len(summaries)) // len(summaries))
+    kept = []
+    for summary in summaries:
+        if count_tokens(summary, model) > share:
+            summary = split_text(summary, provider, model, share)[0]
+        kept.append(summary)
+    return "\n\n".join(kept)
+
+
+def next_reduce_level(summaries: list, fan_in: int, budget: int, provider: str, model: str = None,
+                      levels: int = 0, previous: tuple = None) -> dict:
+    """
+    Next step of the reduce tree (blocking: counts tokens).
+
+    The tree is done when the joined summaries fit one call of ``budget``
+    tokens and at most ``fan_in`` summaries. It is cut short after
+    MAX_REDUCE_LEVELS levels, or when the last level reduced neither the
+    number of summaries nor their tokens (``previous``, e.g. a single
+    summary larger than the budget, or combines that do not shrink): the
+    summaries are then truncated to fit the final combine.
+
+    Returns:
+        Dict with "groups" (joined group texts to combine at the next level,
+        or None when done), "text" (input of the final combine, when done),
+        "truncated" and "size" ((summaries, tokens), the next ``previous``)
+    """
+    combined_text = "\n\n".join(summaries)
+    tokens = count_tokens(combined_text, model)
+    size = (len(summaries), tokens)
+    if len(summaries) <= fan_in and tokens <= budget:
+        return {"groups": None, "text": combined_text, "truncated": False, "size": size}
+    stalled = previous is not None and size[0] >= previous[0] and size[1] >= previous[1]
+    if levels >= MAX_REDUCE_LEVELS or stalled:
+        text = truncate_summaries(summaries, budget, provider, model)
+        return {"groups": None, "text": text, "truncated": True, "size": size}
+    groups = group_for_reduce(summaries, fan_in, budget, model)
+    return {"groups": ["\n\n".join(group) for group in groups], "text": None, "truncated": False, "size": size}
+
+
+async def reduce_to_single_call(llm, summaries: list, combine_prompt: PromptTemplate,
+                                fan_in: int = DEFAULT_REDUCE_FAN_IN,
+                                max_concurrency: int = DEFAULT_MAP_CONCURRENCY, progress=None) -> dict:
+    """
+    Run the intermediate levels of the reduce tree until the summaries fit
+    one final combine call.
+
+    While the joined summaries do not fit a single call, they are grouped
+    (at most ``fan_in`` per group) and every group of a level is combined
+    concurrently. Each level divides the number of summaries by up to
+    ``fan_in`` while keeping their size bounded by the model output, so a
+    10-hour stream needs only a few levels before the final combine. The
+    tree stops early when it stalls (see ``next_reduce_level``).
+
+    Args:
+        llm: LLM instance exposing ``ainvoke``, ``provider`` and ``model``
+        summaries: Partial summaries, in transcript order
+        combine_prompt: Template with a single ``{text}`` variable
+        fan_in: Maximum number of summaries per combine call (at least 2)
+        max_concurrency: Maximum number of calls in flight for this request
+        progress: Optional async ``progress(stage, done, total)`` callback
+
+    Returns:
+        Dict with "text" (input of the final combine), "levels" (0 if a
+        single combine is enough), "llm_calls" (made so far) and
+        "truncated"
+    """
+    fan_in = max(2, min(fan_in, MAX_REDUCE_FAN_IN))
+    budget = get_single_call_tokens(llm.provider, llm.model)
+    levels, llm_calls, previous = 0, 0, None
+
+    while True:
+        step = await asyncio.to_thread(next_reduce_level, summaries, fan_in, budget, llm.provider, llm.model,
+                                       levels, previous)
+        if step["groups"] is None:
+            break
+        previous = step["size"]
+        levels += 1
+        summaries = await map_chunks(llm, combine_prompt, step["groups"], max_concurrency, progress, f"reduce_{levels}")
+        llm_calls += len(step["groups"])
+
+    if step["truncated"]:
+        annotate(reduce_truncated=True)
+    return {"text": step["text"], "levels": levels, "llm_calls": llm_calls, "truncated": step["truncated"]}
+
+
+async def reduce_summaries(llm, summaries: list, combine_prompt: PromptTemplate,
+                           fan_in: int = DEFAULT_REDUCE_FAN_IN,
+                           max_concurrency: int = DEFAULT_MAP_CONCURRENCY, progress=None) -> dict:
+    """
+    Reduce partial summaries to one summary with a tree of combine calls
+    (see ``reduce_to_single_call``), then the final combine.
+
+    Returns:
+        Dict with "summary", "levels" (intermediate levels, 0 if a single
+        combine was enough) and "llm_calls"
+    """
+    reduced = await reduce_to_single_call(llm, summaries, combine_prompt, fan_in, max_concurrency, progress)
+    final_prompt = combine_prompt.format(text=reduced["text"])
+    with llm_call("combine", final_prompt):
+        result = await llm.ainvoke(final_prompt)
+    if progress is not None:
+        await progress("combine", 1, 1)
+    return {"summary": result.content.strip(), "levels": reduced["levels"], "llm_calls": reduced["llm_calls"] + 1}
+
+
+def response_text(result) -> str:
+    """Stripped text of a chat model message, or of a plain-text LLM's string."""
+    return (result if isinstance(result, str) else result.content).strip()
+
+
+def map_prompts_sync(llm, prompts: list, max_concurrency: int = DEFAULT_MAP_CONCURRENCY,
+                     progress=None, stage: str = "map") -> list:
+    """
+    Blocking ``map_prompts``: ``llm.invoke`` on a pool of at most
+    ``max_concurrency`` (capped at MAX_MAP_CONCURRENCY) threads, with a
+    plain ``progress(stage, done, total)`` callback called from the caller's
+    thread. If a call fails, the calls not started yet are skipped.
+
+    Returns:
+        List of stripped results, in the same order as ``prompts``
+    """
+    def run(index, prompt):
+        with llm_call(stage, prompt, index=index):
+            return response_text(llm.invoke(prompt))
+
+    results = [None] * len(prompts)
+    workers = max(1, min(max_concurrency, MAX_MAP_CONCURRENCY, len(prompts)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="llm-map") as executor:
+        # Each call keeps the caller's metrics stage and trace span
+        futures = {
+            executor.submit(contextvars.copy_context().run, run, index, prompt): index
+            for index, prompt in enumerate(prompts)
+        }
+        try:
+            for done, future in enumerate(as_completed(futures), 1):
+                results[futures[future]] = future.result()
+                if progress is not None:
+                    progress(stage, done, len(prompts))
+        finally:
+            for future in futures:
+                future.cancel()
+    return results
+
+
+def reduce_summaries_sync(llm, summaries: list, combine_prompt: PromptTemplate,
+                          fan_in: int = DEFAULT_REDUCE_FAN_IN,
+                          max_concurrency: int = DEFAULT_MAP_CONCURRENCY) -> dict:
+    """
+    Blocking ``reduce_summaries`` for callers without an event loop (the
+    Streamlit tasks), through ``llm.invoke``; each level's combine calls run
+    on a thread pool. Also takes plain-text LLMs (Ollama in app_local.py).
+
+    Not ``asyncio.run(reduce_summaries(...))``: shared clients (registry,
+    ``st.cache_resource``) bind their async connection pool to the first
+    event loop that uses them, and every later ``asyncio.run`` loop fails.
+
+    Returns:
+        Dict with "summary", "levels" and "llm_calls"
+    """
+    fan_in = max(2, min(fan_in, MAX_REDUCE_FAN_IN))
+    budget = get_single_call_tokens(llm.provider, llm.model)
+    levels, llm_calls, previous = 0, 0, None
+
+    while True:
+        step = next_reduce_level(summaries, fan_in, budget, llm.provider, llm.model, levels, previous)
+        if step["groups"] is None:
+            break
+        previous = step["size"]
+        levels += 1
+        prompts = [combine_prompt.format(text=group) for group in step["groups"]]
+        summaries = map_prompts_sync(llm, prompts, max_concurrency, stage=f"reduce_{levels}")
+        llm_calls += len(prompts)
+
+    if step["truncated"]:
+        annotate(reduce_truncated=True)
+    final_prompt = combine_prompt.format(text=step["text"])
+    with llm_call("combine", final_prompt):
+        summary = response_text(llm.invoke(final_prompt))
+    return {"summary": summary, "levels": levels, "llm_calls": llm_calls + 1}
+
+
+def plan_summary(text: str, provider: str, model: str = None, fan_in: int = DEFAULT_REDUCE_FAN_IN) -> dict:
+    """
+    Pick the summarization strategy for ``text`` on the given model.
+
+    Returns:
+        Dict with "strategy", "chunks" (map inputs, or [text] for "stuff")
+        and "input_tokens"
+    """
+    with time_stage("chunking"), span("chunking", chars=len(text)):
+        budget = get_single_call_tokens(provider, model)
+        tokens = count_tokens(text, model)
+        annotate(tokens=tokens)
+        if tokens <= budget:
+            return {"strategy": STRATEGY_STUFF, "chunks": [text], "input_tokens": tokens}
+        chunks = split_text(text, provider, model)
+        annotate(chunks=len(chunks))
+
+    # Each map output is bounded by the reserved output tokens
+    if len(chunks) <= max(2, fan_in) and len(chunks) * DEFAULT_OUTPUT_TOKENS <= budget:
+        strategy = STRATEGY_MAP_REDUCE
+    else:
+        strategy = STRATEGY_HIERARCHICAL
+    return {"strategy": strategy, "chunks": chunks, "input_tokens": tokens}
+
+
+async def map_text(llm, text: str, map_prompt: PromptTemplate, max_concurrency: int = DEFAULT_MAP_CONCURRENCY,
+                   fan_in: int = DEFAULT_REDUCE_FAN_IN, progress=None) -> dict:
+    """
+    Plan ``text`` for the LLM's model and run the map pass if it needs one.
+
+    The map outputs can feed several reductions (summary, notes) without
+    mapping the text again.
+
+    Returns:
+        Dict with "strategy", "chunks" (number of map inputs) and
+        "summaries" (map outputs in order, or None for "stuff": the text
+        fits one call and is used as is)
+    """
+    plan = await asyncio.to_thread(plan_summary, text, llm.provider, llm.model, fan_in)
+    if plan["strategy"] == STRATEGY_STUFF:
+        return {"strategy": STRATEGY_STUFF, "chunks": 1, "summaries": None}
+
+    summaries = await map_chunks(llm, map_prompt, plan["chunks"], max_concurrency, progress)
+    return {"strategy": plan["strategy"], "chunks": len(plan["chunks"]), "summaries": summaries}
+
+
+async def summarize_text(llm, text: str, map_prompt: PromptTemplate, combine_prompt: PromptTemplate,
+                         max_concurrency: int = DEFAULT_MAP_CONCURRENCY,
+                         fan_in: int = DEFAULT_REDUCE_FAN_IN, progress=None) -> dict:
+    """
+    Summarize ``text`` with the strategy that fits the LLM's model.
+
+    Returns:
+        Dict with "summary", "strategy" (the one actually executed),
+        "chunks" (map inputs), "reduce_levels" and "llm_calls"
+    """
+    # Summarize all chunks concurrently (bounded per request)
+    mapped = await map_text(llm, text, map_prompt, max_concurrency, fan_in, progress)
+    return await summarize_mapped(llm, text, mapped, map_prompt, combine_prompt, max_concurrency, fan_in, progress)
+
+
+async def summarize_mapped(llm, text: str, mapped: dict, map_prompt: PromptTemplate, combine_prompt: PromptTemplate,
+                           max_concurrency: int = DEFAULT_MAP_CONCURRENCY,
+                           fan_in: int = DEFAULT_REDUCE_FAN_IN, progress=None) -> dict:
+    """
+    Summary reduction of a ``map_text`` result.
+
+    Returns:
+        Same dict as ``summarize_text``
+    """
+    if mapped["summaries"] is None:
+        prompt = map_prompt.format(text=text)
+        with llm_call("combine", prompt):
+            result = await llm.ainvoke(prompt)
+        if progress is not None:
+            await progress("combine", 1, 1)
+        return {"summary": result.content.strip(), "strategy": STRATEGY_STUFF, "chunks": 1, "reduce_levels": 0, "llm_calls": 1}
+
+    # Combine all summaries, through a reduce tree if they do not fit one call
+    reduced = await reduce_summaries(llm, mapped["summaries"], combine_prompt, fan_in, max_concurrency, progress)
+    strategy = STRATEGY_HIERARCHICAL if reduced["levels"] else STRATEGY_MAP_REDUCE
+
+    return {
+        "summary": reduced["summary"],
+        "strategy": strategy,
+        "chunks": mapped["chunks"],
+        "reduce_levels": reduced["levels"],
+        "llm_calls": mapped["chunks"] + reduced["llm_calls"],
+    }
+
+
+async def stream_summary(llm, text: str, map_prompt: PromptTemplate, combine_prompt: PromptTemplate,
+                         max_concurrency: int = DEFAULT_MAP_CONCURRENCY,
+                         fan_in: int = DEFAULT_REDUCE_FAN_IN):
+    """
+    Summarize ``text`` like ``summarize_text``, yielding results as they come.
+
+    Yields ``(event, data)`` tuples:
+
+    - ("plan", {"strategy", "chunks"})
+    - ("chunk", {"index", "done", "total", "summary"}) for each map call, in
+      completion order
+    - ("reduce", {"levels", "llm_calls"}) if intermediate reduce levels ran
+    - ("token", {"text"}) for each piece of the final call, as the provider
+      streams it
+    - ("done", {"summary", "strategy", "chunks", "reduce_levels", "llm_calls"})
+    """
+    plan = await asyncio.to_thread(plan_summary, text, llm.provider, llm.model, fan_in)
+    chunks = plan["chunks"]
+    yield "plan", {"strategy": plan["strategy"], "chunks": len(chunks)}
+
+    if plan["strategy"] == STRATEGY_STUFF:
+        strategy, levels, llm_calls = STRATEGY_STUFF, 0, 0
+        final_prompt = map_prompt.format(text=text)
+    else:
+        completed = asyncio.Queue()
+
+        async def on_result(index, summary):
+            completed.put_nowait((index, summary))
+
+        prompts = [map_prompt.format(text=chunk) for chunk in chunks]
+        mapping = asyncio.ensure_future(map_prompts(llm, prompts, max_concurrency, on_result=on_result))
+        # Queued after every result, or as soon as a call fails
+        mapping.add_done_callback(lambda task: completed.put_nowait(None))
+        try:
+            for done in range(1, len(chunks) + 1):
+                item = await completed.get()
+                if item is None:
+                    mapping.result()  # Raises the failed call's error
+                index, summary = item
+                yield "chunk", {"index": index, "done": done, "total": len(chunks), "summary": summary}
+            summaries = await mapping
+        finally:
+            # Client gone or a call failed: do not leave calls running
+            mapping.cancel()
+
+        reduced = await reduce_to_single_call(llm, summaries, combine_prompt, fan_in, max_concurrency)
+        levels = reduced["levels"]
+        llm_calls = len(chunks) + reduced["llm_calls"]
+        strategy = STRATEGY_HIERARCHICAL if levels else STRATEGY_MAP_REDUCE
+        if levels:
+            yield "reduce", {"levels": levels, "llm_calls": reduced["llm_calls"]}
+        final_prompt = combine_prompt.format(text=reduced["text"])
+
+    parts = []
+    with llm_call("combine", final_prompt):
+        async for chunk in llm.astream(final_prompt):
+            content = chunk if isinstance(chunk, str) else chunk.content
+            if content:
+                parts.append(content)
+                yield "token", {"text": content}
+
+    yield "done", {
+        "summary": "".join(parts).strip(),
+        "strategy": strategy,
+        "chunks": len(chunks),
+        "reduce_levels": levels,
+        "llm_calls": llm_calls + 1,
+    }
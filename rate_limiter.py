@@ -0,0 +1,428 @@
+"""
+Shared per-provider rate limiting for LLM calls.
+
+Every LLM returned by ``create_llm`` is wrapped in a ``RateLimitedLLM`` that
+paces calls through a ``RateLimiter`` shared by everyone using the same
+(provider, API key, model). Each limiter holds two token buckets - requests
+per minute and tokens per minute - and a cap on calls in flight, and backs
+off on 429 responses using the provider's ``Retry-After`` hint when there is
+one. Because limiters are shared, concurrent requests (and batches of many
+videos) draw from one budget per provider.
+"""
+
+import asyncio
+import contextlib
+import email.utils
+import hashlib
+import random
+import re
+import threading
+import time
+import weakref
+
+import metrics
+import tracing
+
+# --------------------------- BUDGETS ---------------------------
+# Requests/tokens per minute. "default" applies to any model of the provider
+# without its own entry; None means unlimited (local Ollama server).
+PROVIDER_RATE_LIMITS = {
+    "groq": {
+        "default": {"rpm": 30, "tpm": 6000},
+        "llama-3.3-70b-versatile": {"rpm": 30, "tpm": 12000},
+        "llama-3.1-8b-instant": {"rpm": 30, "tpm": 6000},
+    },
+    "openai": {
+        "default": {"rpm": 500, "tpm": 200000},
+        "gpt-4o": {"rpm": 500, "tpm": 30000},
+        "gpt-4-turbo": {"rpm": 500, "tpm": 30000},
+    },
+    "claude": {
+        "default": {"rpm": 50, "tpm": 40000},
+    },
+    "mistral": {
+        "default": {"rpm": 60, "tpm": 500000},
+    },
+    "ollama": {
+        "default": {"rpm": None, "tpm": None},
+    },
+}
+
+# Async calls in flight at once per provider key/model, across all requests.
+# None means unlimited.
+PROVIDER_MAX_CONCURRENCY = {
+    "groq": 8,
+    "openai": 32,
+    "claude": 8,
+    "mistral": 8,
+    # A local server runs few generations in parallel (OLLAMA_NUM_PARALLEL)
+    "ollama": 4,
+}
+
+# Output tokens reserved per call before the real usage is known
+DEFAULT_OUTPUT_TOKENS = 512
+
+# Retry policy for 429 responses
+MAX_RATE_LIMIT_RETRIES = 5
+MAX_BACKOFF_SECONDS = 60
+
+
+def get_rate_limits(provider: str, model: str = None) -> dict:
+    """
+    Get the requests/tokens per minute budget for a provider model.
+
+    A model entry in ``llm_factory.PROVIDER_MODELS`` carrying ``rpm``/``tpm``
+    keys takes precedence over ``PROVIDER_RATE_LIMITS``.
+
+    Returns:
+        Dict with "rpm" and "tpm" (either may be None for unlimited)
+    """
+    provider_limits = PROVIDER_RATE_LIMITS.get(provider, {})
+    limits = dict(provider_limits.get(model) or provider_limits.get("default") or {"rpm": None, "tpm": None})
+
+    try:
+        from llm_factory import PROVIDER_MODELS
+        models = PROVIDER_MODELS.get(provider, {})
+        entry = models.get(model) if isinstance(models, dict) else None
+        if isinstance(entry, dict):
+            limits.update({k: entry[k] for k in ("rpm", "tpm") if k in entry})
+    except Exception:
+        pass
+
+    return limits
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token for Latin-script text)."""
+    return max(1, len(text) // 4)
+
+
+# --------------------------- TOKEN BUCKETS ---------------------------
+class TokenBucket:
+    """
+    Continuous-refill token bucket.
+
+    ``reserve`` always deducts the amount, letting the level go negative, and
+    returns how long the caller must wait for the debt to be repaid. This
+    queues concurrent callers fairly without a background refill task.
+    """
+
+    def __init__(self, capacity: float, per_seconds: float = 60.0):
+        self.capacity = float(capacity)
+        self.rate = self.capacity / per_seconds
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount: float, now: float) -> float:
+        self._refill(now)
+        self.level -= min(amount, self.capacity)
+        return 0.0 if self.level >= 0 else -self.level / self.rate
+
+    def refund(self, amount: float, now: float):
+        self._refill(now)
+        self.level = min(self.capacity, self.level + amount)
+
+    def drain(self, now: float):
+        self._refill(now)
+        self.level = min(self.level, 0.0)
+
+
+class RateLimiter:
+    """Requests-per-minute, tokens-per-minute and concurrency budget for one provider key/model."""
+
+    def __init__(self, rpm: int = None, tpm: int = None, max_concurrency: int = None):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.max_concurrency = max_concurrency
+        self._requests = TokenBucket(rpm) if rpm else None
+        self._tokens = TokenBucket(tpm) if tpm else None
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+        # asyncio semaphores are bound to one event loop, and a process-wide
+        # limiter may see several (the API's, the benchmarks' asyncio.run calls).
+        # Blocking invoke (the Streamlit tasks) takes no slot.
+        self._slots = weakref.WeakKeyDictionary()
+
+    def slot(self):
+        """
+        Async context manager holding one of the ``max_concurrency`` call
+        slots of the running event loop (a no-op when unlimited).
+        """
+        if not self.max_concurrency:
+            return contextlib.nullcontext()
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            semaphore = self._slots.get(loop)
+            if semaphore is None:
+                semaphore = self._slots[loop] = asyncio.Semaphore(self.max_concurrency)
+        return semaphore
+
+    def reserve(self, tokens: int = 0) -> float:
+        """Book one request of ``tokens`` tokens and return the seconds to wait before sending it."""
+        with self._lock:
+            now = time.monotonic()
+            wait = max(0.0, self._blocked_until - now)
+            if self._requests:
+                wait = max(wait, self._requests.reserve(1, now))
+            if self._tokens and tokens:
+                wait = max(wait, self._tokens.reserve(tokens, now))
+            return wait
+
+    async def acquire(self, tokens: int = 0) -> float:
+        """Wait (without blocking the event loop) until a call of ``tokens`` tokens may be sent; return the wait."""
+        wait = self.reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def acquire_sync(self, tokens: int = 0) -> float:
+        """Blocking variant of ``acquire`` for the Streamlit apps."""
+        wait = self.reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def settle(self, reserved: int, used: int):
+        """Correct the token budget once the real usage of a call is known."""
+        if not self._tokens or not used:
+            return
+        with self._lock:
+            now = time.monotonic()
+            if used < reserved:
+                self._tokens.refund(reserved - used, now)
+            else:
+                self._tokens.reserve(used - reserved, now)
+
+    def penalize(self, delay: float):
+        """Pause every caller for ``delay`` seconds after the provider answered 429."""
+        with self._lock:
+            now = time.monotonic()
+            self._blocked_until = max(self._blocked_until, now + delay)
+            # The provider disagrees with our accounting: start from empty buckets
+            if self._requests:
+                self._requests.drain(now)
+            if self._tokens:
+                self._tokens.drain(now)
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(provider: str, api_key: str = None, model: str = None) -> RateLimiter:
+    """
+    Get the process-wide limiter for (provider, API key, model).
+
+    The API key is only kept as a hash. For Ollama, pass the server URL as
+    ``api_key`` so each server gets its own budget.
+    """
+    key_hash = hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()[:16]
+    key = (provider, key_hash, model)
+    with _limiters_lock:
+        if key not in _limiters:
+            limits = get_rate_limits(provider, model)
+            _limiters[key] = RateLimiter(
+                rpm=limits.get("rpm"),
+                tpm=limits.get("tpm"),
+                max_concurrency=PROVIDER_MAX_CONCURRENCY.get(provider),
+            )
+        return _limiters[key]
+
+
+# --------------------------- 429 HANDLING ---------------------------
+def is_rate_limit_error(error: Exception) -> bool:
+    """Check whether a provider error is a 429 / rate limit response."""
+    response = getattr(error, "response", None)
+    status = getattr(error, "status_code", None) or getattr(response, "status_code", None)
+    if status == 429:
+        return True
+    if type(error).__name__ == "RateLimitError":
+        return True
+    message = str(error).lower()
+    return "rate_limit" in message or "rate limit" in message or "error code: 429" in message
+
+
+def get_retry_after(error: Exception):
+    """
+    Extract the provider's retry hint from a rate limit error.
+
+    Looks at the ``retry-after-ms`` and ``retry-after`` response headers
+    (seconds or HTTP date), then at "try again in 7.5s" style messages.
+
+    Returns:
+        Seconds to wait, or None if the provider gave no hint
+    """
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        value = headers.get("retry-after-ms") or headers.get("Retry-After-Ms")
+        if value:
+            return float(value) / 1000
+        value = headers.get("retry-after") or headers.get("Retry-After")
+        if value:
+            try:
+                return max(0.0, float(value))
+            except ValueError:
+                retry_at = email.utils.parsedate_to_datetime(value)
+                return max(0.0, retry_at.timestamp() - time.time())
+    except Exception:
+        pass
+
+    match = re.search(r"try again in (?:(\d+)m)?(\d+(?:\.\d+)?)(ms|s)", str(error))
+    if match:
+        minutes = int(match.group(1) or 0)
+        amount = float(match.group(2))
+        return minutes * 60 + (amount / 1000 if match.group(3) == "ms" else amount)
+    return None
+
+
+def backoff_delay(error: Exception, attempt: int) -> float:
+    """Delay before retry ``attempt`` (0-based): provider hint, else exponential backoff with jitter."""
+    hint = get_retry_after(error)
+    if hint is not None:
+        return min(hint, MAX_BACKOFF_SECONDS)
+    return min(MAX_BACKOFF_SECONDS, 2 ** attempt) * random.uniform(0.8, 1.2)
+
+
+def get_token_counts(result) -> tuple:
+    """(input, output) tokens reported in an LLM response's metadata ((0, 0) if unavailable)."""
+    usage = getattr(result, "usage_metadata", None)
+    if usage:
+        return usage.get("input_tokens", 0), usage.get("output_tokens", 0)
+    metadata = getattr(result, "response_metadata", None) or {}
+    usage = metadata.get("token_usage") or metadata.get("usage") or {}
+    if usage:
+        return (usage.get("input_tokens", usage.get("prompt_tokens", 0)),
+                usage.get("output_tokens", usage.get("completion_tokens", 0)))
+    # Ollama
+    return metadata.get("prompt_eval_count", 0), metadata.get("eval_count", 0)
+
+
+def get_token_usage(result) -> int:
+    """Total tokens reported in an LLM response's metadata (0 if unavailable)."""
+    return sum(get_token_counts(result))
+
+
+# --------------------------- LLM WRAPPER ---------------------------
+class RateLimitedLLM:
+    """
+    Wrap an LLM so every ``invoke``/``ainvoke``/``astream`` goes through a shared limiter.
+
+    Attributes not defined here are forwarded to the wrapped LLM. Calls,
+    tokens, retries, 429s and rate limit waits are recorded in ``metrics``
+    under ``provider`` and ``model``, and added to the current trace span.
+    """
+
+    def __init__(self, llm, limiter: RateLimiter, max_retries: int = MAX_RATE_LIMIT_RETRIES,
+                 output_tokens: int = DEFAULT_OUTPUT_TOKENS, provider: str = None, model: str = None):
+        self.llm = llm
+        self.limiter = limiter
+        self.max_retries = max_retries
+        self.output_tokens = output_tokens
+        self.labels = {"provider": provider or "", "model": model or ""}
+
+    def __getattr__(self, name):
+        return getattr(self.llm, name)
+
+    def _reserved_tokens(self, prompt) -> int:
+        return estimate_tokens(str(prompt)) + self.output_tokens
+
+    def _record_wait(self, wait: float):
+        if wait > 0:
+            metrics.RATE_LIMIT_WAIT.observe(wait, **self.labels)
+            tracing.add_to_span(rate_limit_wait_ms=wait * 1000)
+
+    def _record_call(self, started: float, result=None, error: Exception = None):
+        """Record the latency, outcome and token counts of one provider call."""
+        elapsed = time.perf_counter() - started
+        metrics.LLM_CALL_LATENCY.observe(elapsed, stage=metrics.current_llm_stage(), **self.labels)
+        metrics.LLM_CALLS.inc(outcome="error" if error is not None else "ok", **self.labels)
+        tracing.add_to_span(provider_ms=elapsed * 1000, attempts=1)
+        if error is None:
+            input_tokens, output_tokens = get_token_counts(result)
+            metrics.LLM_TOKENS.inc(input_tokens, direction="input", **self.labels)
+            metrics.LLM_TOKENS.inc(output_tokens, direction="output", **self.labels)
+            if input_tokens or output_tokens:
+                tracing.annotate(input_tokens=input_tokens, output_tokens=output_tokens)
+        elif is_rate_limit_error(error):
+            metrics.LLM_RATE_LIMITED.inc(**self.labels)
+
+    def _retry(self, error: Exception, attempt: int):
+        """Pause the limiter after a 429, or re-raise ``error`` if it cannot be retried."""
+        if attempt == self.max_retries or not is_rate_limit_error(error):
+            raise error
+        metrics.LLM_RETRIES.inc(**self.labels)
+        tracing.add_to_span(retries=1)
+        self.limiter.penalize(backoff_delay(error, attempt))
+
+    async def ainvoke(self, prompt, **kwargs):
+        tokens = self._reserved_tokens(prompt)
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with self.limiter.slot():
+                    self._record_wait(await self.limiter.acquire(tokens))
+                    started = time.perf_counter()
+                    try:
+                        result = await self.llm.ainvoke(prompt, **kwargs)
+                    except Exception as e:
+                        self._record_call(started, error=e)
+                        raise
+            except Exception as e:
+                self._retry(e, attempt)
+                continue
+            self._record_call(started, result)
+            self.limiter.settle(tokens, get_token_usage(result))
+            return result
+
+    async def astream(self, prompt, **kwargs):
+        """
+        Stream the response chunks of one call.
+
+        A 429 is retried only if it arrives before the first chunk: once
+        content has been yielded, errors propagate to the caller.
+        """
+        tokens = self._reserved_tokens(prompt)
+        for attempt in range(self.max_retries + 1):
+            full = None
+            try:
+                async with self.limiter.slot():
+                    self._record_wait(await self.limiter.acquire(tokens))
+                    started = time.perf_counter()
+                    try:
+                        async for chunk in self.llm.astream(prompt, **kwargs):
+                            full = chunk if full is None else full + chunk
+                            yield chunk
+                    except Exception as e:
+                        self._record_call(started, error=e)
+                        raise
+            except Exception as e:
+                if full is not None:
+                    raise
+                self._retry(e, attempt)
+                continue
+            self._record_call(started, full)
+            self.limiter.settle(tokens, get_token_usage(full))
+            return
+
+    def invoke(self, prompt, **kwargs):
+        tokens = self._reserved_tokens(prompt)
+        for attempt in range(self.max_retries + 1):
+            self._record_wait(self.limiter.acquire_sync(tokens))
+            started = time.perf_counter()
+            try:
+                result = self.llm.invoke(prompt, **kwargs)
+            except Exception as e:
+                self._record_call(started, error=e)
+                self._retry(e, attempt)
+                continue
+            self._record_call(started, result)
+            self.limiter.settle(tokens, get_token_usage(result))
+            return result
+
+
+def rate_limited(llm, provider: str, api_key: str = None, model: str = None) -> RateLimitedLLM:
+    """Wrap ``llm`` with the shared limiter for (provider, api_key, model)."""
+    return RateLimitedLLM(llm, get_limiter(provider, api_key, model), provider=provider, model=model)
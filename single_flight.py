@@ -0,0 +1,106 @@
+"""
+In-flight deduplication of identical API work.
+
+When many clients ask for the same video at once (a link shared internally),
+only the first request runs the pipeline; the others await the same task and
+get the same result. Keys are built by the caller from everything that
+changes the output: canonical video ID, operation, provider, model (and
+Ollama server URL) and the version of the prompts.
+
+Progress events of the shared run are forwarded to every request awaiting
+it, from the moment it joined.
+"""
+
+import asyncio
+import hashlib
+import threading
+
+from langchain.prompts import PromptTemplate
+
+
+def prompt_version(*prompts: PromptTemplate) -> str:
+    """Short hash of prompt templates, so a prompt change never coalesces with older runs."""
+    digest = hashlib.sha256()
+    for prompt in prompts:
+        digest.update(prompt.template.encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()[:12]
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent coroutines with the same key into one task.
+
+    The shared task is shielded from the cancellation of any single waiter
+    (e.g. a client disconnecting); it keeps running for the others.
+    """
+
+    def __init__(self):
+        self.started = {}  # operation -> runs started
+        self.coalesced = {}  # operation -> requests that joined a run in flight
+        self._flights = {}  # (loop, key) -> [task, progress callbacks]
+        self._lock = threading.Lock()
+
+    async def run(self, operation: str, key: tuple, factory, progress=None):
+        """
+        Run ``factory(progress)`` unless the same work is already in flight.
+
+        Args:
+            operation: Operation name, used for the counters ("summarize", "notes", ...)
+            key: Hashable identity of the work (should include ``operation``)
+            factory: Coroutine function taking an async ``progress(stage, done, total, **details)`` callback
+            progress: Optional callback of this request
+
+        Returns:
+            The result of the shared run (exceptions are shared too)
+        """
+        flight_key = (asyncio.get_running_loop(), key)
+        with self._lock:
+            flight = self._flights.get(flight_key)
+            if flight is not None:
+                self.coalesced[operation] = self.coalesced.get(operation, 0) + 1
+            else:
+                self.started[operation] = self.started.get(operation, 0) + 1
+                flight = self._flights[flight_key] = [None, []]
+            if progress is not None:
+                flight[1].append(progress)
+
+        if flight[0] is None:
+            async def broadcast(stage, done, total, **details):
+                for callback in list(flight[1]):
+                    await callback(stage, done, total, **details)
+
+            flight[0] = asyncio.ensure_future(factory(broadcast))
+            flight[0].add_done_callback(lambda _: self._forget(flight_key, flight))
+
+        try:
+            return await asyncio.shield(flight[0])
+        finally:
+            if progress is not None and progress in flight[1]:
+                flight[1].remove(progress)
+
+    def _forget(self, flight_key, flight):
+        with self._lock:
+            if self._flights.get(flight_key) is flight:
+                del self._flights[flight_key]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "in_flight": len(self._flights),
+                "started": dict(self.started),
+                "coalesced": dict(self.coalesced),
+            }
+
+
+_default_flights = None
+_default_flights_lock = threading.Lock()
+
+
+def get_single_flight() -> SingleFlight:
+    """Process-wide instance (created on first use)."""
+    global _default_flights
+    with _default_flights_lock:
+        if _default_flights is None:
+            _default_flights = SingleFlight()
+        return _default_flights
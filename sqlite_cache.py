@@ -0,0 +1,118 @@
+"""
+Small key/blob store on SQLite with TTL expiry and size-based LRU eviction.
+
+Base class for the transcript cache and the LLM response cache. Values are
+zlib-compressed bytes; subclasses handle (de)serialization.
+"""
+
+import sqlite3
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+
+
+class SQLiteCache:
+    """Thread-safe blob cache stored in one SQLite table."""
+
+    def __init__(self, path: str, table: str, max_bytes: int, ttl_seconds: int):
+        self.path = path
+        self.table = table
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} ("
+                " key TEXT PRIMARY KEY,"
+                " data BLOB NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " accessed_at REAL NOT NULL)"
+            )
+            conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_accessed ON {table} (accessed_at)")
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get_bytes(self, key: str):
+        """
+        Get a cached value.
+
+        Returns:
+            Decompressed bytes, or None on a miss or an expired entry
+        """
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                f"SELECT data, created_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self.ttl_seconds:
+                if row is not None:
+                    conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                self.misses += 1
+                return None
+            conn.execute(f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+        return zlib.decompress(row[0])
+
+    def put_bytes(self, key: str, value: bytes):
+        """Store a value, then evict expired and least recently used entries."""
+        data = zlib.compress(value, 6)
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, data, size, created_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, data, len(data), now, now),
+            )
+            self._evict(conn, now)
+
+    def _evict(self, conn, now: float):
+        conn.execute(f"DELETE FROM {self.table} WHERE created_at < ?", (now - self.ttl_seconds,))
+        total = conn.execute(f"SELECT COALESCE(SUM(size), 0) FROM {self.table}").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in conn.execute(
+            f"SELECT key, size FROM {self.table} ORDER BY accessed_at ASC"
+        ).fetchall():
+            conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def contains(self, key: str) -> bool:
+        """Check for a fresh entry without touching its LRU position or the counters."""
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                f"SELECT created_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+        return row is not None and time.time() - row[0] <= self.ttl_seconds
+
+    def clear(self):
+        """Delete every entry (the hit/miss counters are kept)."""
+        with self._lock, self._connect() as conn:
+            conn.execute(f"DELETE FROM {self.table}")
+
+    def stats(self) -> dict:
+        with self._lock, self._connect() as conn:
+            count, size = conn.execute(f"SELECT COUNT(*), COALESCE(SUM(size), 0) FROM {self.table}").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "entries": count,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
@@ -0,0 +1,109 @@
+"""
+Server-side store of generated summaries and their translations.
+
+/summarize returns a ``summary_id`` for every summary it produces, so clients
+can ask /translate for that summary by ID instead of uploading its text again.
+IDs are content hashes: the same summary always gets the same ID.
+
+Translations are stored per (summary ID, language, provider, model, and
+Ollama server URL), so a summary published in several languages is only
+translated once per language.
+"""
+
+import hashlib
+import os
+import threading
+
+from sqlite_cache import SQLiteCache
+
+# --------------------------- CONFIG ---------------------------
+CACHE_FILE = os.environ.get("SUMMARY_STORE_FILE", "summary_store.db")
+CACHE_MAX_BYTES = int(os.environ.get("SUMMARY_STORE_MAX_MB", "50")) * 1024 * 1024
+CACHE_TTL_SECONDS = int(os.environ.get("SUMMARY_STORE_TTL_HOURS", str(30 * 24))) * 3600
+
+
+def make_summary_id(summary: str) -> str:
+    """Content-derived ID of a summary."""
+    return hashlib.sha256(summary.encode("utf-8")).hexdigest()[:32]
+
+
+class SummaryStore(SQLiteCache):
+    """Summary texts keyed by summary ID, with TTL expiry and size-based LRU eviction."""
+
+    def __init__(self, path: str = CACHE_FILE, max_bytes: int = CACHE_MAX_BYTES, ttl_seconds: int = CACHE_TTL_SECONDS):
+        super().__init__(path, "summaries", max_bytes, ttl_seconds)
+
+    def get(self, summary_id: str):
+        """
+        Get a stored summary.
+
+        Returns:
+            Summary text, or None for an unknown or expired ID
+        """
+        data = self.get_bytes(summary_id)
+        return data.decode("utf-8") if data is not None else None
+
+    def put(self, summary: str) -> str:
+        """
+        Store a summary.
+
+        Returns:
+            Its summary ID
+        """
+        summary_id = make_summary_id(summary)
+        self.put_bytes(summary_id, summary.encode("utf-8"))
+        return summary_id
+
+
+class TranslationStore(SQLiteCache):
+    """
+    Translations keyed by summary ID, target language, provider and model, in the summary store's file.
+
+    The Ollama server URL is part of the key when given: two servers may serve
+    different models under the same name.
+    """
+
+    def __init__(self, path: str = CACHE_FILE, max_bytes: int = CACHE_MAX_BYTES, ttl_seconds: int = CACHE_TTL_SECONDS):
+        super().__init__(path, "translations", max_bytes, ttl_seconds)
+
+    @staticmethod
+    def make_key(summary_id: str, language: str, provider: str, model: str, base_url: str = None) -> str:
+        parts = (summary_id, language.strip().lower(), provider, model or "")
+        return "\x1f".join(parts + (base_url,) if base_url else parts)  # Keys without a URL are unchanged
+
+    def get(self, summary_id: str, language: str, provider: str, model: str, base_url: str = None):
+        """
+        Get a stored translation.
+
+        Returns:
+            Translated text, or None if there is none (or it expired)
+        """
+        data = self.get_bytes(self.make_key(summary_id, language, provider, model, base_url))
+        return data.decode("utf-8") if data is not None else None
+
+    def put(self, summary_id: str, language: str, provider: str, model: str, translation: str, base_url: str = None):
+        key = self.make_key(summary_id, language, provider, model, base_url)
+        self.put_bytes(key, translation.encode("utf-8"))
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+_default_translation_store = None
+
+
+def get_summary_store() -> SummaryStore:
+    """Process-wide store instance (created on first use)."""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = SummaryStore()
+        return _default_store
+
+
+def get_translation_store() -> TranslationStore:
+    """Process-wide translation store (created on first use)."""
+    global _default_translation_store
+    with _default_store_lock:
+        if _default_translation_store is None:
+            _default_translation_store = TranslationStore()
+        return _default_translation_store
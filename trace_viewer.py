@@ -0,0 +1,109 @@
+"""
+Render traces written by ``tracing`` as text waterfalls.
+
+Reads a JSONL trace file (TRACE_FILE), or a JSON response saved from a
+request sent with the "X-Debug-Trace: 1" header:
+
+    python trace_viewer.py traces.jsonl                 # last trace
+    python trace_viewer.py traces.jsonl --slowest 3     # three slowest traces
+    python trace_viewer.py traces.jsonl --trace 3f2a    # trace ID (prefix)
+    curl -s -H "X-Debug-Trace: 1" ... > response.json && python trace_viewer.py response.json
+
+Each span is a line with its start offset, duration, a bar positioned on the
+request timeline and its attributes (chunk index, size, provider latency,
+retries, tokens...). Spans shorter than ``--min-ms`` are hidden.
+"""
+
+import argparse
+import json
+import sys
+from datetime import datetime
+
+
+def load_traces(path: str) -> list:
+    """Traces from a JSONL file, a single trace or a response with a "trace" key."""
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    try:
+        documents = [json.loads(text)]
+    except json.JSONDecodeError:
+        documents = [json.loads(line) for line in text.splitlines() if line.strip()]
+    return [document.get("trace", document) for document in documents if "spans" in document.get("trace", document)]
+
+
+def ordered_spans(trace: dict) -> list:
+    """(depth, span) pairs in tree order, children by start time."""
+    children = {}
+    for span in trace["spans"]:
+        children.setdefault(span["parent"], []).append(span)
+    ordered = []
+
+    def visit(parent_id, depth):
+        for span in sorted(children.get(parent_id, []), key=lambda span: span["start_ms"]):
+            ordered.append((depth, span))
+            visit(span["id"], depth + 1)
+
+    visit(None, 0)
+    return ordered
+
+
+def format_attributes(attributes: dict) -> str:
+    return " ".join(f"{name}={value}" for name, value in attributes.items())
+
+
+def render(trace: dict, width: int = 50, min_ms: float = 0.0) -> str:
+    total = trace["duration_ms"] or max(
+        (span["start_ms"] + (span["duration_ms"] or 0) for span in trace["spans"]), default=0
+    )
+    started = datetime.fromtimestamp(trace["started_at"]).strftime("%Y-%m-%d %H:%M:%S")
+    lines = [f"trace {trace['trace_id']}  {trace['name']}  {total:.1f} ms  {started}"]
+    scale = width / total if total else 0
+
+    hidden = 0
+    for depth, span in ordered_spans(trace):
+        duration = span["duration_ms"]
+        if depth and duration is not None and duration < min_ms:
+            hidden += 1
+            continue
+        start = int(span["start_ms"] * scale)
+        length = max(1, int((duration or (total - span["start_ms"])) * scale))
+        bar = (" " * start + "#" * length)[:width].ljust(width)
+        duration_text = f"{duration:9.1f}" if duration is not None else "  running"
+        name = "  " * depth + span["name"]
+        error = f"  ERROR {span['error']}" if span.get("error") else ""
+        lines.append(
+            f"{span['start_ms']:9.1f} {duration_text} |{bar}| {name}  {format_attributes(span['attributes'])}{error}"
+        )
+    if hidden:
+        lines.append(f"({hidden} spans under {min_ms} ms hidden)")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", help="JSONL trace file or saved JSON response")
+    parser.add_argument("--trace", help="Trace ID (or prefix) to show")
+    parser.add_argument("--last", type=int, default=1, help="Show the last N traces (default 1)")
+    parser.add_argument("--slowest", type=int, help="Show the N slowest traces instead")
+    parser.add_argument("--name", help="Only traces of this operation (summarize, notes, translate...)")
+    parser.add_argument("--width", type=int, default=50, help="Width of the timeline bars")
+    parser.add_argument("--min-ms", type=float, default=0.0, help="Hide spans shorter than this")
+    args = parser.parse_args()
+
+    traces = load_traces(args.path)
+    if args.name:
+        traces = [trace for trace in traces if trace["name"] == args.name]
+    if args.trace:
+        traces = [trace for trace in traces if trace["trace_id"].startswith(args.trace)]
+    elif args.slowest:
+        traces = sorted(traces, key=lambda trace: trace["duration_ms"] or 0, reverse=True)[:args.slowest]
+    else:
+        traces = traces[-args.last:]
+    if not traces:
+        sys.exit("No matching trace.")
+
+    print("\n\n".join(render(trace, args.width, args.min_ms) for trace in traces))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+Per-request traces of the summarization pipeline.
+
+A trace is a tree of timed spans: the request itself, then the transcript
+load, chunking and every LLM call (with its chunk index, size, provider
+latency, retries and tokens). Where ``metrics`` tells which stage is slow on
+average, a trace shows what one slow request spent its time on.
+
+Tracing is off unless ``TRACE_FILE`` is set (every trace is appended to it
+as one JSON line) or a request asks for its own trace (the API's
+``X-Debug-Trace`` header); when off, ``span`` does nothing. Render traces
+with ``python trace_viewer.py``.
+
+The current span is kept in a context variable, so tasks and threads
+started from a traced request (``asyncio.gather``, ``asyncio.to_thread``)
+add their spans to it.
+"""
+
+import contextvars
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+# --------------------------- CONFIG ---------------------------
+TRACE_FILE = os.environ.get("TRACE_FILE", "")  # JSONL file receiving every trace ("" = only on demand)
+
+_current = contextvars.ContextVar("trace_span", default=None)  # (trace, span) or None
+_file_lock = threading.Lock()
+
+
+class Trace:
+    """Spans of one request, timed in milliseconds from its start."""
+
+    def __init__(self, name: str, attributes: dict):
+        self.trace_id = uuid.uuid4().hex
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        self._spans = []
+        self._lock = threading.Lock()
+        self.root = self.start_span(name, None, attributes)
+
+    def _now_ms(self) -> float:
+        return round((time.perf_counter() - self._start) * 1000, 3)
+
+    def start_span(self, name: str, parent, attributes: dict) -> dict:
+        with self._lock:
+            span = {
+                "id": len(self._spans),
+                "parent": parent["id"] if parent is not None else None,
+                "name": name,
+                "start_ms": self._now_ms(),
+                "duration_ms": None,
+                "attributes": dict(attributes),
+            }
+            self._spans.append(span)
+        return span
+
+    def end_span(self, span: dict, error: BaseException = None):
+        with self._lock:
+            span["duration_ms"] = round(self._now_ms() - span["start_ms"], 3)
+            if error is not None:
+                span["error"] = f"{type(error).__name__}: {error}"
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            spans = [{**span, "attributes": dict(span["attributes"])} for span in self._spans]
+        return {
+            "trace_id": self.trace_id,
+            "name": self.root["name"],
+            "started_at": self.started_at,
+            "duration_ms": spans[0]["duration_ms"],
+            "spans": spans,
+        }
+
+
+def write_trace(trace: Trace, path: str = None):
+    """Append ``trace`` as one JSON line to ``path`` (default TRACE_FILE)."""
+    line = json.dumps(trace.to_dict(), ensure_ascii=False, default=str) + "\n"
+    with _file_lock, open(path or TRACE_FILE, "a", encoding="utf-8") as f:
+        f.write(line)
+
+
+@contextmanager
+def start_trace(name: str, force: bool = False, **attributes):
+    """
+    Trace the ``with`` block as a new request.
+
+    Args:
+        name: Operation name ("summarize", "notes", ...)
+        force: Trace even when TRACE_FILE is not set (debug header)
+        **attributes: Attributes of the root span (provider, model, ...)
+
+    Yields:
+        The Trace, or None when tracing is off
+    """
+    if not (force or TRACE_FILE):
+        yield None
+        return
+
+    trace = Trace(name, attributes)
+    previous = _current.get()
+    _current.set((trace, trace.root))
+    error = None
+    try:
+        yield trace
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        _current.set(previous)
+        trace.end_span(trace.root, error)
+        if TRACE_FILE:
+            try:
+                write_trace(trace)
+            except OSError:
+                pass  # Never fail a request because its trace could not be written
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """
+    Time the ``with`` block as a child of the current span.
+
+    Yields:
+        The span dict, or None outside a trace
+    """
+    current = _current.get()
+    if current is None:
+        yield None
+        return
+
+    trace, parent = current
+    child = trace.start_span(name, parent, attributes)
+    _current.set((trace, child))
+    error = None
+    try:
+        yield child
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        # set() rather than reset(): async generators may resume in another context
+        _current.set(current)
+        trace.end_span(child, error)
+
+
+def annotate(**attributes):
+    """Set attributes on the current span (no-op outside a trace)."""
+    current = _current.get()
+    if current is not None:
+        current[1]["attributes"].update(attributes)
+
+
+def add_to_span(**amounts):
+    """Add to numeric attributes of the current span, e.g. ``add_to_span(retries=1)``."""
+    current = _current.get()
+    if current is not None:
+        attributes = current[1]["attributes"]
+        for name, amount in amounts.items():
+            attributes[name] = round(attributes.get(name, 0) + amount, 3)
@@ -0,0 +1,144 @@
+"""
+Persistent transcript cache shared by the API and the Streamlit apps.
+
+Transcripts are keyed by the canonical YouTube video ID, so every URL form of
+the same video (watch?v=, youtu.be/, shorts/, embed/, extra query parameters)
+hits the same entry. Entries are stored zlib-compressed in a local SQLite
+file, expire after a TTL, and the least recently used ones are evicted once
+the cache grows past its size budget.
+"""
+
+import json
+import os
+import re
+import threading
+from urllib.parse import parse_qs, urlparse
+
+from langchain.schema import Document
+from langchain_community.document_loaders import YoutubeLoader
+
+from sqlite_cache import SQLiteCache
+
+# --------------------------- CONFIG ---------------------------
+CACHE_FILE = os.environ.get("TRANSCRIPT_CACHE_FILE", "transcript_cache.db")
+CACHE_MAX_BYTES = int(os.environ.get("TRANSCRIPT_CACHE_MAX_MB", "200")) * 1024 * 1024
+CACHE_TTL_SECONDS = int(os.environ.get("TRANSCRIPT_CACHE_TTL_HOURS", str(7 * 24))) * 3600
+
+# Caption languages tried in order until one is available
+TRANSCRIPT_LANGUAGES = ['fr', 'en', 'es', 'de', 'it', 'pt', 'ru', 'ja', 'ko', 'zh-Hans', 'ar', 'hi', 'nl', 'pl', 'tr', 'sv', 'no', 'da', 'fi']
+
+VIDEO_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{11}$")
+YOUTUBE_HOSTS = ("youtube.com", "youtube-nocookie.com")
+
+
+# --------------------------- URL NORMALIZATION ---------------------------
+def extract_video_id(url: str):
+    """
+    Extract the canonical 11-character video ID from any YouTube URL form.
+
+    Handles ``watch?v=``, ``youtu.be/``, ``shorts/``, ``embed/``, ``live/``
+    and ``v/`` URLs on www/m/music subdomains, with or without extra query
+    parameters, as well as a bare video ID.
+
+    Returns:
+        Video ID, or None if ``url`` is not a recognizable YouTube video URL
+    """
+    url = (url or "").strip()
+    if VIDEO_ID_PATTERN.match(url):
+        return url
+
+    parsed = urlparse(url if "://" in url else f"https://{url}")
+    host = (parsed.hostname or "").lower()
+    path_parts = [part for part in parsed.path.split("/") if part]
+    candidate = None
+
+    if host == "youtu.be":
+        candidate = path_parts[0] if path_parts else None
+    elif any(host == name or host.endswith("." + name) for name in YOUTUBE_HOSTS):
+        if parsed.path == "/watch":
+            candidate = parse_qs(parsed.query).get("v", [None])[0]
+        elif len(path_parts) >= 2 and path_parts[0] in ("shorts", "embed", "live", "v", "e"):
+            candidate = path_parts[1]
+
+    if candidate and VIDEO_ID_PATTERN.match(candidate):
+        return candidate
+    return None
+
+
+def canonical_url(video_id: str) -> str:
+    """Canonical watch URL for a video ID."""
+    return f"https://www.youtube.com/watch?v={video_id}"
+
+
+# --------------------------- CACHE ---------------------------
+class TranscriptCache(SQLiteCache):
+    """Transcript documents keyed by video ID, with TTL expiry and size-based LRU eviction."""
+
+    def __init__(self, path: str = CACHE_FILE, max_bytes: int = CACHE_MAX_BYTES, ttl_seconds: int = CACHE_TTL_SECONDS):
+        super().__init__(path, "transcripts", max_bytes, ttl_seconds)
+
+    def get(self, video_id: str):
+        """
+        Get a cached transcript.
+
+        Returns:
+            List of Documents, or None on a miss or an expired entry
+        """
+        data = self.get_bytes(video_id)
+        if data is None:
+            return None
+        items = json.loads(data.decode("utf-8"))
+        return [Document(page_content=item["page_content"], metadata=item.get("metadata", {})) for item in items]
+
+    def put(self, video_id: str, docs: list):
+        """Store a transcript."""
+        items = [{"page_content": doc.page_content, "metadata": doc.metadata} for doc in docs]
+        self.put_bytes(video_id, json.dumps(items, ensure_ascii=False).encode("utf-8"))
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_transcript_cache() -> TranscriptCache:
+    """Process-wide cache instance (created on first use)."""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = TranscriptCache()
+        return _default_cache
+
+
+# --------------------------- LOADING ---------------------------
+def load_transcript(youtube_url: str, language: list = None, cache: TranscriptCache = None) -> list:
+    """
+    Load a video transcript, using the on-disk cache when possible.
+
+    Blocking: the API runs this on its YouTube thread pool.
+
+    Args:
+        youtube_url: Any YouTube URL form (or bare video ID)
+        language: Caption languages to try, in order (defaults to TRANSCRIPT_LANGUAGES)
+        cache: Cache to use (defaults to the process-wide cache)
+
+    Returns:
+        List of transcript Documents (empty if the video has no transcript)
+    """
+    language = language or TRANSCRIPT_LANGUAGES
+    video_id = extract_video_id(youtube_url)
+
+    if video_id is None:
+        # Not a URL form we know: let YoutubeLoader try, without caching
+        loader = YoutubeLoader.from_youtube_url(youtube_url, add_video_info=False, language=language)
+        return loader.load()
+
+    cache = cache or get_transcript_cache()
+    docs = cache.get(video_id)
+    if docs is not None:
+        return docs
+
+    loader = YoutubeLoader(video_id, add_video_info=False, language=language)
+    docs = loader.load()
+    if docs and any(doc.page_content.strip() for doc in docs):
+        cache.put(video_id, docs)
+    return docs